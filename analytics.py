@@ -0,0 +1,175 @@
+"""
+Time-series analytics
+Completed sessions are binned into per-day, per-ISO-week and weekday x
+hour-of-day totals with vectorized NumPy, so 100k entries take milliseconds.
+Sessions that cross midnight (or an hour boundary, for the hourly view) are
+split and each piece counts towards the bin it falls in.
+"""
+from datetime import datetime
+
+import numpy as np
+
+from intervals import period_index
+
+DAY = 86400
+HOUR = 3600
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _utc_offsets(epoch_seconds):
+    """Local UTC offset in seconds for each timestamp (looked up once per day)"""
+    days, inverse = np.unique(epoch_seconds // DAY, return_inverse=True)
+    offsets = np.array(
+        [datetime.fromtimestamp(int(day) * DAY + DAY // 2).astimezone().utcoffset().total_seconds()
+         for day in days],
+        dtype=np.int64
+    )
+    return offsets[inverse]
+
+
+def load_intervals(columns):
+    """Turn the /intervals response into local wall-clock seconds
+
+    Returns a dict of equal-length arrays: task_id, group_id, start, end.
+    Both ends use the start's UTC offset so durations are preserved.
+    """
+    start = np.asarray(columns["start"], dtype=np.int64) // 1000
+    end = np.asarray(columns["end"], dtype=np.int64) // 1000
+    keep = end > start
+    start, end = start[keep], end[keep]
+    offsets = _utc_offsets(start) if len(start) else np.zeros(0, dtype=np.int64)
+    return {
+        "task_id": np.asarray(columns["task_id"], dtype=np.int64)[keep],
+        "group_id": np.asarray(columns["group_id"], dtype=np.int64)[keep],
+        "start": start + offsets,
+        "end": end + offsets,
+    }
+
+
+def split_at(start, end, size):
+    """Split [start, end) intervals at every multiple of size
+
+    Returns (index, bucket, seconds): for each piece, the interval it came
+    from, the bucket number (time // size) it lies in and its length.
+    """
+    first = start // size
+    counts = (end - 1) // size - first + 1
+    index = np.repeat(np.arange(len(start)), counts)
+    # Position of each piece within its own interval: 0, 1, 2, ...
+    position = np.arange(len(index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    bucket = first[index] + position
+    seconds = np.minimum(end[index], (bucket + 1) * size) - np.maximum(start[index], bucket * size)
+    return index, bucket, seconds
+
+
+def _week_start(day):
+    # Day 0 (1970-01-01) was a Thursday; ISO weeks start on Monday
+    return day - (day + 3) % 7
+
+
+def daily_totals(start, end):
+    """(days as datetime64[D], seconds per day) from the first to the last active day"""
+    _, day, seconds = split_at(start, end, DAY)
+    if not len(day):
+        return np.zeros(0, dtype="datetime64[D]"), np.zeros(0)
+    origin = day.min()
+    totals = np.bincount(day - origin, weights=seconds)
+    return (origin + np.arange(len(totals))).astype("datetime64[D]"), totals
+
+
+def calendar(start, end):
+    """Weekday x week matrix of seconds per day, for a calendar heatmap
+
+    Returns (week start dates as datetime64[D], 7 x weeks matrix).
+    """
+    _, day, seconds = split_at(start, end, DAY)
+    if not len(day):
+        return np.zeros(0, dtype="datetime64[D]"), np.zeros((7, 0))
+    week = _week_start(day)
+    origin = week.min()
+    column = (week - origin) // 7
+    weeks = column.max() + 1
+    matrix = np.bincount((day - week) * weeks + column, weights=seconds, minlength=7 * weeks)
+    return (origin + 7 * np.arange(weeks)).astype("datetime64[D]"), matrix.reshape(7, weeks)
+
+
+def weekly_totals(start, end, categories=None, n_categories=1):
+    """Seconds per ISO week, optionally split by category for stacked bars
+
+    categories gives each interval's category index (0..n_categories-1).
+    Returns (week start dates as datetime64[D], weeks x n_categories matrix).
+    """
+    index, day, seconds = split_at(start, end, DAY)
+    if not len(day):
+        return np.zeros(0, dtype="datetime64[D]"), np.zeros((0, n_categories))
+    week = _week_start(day)
+    origin = week.min()
+    row = (week - origin) // 7
+    weeks = row.max() + 1
+    category = categories[index] if categories is not None else np.zeros(len(index), dtype=np.int64)
+    matrix = np.bincount(row * n_categories + category, weights=seconds,
+                         minlength=weeks * n_categories)
+    return (origin + 7 * np.arange(weeks)).astype("datetime64[D]"), matrix.reshape(weeks, n_categories)
+
+
+def hour_by_weekday(start, end):
+    """7 x 24 matrix of seconds worked per weekday (Mon first) and hour of day"""
+    _, hour, seconds = split_at(start, end, HOUR)
+    weekday = (hour // 24 + 3) % 7
+    matrix = np.bincount(weekday * 24 + hour % 24, weights=seconds, minlength=7 * 24)
+    return matrix.reshape(7, 24)
+
+
+def period_totals(start, end, periods):
+    """Seconds per academic period, in start date order
+
+    A session counts towards every period containing its start day, so
+    overlapping periods each get it. Each session is placed with one
+    searchsorted over the period index's segment boundaries.
+    Returns [(period, seconds), ...].
+    """
+    index = period_index(periods)
+    if not index.bounds:
+        return []
+    segment = np.searchsorted(np.array(index.bounds, dtype=np.int64), start // DAY, side="right") - 1
+    inside = segment >= 0
+    per_segment = np.bincount(segment[inside], weights=(end - start)[inside], minlength=len(index.bounds))
+
+    totals = {}
+    for members, seconds in zip(index.segments, per_segment):
+        for period in members:
+            totals[period["id"]] = totals.get(period["id"], 0.0) + seconds
+    indexed = [period for period in periods if period["id"] in totals]
+    indexed.sort(key=lambda period: (period["start_date"], period["id"]))
+    return [(period, totals[period["id"]]) for period in indexed]
+
+
+def summarize(columns, groups, periods=()):
+    """Everything the analytics window shows, computed from /intervals, /groups and /periods"""
+    intervals = load_intervals(columns)
+    start, end = intervals["start"], intervals["end"]
+
+    # Stack weekly bars by group; tasks without a group have group id 0
+    names = {group["id"]: group["name"] for group in groups}
+    group_ids = sorted(set(intervals["group_id"].tolist()))
+    labels = [names.get(group_id, "No group") for group_id in group_ids]
+    categories = np.searchsorted(np.array(group_ids, dtype=np.int64), intervals["group_id"])
+
+    weeks, by_group = weekly_totals(start, end, categories, max(len(group_ids), 1))
+    calendar_weeks, calendar_matrix = calendar(start, end)
+    by_period = period_totals(start, end, periods)
+    total = float((end - start).sum())
+    return {
+        "entries": len(start),
+        "total_hours": total / HOUR,
+        # A real weekly average: hours over the number of weeks spanned
+        "hours_per_week": total / HOUR / len(weeks) if len(weeks) else 0.0,
+        "weeks": weeks,
+        "week_labels": labels,
+        "weekly_hours": by_group / HOUR,
+        "calendar_weeks": calendar_weeks,
+        "calendar_hours": calendar_matrix / HOUR,
+        "hourly_hours": hour_by_weekday(start, end) / HOUR,
+        "period_labels": [period["name"] for period, _ in by_period],
+        "period_hours": np.array([seconds for _, seconds in by_period]) / HOUR,
+    }
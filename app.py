@@ -1,27 +1,54 @@
+from timing import PhaseTimer
+
+# Created before the other imports so that their cost shows in the timing
+startup = PhaseTimer()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 from tkinter import font
 import tkinter.font as tkfont
-import requests
+import multiprocessing
 import threading
 import time
-import csv
 import os
-import shutil
-from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-
-# Try to load configuration from config.py, fallback to default
-try:
-    from config import BACKEND_URL
-    BASE_URL = BACKEND_URL
-except ImportError:
-    BASE_URL = "http://192.168.2.19:5000"
+import webbrowser
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend import BackendClient, HISTORY_PAGE_SIZE
+from changes import ChangeFeed, apply_change
+from dispatch import UIDispatcher
+from journal import Journal, JournalSyncer, utc_now
+from metrics import Profiler, metrics, time_canvas_draws
+from models import EntryTable, Store
+from timers import TimerEngine, format_elapsed
+from tree_sync import TreeSync
+from intervals import find_overlaps
+import backup
+import export
+import importer
+import reports
+
+startup.mark("imports")
+
+SEARCH_DEBOUNCE_MS = 250  # wait this long after the last keystroke before searching
+SEARCH_PAGE_SIZE = 50
+SEARCH_KINDS = {"All": None, "Notes": "entry", "Tasks": "task", "Groups": "group"}
+REPORT_POLL_MS = 200  # how often to check on reports rendering in worker processes
+
+
+def load_chart_modules():
+    """Import matplotlib's Tk backend and the chart engine, the slowest part of start-up"""
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+    from charts import PieChart
+    return Figure, FigureCanvasTkAgg, PieChart
+
 
 class TimeTrackerApp:
-    def __init__(self, root):
+    def __init__(self, root, startup=startup, backend=None, journal=None):
+        self.startup = startup
+        
         # Configure styles
         self.style = ttk.Style()
         
@@ -45,7 +72,9 @@ class TimeTrackerApp:
         # File menu
         self.file_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="File", menu=self.file_menu)
+        self.file_menu.add_command(label="Import Entries", command=self.import_entries)
         self.file_menu.add_command(label="Export CSV", command=self.export_csv)
+        self.file_menu.add_command(label="Export Arrow/Parquet", command=self.export_columnar)
         self.file_menu.add_command(label="Backup Database", command=self.backup_database)
         self.file_menu.add_command(label="Restore Database", command=self.restore_database)
         
@@ -54,6 +83,23 @@ class TimeTrackerApp:
         self.menu_bar.add_cascade(label="Period Manager", menu=self.period_menu)
         self.period_menu.add_command(label="Manage Periods", command=self.manage_periods)
         
+        # Analytics menu
+        self.analytics_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Analytics", menu=self.analytics_menu)
+        self.analytics_menu.add_command(label="Time Analytics", command=self.open_analytics)
+        self.analytics_menu.add_command(label="Period Reports", command=self.open_reports)
+        
+        # Search menu
+        self.search_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Search", menu=self.search_menu)
+        self.search_menu.add_command(label="Search Notes and Tasks", accelerator="Ctrl+F",
+                                     command=self.open_search)
+        
+        # Help menu
+        self.help_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Help", menu=self.help_menu)
+        self.help_menu.add_command(label="Diagnostics", command=self.open_diagnostics)
+        
         # Configure global styles
         self.style.configure(".", 
                             background=self.bg_color,
@@ -100,10 +146,37 @@ class TimeTrackerApp:
                            foreground="white")
         
         self.root = root
+        self.backend = backend or BackendClient()
+        self.dispatcher = UIDispatcher(root)
+        
+        # Timer and delete operations go to the local journal first and are
+        # replayed to the backend in the background
+        self.journal = journal or Journal()
+        self.syncer = JournalSyncer(self.journal, self.backend)
+        self.sync_callbacks = {}  # journal key -> callback once the server has applied it
+        self.change_feed = ChangeFeed(self.backend)
+        self.store = Store()  # groups, tasks and periods by id, as last rendered
+        self.profiler = Profiler()
+        self.diagnostics_window = None
         self.root.title("Task Time Tracker")
         self.root.geometry("1000x800")  # Set initial window size
-        self.current_timer_id = None
-        self.running = False
+        # Every running timer; one tick callback a second updates them all
+        self.timers = TimerEngine()
+        self.tick_id = None
+        self.search_window = None
+        self.analytics_window = None
+        self.report_pool = reports.ReportPool()
+        self.report_jobs = []      # one per report file, newest last
+        self.report_poll_id = None
+        self.reports_window = None
+        self.pending_task_selection = None  # task to select once its group's tasks are shown
+        
+        # History paging state: entries loaded so far (newest first) and the
+        # cursor of the next page, or None once the oldest entry is loaded
+        self.history_task_id = None
+        self.history = EntryTable()
+        self.history_cursor = None
+        self.history_loading_cursor = None
         
         # Create main container
         main_container = ttk.Frame(root)
@@ -149,6 +222,7 @@ class TimeTrackerApp:
                                       yscrollcommand=group_scroll.set)
         self.group_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         group_scroll.config(command=self.group_tree.yview)
+        self.group_sync = TreeSync(self.group_tree, "groups")
         self.group_tree.heading("#0", text="Group Name")
         self.group_tree.bind("<<TreeviewSelect>>", self.load_tasks)
         self.group_tree.bind("<Button-3>", self.show_group_context_menu)
@@ -158,7 +232,7 @@ class TimeTrackerApp:
         task_btn_frame.pack(fill=tk.X, padx=5, pady=5)
         
         ttk.Button(task_btn_frame, text="Add Task", command=self.add_task).pack(side=tk.LEFT)
-        ttk.Button(task_btn_frame, text="Refresh", command=self.load_tasks).pack(side=tk.LEFT, padx=5)
+        ttk.Button(task_btn_frame, text="Refresh", command=self.refresh_tasks).pack(side=tk.LEFT, padx=5)
         
         # Add scrollbars for task tree
         task_scroll_y = ttk.Scrollbar(self.task_frame)
@@ -174,6 +248,7 @@ class TimeTrackerApp:
         self.task_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         task_scroll_y.config(command=self.task_list.yview)
         task_scroll_x.config(command=self.task_list.xview)
+        self.task_sync = TreeSync(self.task_list, "tasks")
         
         self.task_list.heading("id", text="ID")
         self.task_list.heading("name", text="Task Name")
@@ -184,6 +259,7 @@ class TimeTrackerApp:
         self.task_list.column("total_hours", width=100, anchor=tk.CENTER)
         self.task_list.column("hours_per_week", width=100, anchor=tk.CENTER)
         self.task_list.bind("<<TreeviewSelect>>", self.load_history)
+        self.task_list.bind("<<TreeviewSelect>>", lambda event: self.update_timer_display(), add="+")
         self.task_list.bind("<Button-3>", self.show_task_context_menu)
         
         # Timer controls
@@ -216,25 +292,43 @@ class TimeTrackerApp:
         )
         self.stop_btn.pack(side="left", padx=40)
         
+        # All running timers; double-click one to stop it
+        self.running_tree = ttk.Treeview(self.timer_frame, columns=("task", "group", "elapsed"),
+                                         show="headings", height=3)
+        self.running_tree.pack(fill="x", padx=10, pady=(0, 5))
+        self.running_sync = TreeSync(self.running_tree, "timers")
+        self.running_tree.heading("task", text="Running Task")
+        self.running_tree.heading("group", text="Group")
+        self.running_tree.heading("elapsed", text="Elapsed")
+        self.running_tree.column("task", width=150)
+        self.running_tree.column("group", width=120)
+        self.running_tree.column("elapsed", width=90, anchor=tk.CENTER)
+        self.running_tree.bind("<Double-1>", self.on_running_double_click)
+        
+        # Shows when journaled changes are waiting for the backend
+        self.sync_label = ttk.Label(self.timer_frame, text="", foreground="#e0a030")
+        self.sync_label.pack(pady=(0, 5))
+        
         # History display
         self.history_frame = ttk.LabelFrame(right_panel, text="Time Entries")
         self.history_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Add scrollbars for history tree
-        hist_scroll_y = ttk.Scrollbar(self.history_frame)
+        self.hist_scroll_y = ttk.Scrollbar(self.history_frame)
         hist_scroll_x = ttk.Scrollbar(self.history_frame, orient=tk.HORIZONTAL)
-        hist_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        self.hist_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         hist_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
         
         self.history_tree = ttk.Treeview(self.history_frame, 
                                         columns=("id", "date", "duration", "note"),
                                         show="headings", 
                                         height=5,
-                                        yscrollcommand=hist_scroll_y.set,
+                                        yscrollcommand=self.on_history_scroll,
                                         xscrollcommand=hist_scroll_x.set)
         self.history_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        hist_scroll_y.config(command=self.history_tree.yview)
+        self.hist_scroll_y.config(command=self.history_tree.yview)
         hist_scroll_x.config(command=self.history_tree.xview)
+        self.history_sync = TreeSync(self.history_tree, "history")
         
         self.history_tree.heading("id", text="ID")
         self.history_tree.heading("date", text="Date")
@@ -246,6 +340,8 @@ class TimeTrackerApp:
         self.history_tree.column("duration", width=100, anchor=tk.CENTER)
         self.history_tree.column("note", width=400)
         self.history_tree.bind("<Button-3>", self.show_history_context_menu)
+        # Sessions that overlap another session of the task
+        self.history_tree.tag_configure("overlap", foreground="#f0a030")
         
         # Visualization controls
         self.vis_frame = ttk.LabelFrame(right_panel, text="Time Distribution", style="TLabelframe")
@@ -266,8 +362,6 @@ class TimeTrackerApp:
         self.period_combo.pack(side=tk.LEFT, padx=5)
         self.period_combo.bind("<<ComboboxSelected>>", self.update_visualization)
         
-        self.periods = {}  # Will store period id: name mapping
-        
         ttk.Label(vis_control_frame, text="View by:").pack(side=tk.LEFT, padx=5)
         
         self.vis_mode = tk.StringVar(value="group")
@@ -283,36 +377,164 @@ class TimeTrackerApp:
             command=self.update_visualization
         ).pack(side=tk.LEFT, padx=5)
         
-        # Chart canvas
+        # Chart canvas; matplotlib is imported and the chart built once the
+        # window is up (see build_chart), so a placeholder holds its place
         self.chart_frame = ttk.Frame(self.vis_frame)
         self.chart_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.chart_placeholder = ttk.Label(self.chart_frame, text="Loading chart...", anchor=tk.CENTER)
+        self.chart_placeholder.pack(fill=tk.BOTH, expand=True)
+        self.chart = None
+        self.pending_chart_draw = None  # last draw requested before the chart existed
+        
+        # Bind spacebar to toggle timer
+        self.root.bind("<space>", self.toggle_timer)
+        self.root.bind("<Control-f>", lambda event: self.open_search())
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.startup.mark("widgets")
+        
+        # Initial data loads in the background while the window appears
+        self.load_snapshot()
+        self.root.after_idle(self.on_window_shown)
+        
+        self.syncer.start()
+        self.poll_sync()
+        self.change_feed.start()
+        self.poll_changes()
+    
+    def on_window_shown(self):
+        """First idle moment after the window is drawn: start loading the chart panel"""
+        self.startup.mark("window shown")
+        self.dispatcher.run(
+            load_chart_modules,
+            on_success=self.build_chart,
+            on_error=lambda e: self.chart_placeholder.config(text=f"Chart unavailable: {str(e)}")
+        )
+    
+    def build_chart(self, modules):
+        """Replace the placeholder with the matplotlib chart and draw whatever is waiting"""
+        Figure, FigureCanvasTkAgg, PieChart = modules
+        self.startup.mark("chart imports")
         
-        # Initialize visualization
         self.fig = Figure(figsize=(5, 4), dpi=100, facecolor=self.secondary_color)
         self.ax = self.fig.add_subplot(111)
         self.ax.set_facecolor(self.secondary_color)
         self.chart_canvas = FigureCanvasTkAgg(self.fig, self.chart_frame)
+        self.chart_placeholder.destroy()
         self.chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.chart = PieChart(self.chart_canvas, self.ax, self.fg_color)
         
-        # Set text colors to match theme
-        self.ax.title.set_color(self.fg_color)
-        for text in self.ax.get_xticklabels() + self.ax.get_yticklabels():
-            text.set_color(self.fg_color)
-        
-        # Initial update
-        self.update_visualization()
-        
-        self.load_groups()
-        
-        # Bind spacebar to toggle timer
-        self.root.bind("<space>", self.toggle_timer)
+        draw, self.pending_chart_draw = self.pending_chart_draw, None
+        if draw is not None:
+            draw(self.chart)
+        self.startup.mark("chart ready")
+        self.startup.report_when("first data", "chart ready")
+    
+    def with_chart(self, draw):
+        """Call draw(chart) now, or once the chart has been built (only the latest draw is kept)"""
+        if self.chart is None:
+            self.pending_chart_draw = draw
+        else:
+            draw(self.chart)
+    
+    def on_close(self):
+        """Stop background work and close the window"""
+        if self.tick_id is not None:
+            self.root.after_cancel(self.tick_id)
+        if self.report_poll_id is not None:
+            self.root.after_cancel(self.report_poll_id)
+        self.report_pool.close()
+        self.syncer.stop()
+        self.syncer.join(timeout=1)
+        self.change_feed.stop()
+        self.dispatcher.close()
+        self.journal.close()
+        self.backend.close()
+        self.root.destroy()
+    
+    def journal_write(self, method, path, payload=None, on_synced=None):
+        """Record a write in the local journal and wake the syncer; returns the journal key"""
+        key = self.journal.record(method, path, payload)
+        if on_synced:
+            self.sync_callbacks[key] = on_synced
+        self.syncer.notify()
+        return key
+    
+    def poll_sync(self):
+        """Run callbacks for journaled writes the backend has applied and update the sync status"""
+        drained = False
+        for key, result, error in self.syncer.drain():
+            drained = True
+            callback = self.sync_callbacks.pop(key, None)
+            if error is not None:
+                self.timers.failed(key)
+                metrics.error("sync", error)
+                messagebox.showerror("Sync Failed", f"A change could not be saved on the server: {str(error)}")
+                continue
+            self.timers.applied(key, result)
+            if callback and not self.change_feed.connected:
+                # Callbacks only refresh views; with a live feed the change arrives from it
+                callback(result)
+        if drained:
+            # Starts journaled before a restart only show up once they are synced
+            self.refresh_timers()
+        
+        pending = self.journal.pending_count()
+        if pending and not self.syncer.online:
+            self.sync_label.config(text=f"Offline - {pending} change(s) waiting to sync")
+        elif pending:
+            self.sync_label.config(text=f"Syncing {pending} change(s)...")
+        else:
+            self.sync_label.config(text="")
+        self.root.after(500, self.poll_sync)
+    
+    def poll_changes(self):
+        """Apply changes from the live feed to the cache and re-render the affected views"""
+        views = set()
+        timers_changed = False
+        for event, data in self.change_feed.drain():
+            views |= apply_change(self.backend.cache, event, data)
+            if event == "entry_deleted":
+                self.history.remove(data["entry"]["id"])
+            if event in ("entry_started", "entry_stopped", "entry_deleted", "reset"):
+                timers_changed = True
+        
+        if timers_changed and "reset" not in views:
+            self.refresh_timers()  # another client started or stopped a timer
+        period_window_open = views and hasattr(self, "period_tree") and self.period_tree.winfo_exists()
+        if "reset" in views:
+            self.load_snapshot()
+            if period_window_open:
+                self.load_periods()
+        elif views:
+            # The cache has been patched, so these render without a request
+            if "groups" in views:
+                self.load_groups()
+            if "tasks" in views and self.get_selected_group(show_warning=False):
+                self.load_tasks()
+            if "history" in views and self.get_selected_task(show_warning=False):
+                self.load_history()
+            if "chart" in views:
+                self.update_visualization()
+            if "periods" in views:
+                self.fetch("/periods", on_success=self.update_period_choices, view="period_choices")
+                if period_window_open:
+                    self.load_periods()
+        self.root.after(200, self.poll_changes)
     
     def add_group(self):
         name = simpledialog.askstring("New Group", "Enter group name:")
         if name:
-            threading.Thread(target=lambda: requests.post(f"{BASE_URL}/groups", json={"name": name})).start()
-            self.load_groups()
-            self.load_tasks()
+            def on_added(_):
+                if self.change_feed.connected: return  # the new row arrives from the feed
+                self.backend.invalidate("/groups")
+                self.backend.invalidate("/time_by_group")
+                self.load_groups()
+            
+            self.dispatcher.run(
+                lambda: self.backend.post("/groups", {"name": name}),
+                on_success=on_added,
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to add group: {str(e)}")
+            )
     
     def add_task(self):
         group = self.get_selected_group()
@@ -320,114 +542,320 @@ class TimeTrackerApp:
         
         name = simpledialog.askstring("New Task", "Enter task name:")
         if name:
-            try:
-                response = requests.post(
-                    f"{BASE_URL}/tasks", 
-                    json={"name": name, "group_id": group["id"]}
-                )
-                response.raise_for_status()
+            def on_added(_):
+                if self.change_feed.connected: return  # the new row arrives from the feed
+                self.backend.invalidate("/tasks", group_id=group.id)
+                self.backend.invalidate("/time_by_task")
                 self.load_tasks()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to add task: {str(e)}")
+            
+            self.dispatcher.run(
+                lambda: self.backend.post("/tasks", {"name": name, "group_id": group.id}),
+                on_success=on_added,
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to add task: {str(e)}")
+            )
     
     def start_timer(self):
         task = self.get_selected_task()
-        if not task: return
+        if not task or self.timers.for_task(task.id): return
         
-        response = requests.post(f"{BASE_URL}/timer/start", json={"task_id": task["id"]})
-        if response.status_code == 200:
-            self.current_timer_id = response.json()["id"]
-            self.running = True
-            self.start_btn.config(state="disabled")
-            self.stop_btn.config(state="normal")
-            self.start_time = time.time()
-            self.update_timer()
+        # Starting is a local journal write; the syncer sends it to the server
+        start_time = utc_now()
+        key = self.journal_write(
+            "POST", "/timer/start", {"task_id": task.id, "start_time": start_time},
+            on_synced=lambda _: self.backend.invalidate("/time_entries", task_id=task.id)
+        )
+        self.timers.start(task, start_time, key)
+        self.update_timer_display()
     
-    def stop_timer(self):
-        if not self.running: return
-        
+    def stop_timer(self, timer=None):
+        """Stop a timer, by default the selected task's"""
+        if timer is None:
+            task = self.get_selected_task(show_warning=False)
+            timer = task and self.timers.for_task(task.id)
+            if not timer: return
+        
+        # The session ends when STOP is pressed, not when the note is entered
+        end_time = utc_now()
         note = simpledialog.askstring("Session Note", 
-                                    "What did you work on?",
+                                    f"What did you work on ({timer.task_name})?",
                                     parent=self.root)
         
-        requests.post(f"{BASE_URL}/timer/stop", 
-                    json={"id": self.current_timer_id, "note": note or ""})
-        
-        self.running = False
-        self.start_btn.config(state="normal")
-        self.stop_btn.config(state="disabled")
-        self.timer_label.config(text="00:00:00")
+        def on_synced(_):
+            task = self.store.task(timer.task_id)
+            if task:
+                self.invalidate_task(task)
+            else:
+                self.backend.invalidate("/time_entries", task_id=timer.task_id)
+                self.backend.invalidate_aggregates()
+            self.load_snapshot()
+        
+        # The start may not have reached the server yet, so it may be a journal reference
+        key = self.journal_write(
+            "POST", "/timer/stop",
+            {"id": timer.entry, "note": note or "", "end_time": end_time},
+            on_synced=on_synced
+        )
+        self.timers.stop(timer, key)
+        self.update_timer_display()
+    
+    def refresh_timers(self):
+        """Fetch the server's running timers and merge them with the local ones"""
+        revision = self.timers.revision
+        self.dispatcher.run(
+            lambda: self.backend.get("/timer/running"),
+            on_success=lambda rows: self.render_timers(rows, revision),
+            on_error=lambda e: metrics.error("running timers", e),
+            view="timers"
+        )
+    
+    def render_timers(self, rows, revision):
+        self.timers.sync(rows, revision)
+        self.update_timer_display()
+    
+    def update_timer_display(self):
+        """Redraw every running timer and the buttons, and keep the tick going while any run"""
+        now = time.time()
+        task = self.get_selected_task(show_warning=False)
+        selected = task and self.timers.for_task(task.id)
+        self.timer_label.config(text=format_elapsed(selected.elapsed(now)) if selected else "00:00:00")
+        self.start_btn.config(state="normal" if task and not selected else "disabled")
+        self.stop_btn.config(state="normal" if selected else "disabled")
+        
+        rows = []
+        for timer in self.timers:
+            group = self.store.group(timer.group_id)
+            rows.append((f"{timer.task_id}:{timer.start}", "", (
+                timer.task_name or f"Task {timer.task_id}",
+                group.name if group else "",
+                format_elapsed(timer.elapsed(now))
+            )))
+        self.running_sync.sync(rows)
+        
+        if self.timers and self.tick_id is None:
+            # Tick on the next whole second so every display changes together
+            self.tick_id = self.root.after(1000 - int(now * 1000) % 1000, self.tick)
+    
+    def tick(self):
+        """The one timer callback: updates all running timers at once"""
+        self.tick_id = None
+        self.update_timer_display()
+    
+    def on_running_double_click(self, event):
+        iid = self.running_tree.identify_row(event.y)
+        timer = next((timer for timer in self.timers if f"{timer.task_id}:{timer.start}" == iid), None)
+        if timer:
+            self.stop_timer(timer)
+    
+    def fetch(self, path, params=None, on_success=None, on_error=None, view=None):
+        """Render straight from the response cache when possible, otherwise fetch in the background"""
+        cached = self.backend.peek(path, params)
+        if cached is not None:
+            if view is not None:
+                self.dispatcher.cancel(view)
+            on_success(cached)
+            return
         
-        # Refresh data with a small delay
-        self.root.after(500, lambda: [
-            self.load_history(),
-            self.update_visualization(),
-            self.load_tasks()
-        ])
+        self.dispatcher.run(
+            lambda: self.backend.cached_get(path, params),
+            on_success=on_success,
+            on_error=on_error,
+            view=view
+        )
+    
+    def invalidate_task(self, task):
+        """Forget cached data that changes when a task's time entries change"""
+        if not task: return
+        self.backend.invalidate("/time_entries", task_id=task.id)
+        if task.group_id is not None:
+            self.backend.invalidate("/tasks", group_id=task.group_id)
+        else:
+            self.backend.invalidate("/tasks")
+        self.backend.invalidate_aggregates()
     
-    def update_timer(self):
-        if self.running:
-            elapsed = time.time() - self.start_time
-            self.timer_label.config(text=time.strftime("%H:%M:%S", time.gmtime(elapsed)))
-            self.root.after(1000, self.update_timer)
+    def load_snapshot(self):
+        """Refresh groups, tasks, history and the chart with a single /snapshot request"""
+        group = self.get_selected_group(show_warning=False)
+        task = self.get_selected_task(show_warning=False)
+        period = self.get_selected_period()
+        
+        def render_views():
+            # The snapshot seeded the cache, so these render without a request
+            self.load_groups()
+            if group:
+                self.load_tasks()
+            if task:
+                self.load_history()
+            self.update_visualization()
+            self.startup.mark("first data")
+            self.startup.report_when("first data", "chart ready")
+        
+        revision = self.timers.revision
+        
+        def on_loaded(snapshot):
+            self.update_period_choices(snapshot["periods"])
+            render_views()
+            if snapshot.get("running") is not None:
+                self.render_timers(snapshot["running"], revision)
+            else:
+                self.refresh_timers()
+        
+        def on_error(e):
+            # Servers without /snapshot still serve the individual endpoints
+            print(f"Snapshot failed, loading views separately: {e}")
+            render_views()
+            self.refresh_timers()
+        
+        self.dispatcher.run(
+            lambda: self.backend.snapshot(
+                group_id=group.id if group else None,
+                task_id=task.id if task else None,
+                mode=self.vis_mode.get(),
+                period_id=period.id if period else None
+            ),
+            on_success=on_loaded,
+            on_error=on_error,
+            view="snapshot"
+        )
     
     def load_groups(self):
-        try:
-            response = requests.get(f"{BASE_URL}/groups")
-            response.raise_for_status()  # Raise error for bad status codes
-            for item in self.group_tree.get_children():
-                self.group_tree.delete(item)
-                
-            for group in response.json():
-                self.group_tree.insert("", "end", text=group["name"], values=(group["id"],))
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load groups: {str(e)}")
+        self.fetch(
+            "/groups",
+            on_success=self.render_groups,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load groups: {str(e)}"),
+            view="groups"
+        )
+    
+    def render_groups(self, groups):
+        self.group_sync.sync(
+            (group.id, group.name, (group.id,)) for group in self.store.set_groups(groups)
+        )
     
     def load_tasks(self, event=None):
         group = self.get_selected_group()
         if not group: return
         
-        try:
-            response = requests.get(f"{BASE_URL}/tasks", params={"group_id": group["id"]})
-            response.raise_for_status()
-            for item in self.task_list.get_children():
-                self.task_list.delete(item)
-                
-            for task in response.json():
-                self.task_list.insert("", "end", values=(
-                    task["id"],
-                    task["name"],
-                    task["total_hours"],
-                    task["hours_per_week"]
-                ))
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load tasks: {str(e)}")
+        # A different group invalidates any history still loading for the old task
+        if event is not None:
+            self.dispatcher.cancel("history")
+        
+        self.fetch(
+            "/tasks", {"group_id": group.id},
+            on_success=lambda tasks: self.render_tasks(group.id, tasks),
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load tasks: {str(e)}"),
+            view="tasks"
+        )
+    
+    def refresh_tasks(self):
+        """Reload the task list from the server, bypassing the cache"""
+        group = self.get_selected_group()
+        if not group: return
+        self.backend.invalidate("/tasks", group_id=group.id)
+        self.load_tasks()
+    
+    def render_tasks(self, group_id, tasks):
+        self.task_sync.sync(
+            (task.id, "", (
+                task.id,
+                task.name,
+                task.total_hours,
+                task.hours_per_week
+            ))
+            for task in self.store.set_tasks(group_id, tasks)
+        )
+        self.select_pending_task()
+    
+    def select_pending_task(self):
+        task_id = self.pending_task_selection
+        if task_id is not None and self.task_list.exists(str(task_id)):
+            self.pending_task_selection = None
+            self.task_list.selection_set(str(task_id))
+            self.task_list.see(str(task_id))
     
     def load_history(self, event=None):
         task = self.get_selected_task()
         if not task: return
         
-        try:
-            response = requests.get(f"{BASE_URL}/time_entries", params={"task_id": task["id"]})
-            response.raise_for_status()
-            for item in self.history_tree.get_children():
-                self.history_tree.delete(item)
-                
-            for entry in response.json():
-                # Format duration as H:M:S
-                total_seconds = entry["duration"]
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
+        if task.id != self.history_task_id:
+            self.history_task_id = task.id
+            self.history = EntryTable()
+            self.history_cursor = None
+        self.history_loading_cursor = None
+        self.dispatcher.cancel("history_more")
+        
+        def on_first_page(page):
+            entries = EntryTable(page["entries"])
+            
+            # Keep older pages the user already scrolled through; only the
+            # newest page is refetched after a change
+            older = EntryTable()
+            if len(entries) and page["next_cursor"]:
+                older = self.history.older_than(entries.key(len(entries) - 1))
+            if len(older):
+                entries.append(older)
+            else:
+                self.history_cursor = page["next_cursor"]
+            
+            self.history = entries
+            self.render_history(entries)
+        
+        self.fetch(
+            "/time_entries", {"task_id": task.id, "limit": HISTORY_PAGE_SIZE},
+            on_success=on_first_page,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load time entries: {str(e)}"),
+            view="history"
+        )
+    
+    def load_more_history(self):
+        """Append the next page of time entries to the history view"""
+        cursor = self.history_cursor
+        if not cursor or cursor == self.history_loading_cursor: return
+        self.history_loading_cursor = cursor
+        task_id = self.history_task_id
+        
+        def on_page(page):
+            self.history_loading_cursor = None
+            if task_id != self.history_task_id or cursor != self.history_cursor: return
+            self.history.extend(page["entries"])
+            self.history_cursor = page["next_cursor"]
+            self.render_history(self.history)
+        
+        def on_error(e):
+            self.history_loading_cursor = None
+            print(f"Error loading more time entries: {e}")
+        
+        self.fetch(
+            "/time_entries", {"task_id": task_id, "limit": HISTORY_PAGE_SIZE, "cursor": cursor},
+            on_success=on_page,
+            on_error=on_error,
+            view="history_more"
+        )
+    
+    def on_history_scroll(self, first, last):
+        """Scrollbar callback for the history view; loads the next page near the bottom"""
+        self.hist_scroll_y.set(first, last)
+        if float(last) >= 0.95 and self.history_cursor:
+            self.load_more_history()
+    
+    def render_history(self, entries):
+        overlapping = find_overlaps(entries.ids, entries.starts, entries.ends)
+        rows = []
+        for i in range(len(entries)):
+            entry = entries.entry(i)
+            # Format duration as H:M:S
+            if entry.duration is None:
+                formatted_duration = "running"
+            else:
+                hours = entry.duration // 3600
+                minutes = (entry.duration % 3600) // 60
                 formatted_duration = f"{hours}h {minutes}m"
-                
-                self.history_tree.insert("", "end", values=(
-                    entry["id"],  # Hidden ID in first position
-                    entry["start_time"].split("T")[0],
-                    formatted_duration,
-                    entry.get("note", "")
-                ))
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load time entries: {str(e)}")
+            
+            rows.append((entry.id, "", (
+                entry.id,  # Hidden ID in first position
+                datetime.fromtimestamp(entry.start, timezone.utc).strftime("%Y-%m-%d"),
+                formatted_duration,
+                entry.note
+            ), ("overlap",) if entry.id in overlapping else ()))
+        self.history_sync.sync(rows)
     
     # Helper methods
     def get_selected_group(self, show_warning=True):
@@ -436,42 +864,32 @@ class TimeTrackerApp:
             if show_warning:
                 messagebox.showwarning("Warning", "No group selected")
             return None
-        return {
-            "id": self.group_tree.item(selection[0])["values"][0],
-            "name": self.group_tree.item(selection[0])["text"]
-        }
+        return self.store.group(selection[0])
+    
+    def get_selected_period(self):
+        """Return the period picked in the chart's period box, or None for All Time"""
+        # "All Time" is not a stored period, so it maps to None
+        return self.store.periods_by_name.get(self.period_combo.get())
     
     def update_visualization(self, event=None):
         try:
             mode = self.vis_mode.get()
-            period_name = self.period_combo.get()
-            period_id = None
-            period_obj = None
-            
-            # Handle "All Time" and period selection
-            if period_name != "All Time":
-                # Find period ID by name
-                for pid, obj in self.periods.items():
-                    if obj["name"] == period_name:
-                        period_id = pid
-                        period_obj = obj
-                        break
+            period_obj = self.get_selected_period()
+            period_id = period_obj.id if period_obj else None
             
             # Check if period is in the future
             if period_obj:
                 from datetime import datetime
                 today = datetime.now().date()
                 try:
-                    start_date = datetime.strptime(period_obj["start_date"], "%Y-%m-%d").date()
-                    end_date = datetime.strptime(period_obj["end_date"], "%Y-%m-%d").date()
+                    start_date = datetime.strptime(period_obj.start_date, "%Y-%m-%d").date()
+                    end_date = datetime.strptime(period_obj.end_date, "%Y-%m-%d").date()
                     
                     if today < start_date:
                         # Period is in the future
-                        self.ax.clear()
-                        self.ax.text(0.5, 0.5, "This period is in the future\nNo data available", 
-                                    ha='center', va='center', color=self.fg_color, fontsize=12)
-                        self.ax.set_title("Period in Future", color=self.fg_color)
-                        self.chart_canvas.draw()
+                        self.dispatcher.cancel("chart")
+                        self.with_chart(lambda chart: chart.show_message(
+                            "This period is in the future\nNo data available", "Period in Future"))
                         return
                 except Exception as e:
                     print(f"Error parsing dates: {e}")
@@ -481,74 +899,546 @@ class TimeTrackerApp:
                 params = {}
                 if period_id:
                     params["period_id"] = period_id
-                response = requests.get(f"{BASE_URL}/time_by_group", params=params)
+                endpoint = "/time_by_group"
                 title = "Time by Group"
             else:
                 group = self.get_selected_group(show_warning=False)
-                group_id = group["id"] if group else None
+                group_id = group.id if group else None
                 params = {}
                 if group_id:
                     params["group_id"] = group_id
                 if period_id:
                     params["period_id"] = period_id
-                response = requests.get(f"{BASE_URL}/time_by_task", params=params)
+                endpoint = "/time_by_task"
                 title = "Time by Task"
-                
-            response.raise_for_status()
-            data = response.json()
             
-            # Clear previous chart
-            self.ax.clear()
-            
-            if not data:
-                self.ax.text(0.5, 0.5, "No data available", 
-                            ha='center', va='center', color=self.fg_color)
-                self.ax.set_title(title, color=self.fg_color)
-                self.chart_canvas.draw()
-                return
-                
-            # Prepare data
-            labels = [item['name'] for item in data]
-            sizes = [item['total_time'] for item in data]
-            
-            # Create pie chart
-            colors = plt.cm.Paired.colors
-            wedges, texts, autotexts = self.ax.pie(
-                sizes, 
-                labels=labels, 
-                autopct='%1.1f%%',
-                startangle=90,
-                colors=colors[:len(labels)]
+            # Each (mode, period, group) view keeps its own rendered chart
+            key = (mode, period_id, params.get("group_id"))
+            self.fetch(
+                endpoint, params,
+                on_success=lambda data: self.render_visualization(key, title, data),
+                on_error=self.show_chart_error,
+                view="chart"
             )
-            
-            # Style the chart
-            self.ax.set_title(title, color=self.fg_color, fontsize=12)
-            self.ax.axis('equal')  # Equal aspect ratio ensures circular pie
-            
-            # Set text colors
-            for text in texts + autotexts:
-                text.set_color(self.fg_color)
-                text.set_fontsize(10)
-                
-            # Draw the chart
-            self.chart_canvas.draw()
-            
         except Exception as e:
-            # Show error message on chart
-            self.ax.clear()
-            self.ax.text(0.5, 0.5, f"Error: {str(e)}", 
-                        ha='center', va='center', color='red')
-            self.ax.set_title("Data Load Error", color='red')
-            self.chart_canvas.draw()
-            print(f"Error updating visualization: {e}")
+            self.show_chart_error(e)
+    
+    def render_visualization(self, key, title, data):
+        try:
+            self.with_chart(lambda chart: chart.show(key, title, data))
+        except Exception as e:
+            self.show_chart_error(e)
+    
+    def show_chart_error(self, e):
+        # Show error message on chart
+        self.with_chart(lambda chart: chart.show_message(f"Error: {str(e)}", "Data Load Error", color="red"))
+        print(f"Error updating visualization: {e}")
 
     def toggle_timer(self, event=None):
-        """Toggle timer with spacebar"""
-        if self.running:
+        """Toggle the selected task's timer with spacebar"""
+        task = self.get_selected_task()
+        if not task: return
+        if self.timers.for_task(task.id):
             self.stop_timer()
         else:
             self.start_timer()
 
+    def open_analytics(self):
+        """Open the daily/weekly/hourly analytics window"""
+        if self.analytics_window is not None and self.analytics_window.winfo_exists():
+            self.analytics_window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Time Analytics")
+        window.geometry("900x600")
+        window.configure(bg=self.bg_color)
+        
+        controls = ttk.Frame(window)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.analytics_view = tk.StringVar(value="calendar")
+        for text, value in (("Daily", "calendar"), ("Weekly", "weekly"), ("Hour of Day", "hourly"),
+                            ("By Period", "periods")):
+            ttk.Radiobutton(
+                controls, text=text,
+                variable=self.analytics_view, value=value,
+                command=self.render_analytics
+            ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Refresh", command=self.load_analytics).pack(side=tk.RIGHT)
+        
+        self.analytics_label = ttk.Label(controls, text="Loading...")
+        self.analytics_label.pack(side=tk.LEFT, padx=15)
+        
+        self.analytics_window = window
+        self.analytics = None
+        self.analytics_canvas = None
+        
+        self.dispatcher.run(
+            load_chart_modules,
+            on_success=self.build_analytics_chart,
+            on_error=lambda e: window.winfo_exists() and self.analytics_label.config(text=f"Chart unavailable: {str(e)}")
+        )
+        self.load_analytics()
+    
+    def build_analytics_chart(self, modules):
+        """Add the matplotlib chart once its imports finish off the Tk thread"""
+        if not self.analytics_window.winfo_exists(): return
+        Figure, FigureCanvasTkAgg, _ = modules
+        self.analytics_fig = Figure(figsize=(8, 5), dpi=100, facecolor=self.secondary_color)
+        self.analytics_canvas = FigureCanvasTkAgg(self.analytics_fig, self.analytics_window)
+        self.analytics_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        time_canvas_draws(self.analytics_canvas, "analytics")
+        self.render_analytics()
+    
+    def load_analytics(self):
+        """Fetch raw intervals for the chart's period and bin them in the background"""
+        period = self.get_selected_period()
+        params = {"period_id": period.id} if period else None
+        title = period.name if period else "All Time"
+        
+        def compute():
+            import analytics  # NumPy is only loaded once analytics are opened
+            columns = self.backend.cached_get("/intervals", params)
+            groups = self.backend.cached_get("/groups")
+            periods = self.backend.cached_get("/periods")
+            return analytics.summarize(columns, groups, periods)
+        
+        def on_loaded(summary):
+            if not self.analytics_window.winfo_exists(): return
+            self.analytics = summary
+            self.analytics_label.config(
+                text=f"{title}: {summary['total_hours']:.1f}h over {summary['entries']} sessions, "
+                     f"{summary['hours_per_week']:.1f}h per week"
+            )
+            self.render_analytics()
+        
+        def on_error(e):
+            if self.analytics_window.winfo_exists():
+                self.analytics_label.config(text=f"Failed to load analytics: {str(e)}")
+        
+        self.dispatcher.run(compute, on_success=on_loaded, on_error=on_error, view="analytics")
+    
+    def render_analytics(self):
+        summary = self.analytics
+        if summary is None or self.analytics_canvas is None: return
+        from analytics import WEEKDAYS
+        
+        fig = self.analytics_fig
+        fig.clear()
+        ax = fig.add_subplot(111)
+        ax.set_facecolor(self.secondary_color)
+        ax.tick_params(colors=self.fg_color)
+        view = self.analytics_view.get()
+        
+        if not summary["entries"]:
+            ax.text(0.5, 0.5, "No data available", ha="center", va="center",
+                    color=self.fg_color, transform=ax.transAxes)
+        elif view == "calendar":
+            # One column per week, one row per weekday
+            weeks = summary["calendar_weeks"]
+            image = ax.imshow(summary["calendar_hours"], aspect="auto", cmap="viridis",
+                              interpolation="nearest")
+            ax.set_yticks(range(7), WEEKDAYS)
+            step = max(1, len(weeks) // 12)
+            ax.set_xticks(range(0, len(weeks), step), [str(week) for week in weeks[::step]],
+                          rotation=45, ha="right")
+            ax.set_title("Hours per Day", color=self.fg_color)
+            fig.colorbar(image, ax=ax).ax.tick_params(colors=self.fg_color)
+        elif view == "weekly":
+            # Stacked bars, one segment per group
+            weeks = summary["weeks"]
+            hours = summary["weekly_hours"]
+            positions = range(len(weeks))
+            bottom = None
+            for column, label in enumerate(summary["week_labels"]):
+                ax.bar(positions, hours[:, column], bottom=bottom, label=label)
+                bottom = hours[:, column] if bottom is None else bottom + hours[:, column]
+            step = max(1, len(weeks) // 12)
+            ax.set_xticks(range(0, len(weeks), step), [str(week) for week in weeks[::step]],
+                          rotation=45, ha="right")
+            ax.set_ylabel("Hours", color=self.fg_color)
+            ax.set_title("Hours per Week by Group", color=self.fg_color)
+            ax.legend(fontsize=8)
+        elif view == "periods":
+            # Overlapping periods each count the sessions they contain
+            labels = summary["period_labels"]
+            ax.barh(range(len(labels)), summary["period_hours"], color="#1f78b4")
+            ax.set_yticks(range(len(labels)), labels)
+            ax.invert_yaxis()
+            ax.set_xlabel("Hours", color=self.fg_color)
+            ax.set_title("Hours per Academic Period", color=self.fg_color)
+        else:
+            image = ax.imshow(summary["hourly_hours"], aspect="auto", cmap="viridis",
+                              interpolation="nearest")
+            ax.set_yticks(range(7), WEEKDAYS)
+            ax.set_xticks(range(0, 24, 2))
+            ax.set_xlabel("Hour of day", color=self.fg_color)
+            ax.set_title("Hours by Weekday and Hour", color=self.fg_color)
+            fig.colorbar(image, ax=ax).ax.tick_params(colors=self.fg_color)
+        
+        fig.tight_layout()
+        self.analytics_canvas.draw_idle()
+
+    def open_reports(self):
+        """Window for generating PDF/HTML reports of academic periods"""
+        if self.reports_window is not None and self.reports_window.winfo_exists():
+            self.reports_window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Period Reports")
+        window.geometry("700x450")
+        window.configure(bg=self.bg_color)
+        self.reports_window = window
+        
+        controls = ttk.Frame(window)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(controls, text="Periods:").pack(side=tk.LEFT, anchor=tk.N)
+        self.report_periods = sorted(self.store.periods.values(),
+                                     key=lambda period: (period.start_date, period.id))
+        self.report_period_list = tk.Listbox(controls, selectmode=tk.EXTENDED, height=6,
+                                             exportselection=False)
+        self.report_period_list.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.report_period_list.insert(tk.END, "All Time")
+        for period in self.report_periods:
+            self.report_period_list.insert(tk.END, f"{period.name} ({period.start_date} to {period.end_date})")
+        
+        options = ttk.Frame(controls)
+        options.pack(side=tk.LEFT, anchor=tk.N)
+        self.report_pdf = tk.BooleanVar(value=True)
+        self.report_html = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options, text="PDF", variable=self.report_pdf).pack(anchor=tk.W)
+        ttk.Checkbutton(options, text="HTML", variable=self.report_html).pack(anchor=tk.W)
+        ttk.Button(options, text="Generate", command=self.generate_reports).pack(pady=5)
+        
+        self.report_tree = ttk.Treeview(window, columns=("report", "format", "status", "file"),
+                                        show="headings")
+        self.report_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.report_sync = TreeSync(self.report_tree, "reports")
+        for column, text, width in (("report", "Report", 150), ("format", "Format", 60),
+                                    ("status", "Status", 130), ("file", "File", 320)):
+            self.report_tree.heading(column, text=text)
+            self.report_tree.column(column, width=width, anchor=tk.W if column in ("report", "file") else tk.CENTER)
+        self.report_tree.bind("<Double-1>", self.on_report_double_click)
+        self.render_report_jobs()
+    
+    def generate_reports(self):
+        """Collect each selected period's totals, then render its files in worker processes"""
+        selected = self.report_period_list.curselection()
+        extensions = [extension for extension, var in ((".pdf", self.report_pdf), (".html", self.report_html))
+                      if var.get()]
+        if not selected or not extensions:
+            messagebox.showwarning("Warning", "Please select at least one period and format",
+                                   parent=self.reports_window)
+            return
+        directory = filedialog.askdirectory(
+            title="Save Reports To", parent=self.reports_window,
+            initialdir=reports.REPORT_DIR if os.path.isdir(reports.REPORT_DIR) else None
+        )
+        if not directory:
+            return
+        
+        for index in selected:
+            period = self.report_periods[index - 1] if index else None
+            jobs = [{"id": str(len(self.report_jobs) + i), "title": period.name if period else "All Time",
+                     "extension": extension, "status": "Collecting", "path": "", "future": None}
+                    for i, extension in enumerate(extensions)]
+            self.report_jobs.extend(jobs)
+            self.dispatcher.run(
+                lambda period=period: reports.collect(self.backend, period),
+                on_success=lambda report, jobs=jobs: self.start_rendering(report, jobs, directory),
+                on_error=lambda e, jobs=jobs: self.finish_report_jobs(jobs, f"Failed: {str(e)}")
+            )
+        self.render_report_jobs()
+    
+    def start_rendering(self, report, jobs, directory):
+        for job in jobs:
+            job["path"] = os.path.join(directory, reports.report_filename(report, job["extension"]))
+            try:
+                job["future"] = self.report_pool.submit(report, job["path"])
+            except Exception as e:
+                metrics.error("reports", e)
+                job["status"] = f"Failed: {str(e)}"
+                continue
+            job["status"] = "Rendering"
+            job["started"] = time.perf_counter()
+        self.render_report_jobs()
+        if self.report_poll_id is None:
+            self.report_poll_id = self.root.after(REPORT_POLL_MS, self.poll_reports)
+    
+    def finish_report_jobs(self, jobs, status):
+        for job in jobs:
+            job["status"] = status
+        self.render_report_jobs()
+    
+    def poll_reports(self):
+        """Pick up reports the worker processes have finished"""
+        self.report_poll_id = None
+        rendering = False
+        for job in self.report_jobs:
+            future = job["future"]
+            if future is None or job["status"] != "Rendering":
+                continue
+            if not future.done():
+                rendering = True
+                continue
+            try:
+                pages = future.result()
+            except Exception as e:
+                metrics.error("reports", e)
+                job["status"] = f"Failed: {str(e)}"
+            else:
+                metrics.record("report", job["extension"].lstrip("."),
+                               (time.perf_counter() - job["started"]) * 1000, pages)
+                job["status"] = f"Done ({pages} {'pages' if job['extension'] == '.pdf' else 'sections'})"
+        self.render_report_jobs()
+        if rendering:
+            self.report_poll_id = self.root.after(REPORT_POLL_MS, self.poll_reports)
+    
+    def render_report_jobs(self):
+        if self.reports_window is None or not self.reports_window.winfo_exists(): return
+        self.report_sync.sync(
+            (job["id"], "", (job["title"], job["extension"].lstrip(".").upper(), job["status"], job["path"]))
+            for job in self.report_jobs
+        )
+    
+    def on_report_double_click(self, event):
+        """Open a finished report in the default viewer"""
+        iid = self.report_tree.identify_row(event.y)
+        if not iid: return
+        job = self.report_jobs[int(iid)]
+        if job["status"].startswith("Done"):
+            webbrowser.open(Path(job["path"]).resolve().as_uri())
+
+    def open_search(self):
+        """Search window: notes, task and group names, updated while typing"""
+        if self.search_window is not None and self.search_window.winfo_exists():
+            self.search_window.lift()
+            self.search_entry.focus_set()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Search")
+        window.geometry("800x500")
+        window.configure(bg=self.bg_color)
+        self.search_window = window
+        
+        controls = ttk.Frame(window)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        self.search_text = tk.StringVar()
+        self.search_entry = ttk.Entry(controls, textvariable=self.search_text)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_kind = tk.StringVar(value="All")
+        ttk.Combobox(controls, textvariable=self.search_kind, values=list(SEARCH_KINDS),
+                     state="readonly", width=8).pack(side=tk.LEFT, padx=5)
+        self.search_status = ttk.Label(controls, text="", width=16)
+        self.search_status.pack(side=tk.LEFT)
+        
+        results_frame = ttk.Frame(window)
+        results_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.search_scroll = ttk.Scrollbar(results_frame)
+        self.search_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.search_tree = ttk.Treeview(results_frame, columns=("kind", "name", "match", "date", "duration"),
+                                        show="headings", yscrollcommand=self.on_search_scroll)
+        self.search_tree.pack(fill=tk.BOTH, expand=True)
+        self.search_scroll.config(command=self.search_tree.yview)
+        self.search_sync = TreeSync(self.search_tree, "search")
+        for column, text, width in (("kind", "Type", 60), ("name", "Group / Task", 200),
+                                    ("match", "Match", 360), ("date", "Date", 90),
+                                    ("duration", "Duration", 80)):
+            self.search_tree.heading(column, text=text)
+            self.search_tree.column(column, width=width, anchor=tk.W if column in ("name", "match") else tk.CENTER)
+        self.search_tree.bind("<Double-1>", self.on_search_double_click)
+        
+        self.search_results = []
+        self.search_next_offset = None
+        self.search_after_id = None
+        self.search_text.trace_add("write", lambda *args: self.schedule_search())
+        self.search_kind.trace_add("write", lambda *args: self.schedule_search())
+        self.search_entry.focus_set()
+    
+    def schedule_search(self):
+        """Search once typing pauses instead of on every keystroke"""
+        if self.search_after_id is not None:
+            self.search_window.after_cancel(self.search_after_id)
+        self.search_after_id = self.search_window.after(SEARCH_DEBOUNCE_MS, self.run_search)
+    
+    def search_params(self, offset=0):
+        params = {"q": self.search_text.get(), "limit": SEARCH_PAGE_SIZE, "offset": offset}
+        kind = SEARCH_KINDS[self.search_kind.get()]
+        if kind:
+            params["kind"] = kind
+        return params
+    
+    def run_search(self):
+        self.search_after_id = None
+        self.dispatcher.cancel("search_more")
+        if not self.search_text.get().strip():
+            self.dispatcher.cancel("search")
+            self.render_search([], None)
+            return
+        self.search_status.config(text="Searching...")
+        params = self.search_params()
+        self.dispatcher.run(
+            lambda: self.backend.get("/search", params=params),
+            on_success=lambda page: self.render_search(page["results"], page["next_offset"]),
+            on_error=lambda e: self.search_status.config(text="Search failed"),
+            view="search"
+        )
+    
+    def on_search_scroll(self, first, last):
+        """Scrollbar callback for the results; loads the next page near the bottom"""
+        self.search_scroll.set(first, last)
+        if float(last) >= 0.95 and self.search_next_offset is not None:
+            offset, self.search_next_offset = self.search_next_offset, None
+            params = self.search_params(offset)
+            self.dispatcher.run(
+                lambda: self.backend.get("/search", params=params),
+                on_success=lambda page: self.render_search(
+                    self.search_results + page["results"], page["next_offset"]),
+                on_error=lambda e: self.search_status.config(text="Search failed"),
+                view="search_more"
+            )
+    
+    def render_search(self, results, next_offset):
+        if not self.search_window.winfo_exists(): return
+        self.search_results = results
+        self.search_next_offset = next_offset
+        rows = []
+        for i, result in enumerate(results):
+            name = " / ".join(part for part in (result["group_name"], result["task_name"]) if part)
+            duration = result["duration"]
+            rows.append((str(i), "", (
+                {"entry": "Note", "task": "Task", "group": "Group"}[result["kind"]],
+                name,
+                result["snippet"] if result["kind"] == "entry" else "",
+                (result["start_time"] or "")[:10],
+                format_elapsed(duration) if duration is not None else ""
+            )))
+        self.search_sync.sync(rows)
+        more = "+" if next_offset is not None else ""
+        if results:
+            self.search_status.config(text=f"{len(results)}{more} results")
+        else:
+            self.search_status.config(text="No matches" if self.search_text.get().strip() else "")
+    
+    def on_search_double_click(self, event):
+        """Show the group and task of a result in the main window"""
+        iid = self.search_tree.identify_row(event.y)
+        if not iid: return
+        result = self.search_results[int(iid)]
+        group_iid = str(result["group_id"])
+        if result["group_id"] is None or not self.group_tree.exists(group_iid): return
+        
+        self.pending_task_selection = result["task_id"]
+        if self.group_tree.selection() == (group_iid,):
+            self.select_pending_task()
+        else:
+            self.group_tree.selection_set(group_iid)
+        self.group_tree.see(group_iid)
+        self.root.lift()
+
+    def open_diagnostics(self):
+        """Show request, render and draw timings, counters and recent errors"""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.geometry("900x600")
+        window.configure(bg=self.bg_color)
+        
+        controls = ttk.Frame(window)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Button(controls, text="Export JSON", command=self.export_diagnostics).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Reset", command=lambda: (metrics.reset(), self.refresh_diagnostics())).pack(side=tk.LEFT, padx=5)
+        self.profile_btn = ttk.Button(controls, command=self.toggle_profiler,
+                                      text="Stop Profiling" if self.profiler.running else "Start Profiling")
+        self.profile_btn.pack(side=tk.LEFT)
+        self.diagnostics_label = ttk.Label(controls, text="")
+        self.diagnostics_label.pack(side=tk.LEFT, padx=15)
+        
+        # Request = network time, job = background work, ui/render/draw = main thread
+        columns = ("category", "name", "count", "mean", "p50", "p95", "max", "size")
+        self.diagnostics_tree = ttk.Treeview(window, columns=columns, show="headings", height=14)
+        self.diagnostics_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.diagnostics_sync = TreeSync(self.diagnostics_tree, "diagnostics")
+        for column, text, width in (("category", "Category", 80), ("name", "Name", 220),
+                                    ("count", "Count", 60), ("mean", "Mean ms", 80),
+                                    ("p50", "p50 ms", 80), ("p95", "p95 ms", 80),
+                                    ("max", "Max ms", 80), ("size", "Avg Size", 80)):
+            self.diagnostics_tree.heading(column, text=text)
+            self.diagnostics_tree.column(column, width=width, anchor=tk.W if column == "name" else tk.CENTER)
+        
+        self.diagnostics_text = tk.Text(window, height=12, bg=self.secondary_color, fg=self.fg_color,
+                                        font=("Consolas", 9), relief="flat")
+        self.diagnostics_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.diagnostics_window = window
+        self.refresh_diagnostics()
+    
+    def refresh_diagnostics(self):
+        """Redraw the diagnostics window, then again every second while it is open"""
+        if not self.diagnostics_window.winfo_exists(): return
+        snapshot = metrics.snapshot()
+        self.diagnostics_sync.sync(
+            (f"{row['category']}|{row['name']}", "", (
+                row["category"], row["name"], row["count"], f"{row['mean_ms']:.1f}",
+                f"{row['p50_ms']:.1f}", f"{row['p95_ms']:.1f}", f"{row['max_ms']:.1f}",
+                "" if row["mean_size"] is None else f"{row['mean_size']:,.0f}"
+            ))
+            for row in snapshot["series"]
+        )
+        
+        lines = ["Start-up: " + self.startup.summary(), ""]
+        lines += [f"{name}: {value:,}" for name, value in snapshot["counters"].items()]
+        lines += ["", "Recent errors:"]
+        lines += [f"{error['time']}  {error['source']}: {error['error']}"
+                  for error in reversed(snapshot["errors"])] or ["(none)"]
+        if self.profiler.stats is not None and not self.profiler.running:
+            lines += ["", "Last profile (UI thread):", self.profiler.summary(20)]
+        
+        # Keep the scroll position while the text is replaced
+        position = self.diagnostics_text.yview()[0]
+        self.diagnostics_text.delete("1.0", tk.END)
+        self.diagnostics_text.insert("1.0", "\n".join(lines))
+        self.diagnostics_text.yview_moveto(position)
+        self.diagnostics_label.config(text=f"Since {snapshot['since']}")
+        self.diagnostics_window.after(1000, self.refresh_diagnostics)
+    
+    def export_diagnostics(self):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json")],
+            title="Export Diagnostics"
+        )
+        if not file_path: return
+        try:
+            metrics.export(file_path, {"startup": [
+                {"phase": name, "at_ms": round(at, 1)} for name, at, _ in self.startup.phases()
+            ]})
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export diagnostics: {str(e)}")
+    
+    def toggle_profiler(self):
+        """Start or stop profiling the UI thread; a finished capture can be saved as .prof"""
+        if not self.profiler.running:
+            self.profiler.start()
+            self.profile_btn.config(text="Stop Profiling")
+            return
+        
+        self.profiler.stop()
+        self.profile_btn.config(text="Start Profiling")
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".prof",
+            filetypes=[("Profile data", "*.prof")],
+            title="Save Profile (cancel to only view the summary)"
+        )
+        if file_path:
+            try:
+                self.profiler.save(file_path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to save profile: {str(e)}")
+        self.refresh_diagnostics()
+
     def manage_periods(self):
         """Open academic period management window"""
         period_window = tk.Toplevel(self.root)
@@ -565,6 +1455,7 @@ class TimeTrackerApp:
         columns = ("id", "name", "start_date", "end_date")
         self.period_tree = ttk.Treeview(period_window, columns=columns, show="headings", height=15)
         self.period_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.period_sync = TreeSync(self.period_tree, "periods")
         
         self.period_tree.heading("id", text="ID")
         self.period_tree.heading("name", text="Name")
@@ -582,32 +1473,34 @@ class TimeTrackerApp:
 
     def load_periods(self):
         """Load academic periods from server"""
-        try:
-            response = requests.get(f"{BASE_URL}/periods")
-            response.raise_for_status()
-            
-            # Clear existing data
-            for item in self.period_tree.get_children():
-                self.period_tree.delete(item)
-                
-            self.periods = {}
-            period_names = ["All Time"]  # Add "All Time" option
-            
-            for period in response.json():
-                self.period_tree.insert("", "end", values=(
-                    period["id"],
-                    period["name"],
-                    period["start_date"],
-                    period["end_date"]
-                ))
-                # Store entire period object
-                self.periods[period["id"]] = period
-                period_names.append(period["name"])
-            
-            # Update combobox
-            self.period_combo["values"] = period_names
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load periods: {str(e)}")
+        self.fetch(
+            "/periods",
+            on_success=self.render_periods,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load periods: {str(e)}"),
+            view="periods"
+        )
+
+    def render_periods(self, periods):
+        self.update_period_choices(periods)
+        self.period_sync.sync(
+            (period.id, "", (
+                period.id,
+                period.name,
+                period.start_date,
+                period.end_date
+            ))
+            for period in self.store.periods.values()
+        )
+
+    def update_period_choices(self, periods):
+        """Refill the chart's period box"""
+        period_names = ["All Time"]  # Add "All Time" option
+        period_names.extend(period.name for period in self.store.set_periods(periods))
+        
+        # Update combobox
+        self.period_combo["values"] = period_names
+        if not self.period_var.get():
+            self.period_var.set("All Time")
 
     def add_period(self):
         """Add a new academic period"""
@@ -636,17 +1529,21 @@ class TimeTrackerApp:
                 messagebox.showwarning("Warning", "All fields are required")
                 return
                 
-            try:
-                response = requests.post(f"{BASE_URL}/periods", json={
+            def on_saved(_):
+                dialog.destroy()
+                if self.change_feed.connected: return  # the new row arrives from the feed
+                self.backend.invalidate("/periods")
+                self.load_periods()
+            
+            self.dispatcher.run(
+                lambda: self.backend.post("/periods", {
                     "name": name,
                     "start_date": start,
                     "end_date": end
-                })
-                response.raise_for_status()
-                self.load_periods()
-                dialog.destroy()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to add period: {str(e)}")
+                }),
+                on_success=on_saved,
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to add period: {str(e)}")
+            )
                 
         ttk.Button(dialog, text="Save", command=save_period).grid(row=3, column=0, columnspan=2, pady=10)
 
@@ -662,14 +1559,16 @@ class TimeTrackerApp:
         group = self.get_selected_group()
         if not group: return
         
-        if messagebox.askyesno("Confirm", f"Delete group '{group['name']}'? This will delete all its tasks and time entries!"):
-            try:
-                response = requests.delete(f"{BASE_URL}/groups/{group['id']}")
-                response.raise_for_status()
+        if messagebox.askyesno("Confirm", f"Delete group '{group.name}'? This will delete all its tasks and time entries!"):
+            def on_deleted(_):
+                self.backend.invalidate("/groups")
+                self.backend.invalidate("/tasks", group_id=group.id)
+                self.backend.invalidate_aggregates()
                 self.load_groups()
                 self.update_visualization()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete group: {str(e)}")
+            
+            self.group_sync.remove(group.id)
+            self.journal_write("DELETE", f"/groups/{group.id}", on_synced=on_deleted)
 
     def show_task_context_menu(self, event):
         selection = self.task_list.selection()
@@ -684,14 +1583,15 @@ class TimeTrackerApp:
         if not task: return
         
         if messagebox.askyesno("Confirm", "Delete this task and all its time entries?"):
-            try:
-                response = requests.delete(f"{BASE_URL}/tasks/{task['id']}")
-                response.raise_for_status()
+            def on_deleted(_):
+                self.invalidate_task(task)
                 self.load_tasks()
-                self.load_history()
                 self.update_visualization()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete task: {str(e)}")
+            
+            # The deleted task's history must not be rendered if it is still loading
+            self.dispatcher.cancel("history")
+            self.task_sync.remove(task.id)
+            self.journal_write("DELETE", f"/tasks/{task.id}", on_synced=on_deleted)
 
     def show_history_context_menu(self, event):
         selection = self.history_tree.selection()
@@ -705,16 +1605,19 @@ class TimeTrackerApp:
         selection = self.history_tree.selection()
         if not selection: return
         
-        entry_id = self.history_tree.item(selection[0])["values"][0]  # Hidden ID
+        entry_id = int(selection[0])  # rows are keyed by entry id
+        task = self.get_selected_task(show_warning=False)
+        
         if messagebox.askyesno("Confirm", "Delete this time entry?"):
-            try:
-                response = requests.delete(f"{BASE_URL}/time_entries/{entry_id}")
-                response.raise_for_status()
+            def on_deleted(_):
+                self.invalidate_task(task)
                 self.load_history()
                 self.load_tasks()
                 self.update_visualization()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete time entry: {str(e)}")
+            
+            self.history.remove(entry_id)
+            self.history_sync.remove(entry_id)
+            self.journal_write("DELETE", f"/time_entries/{entry_id}", on_synced=on_deleted)
 
     def show_period_context_menu(self, event):
         selection = self.period_tree.selection()
@@ -728,95 +1631,119 @@ class TimeTrackerApp:
         selection = self.period_tree.selection()
         if not selection: return
         
-        period_id = self.period_tree.item(selection[0])["values"][0]
-        period_name = self.period_tree.item(selection[0])["values"][1]
+        period = self.store.periods.get(int(selection[0]))
+        if not period: return
         
-        if messagebox.askyesno("Confirm", f"Delete period '{period_name}'?"):
-            try:
-                response = requests.delete(f"{BASE_URL}/periods/{period_id}")
-                response.raise_for_status()
+        if messagebox.askyesno("Confirm", f"Delete period '{period.name}'?"):
+            def on_deleted(_):
+                self.backend.invalidate("/periods")
                 self.load_periods()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete period: {str(e)}")
+            
+            self.period_sync.remove(period.id)
+            self.journal_write("DELETE", f"/periods/{period.id}", on_synced=on_deleted)
 
-    def get_selected_task(self):
+    def get_selected_task(self, show_warning=True):
         selection = self.task_list.selection()
         if not selection: 
-            messagebox.showwarning("Warning", "No task selected")
+            if show_warning:
+                messagebox.showwarning("Warning", "No task selected")
             return None
-        return {
-            "id": self.task_list.item(selection[0])["values"][0]
-        }
+        return self.store.task(selection[0])
 
     def backup_database(self):
-        """Create a backup of the database file"""
-        try:
-            # Create backups directory if it doesn't exist
-            backup_dir = "backups"
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
-            
-            # Generate timestamped filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(backup_dir, f"database_backup_{timestamp}.db")
-            
-            # Copy the database file
-            shutil.copyfile("database.db", backup_file)
-            messagebox.showinfo("Backup Successful", f"Database backup created:\n{backup_file}")
-        except Exception as e:
-            messagebox.showerror("Backup Failed", f"Error creating backup: {str(e)}")
+        """Download an online backup of the server's database"""
+        dialog = ProgressDialog(self.root, "Backing Up Database", unit="pages")
+        
+        def on_done(file_path):
+            dialog.close()
+            messagebox.showinfo("Backup Successful", f"Database backup created:\n{file_path}")
+        
+        def on_error(e):
+            dialog.close()
+            if not isinstance(e, backup.BackupCancelled):
+                messagebox.showerror("Backup Failed", f"Error creating backup: {str(e)}")
+        
+        self.dispatcher.run(
+            lambda: backup.backup(self.backend, progress=dialog.progress, cancelled=dialog.cancelled),
+            on_success=on_done,
+            on_error=on_error
+        )
 
     def restore_database(self):
         """Restore database from a backup file"""
-        try:
-            # Ask user to select backup file
-            file_path = filedialog.askopenfilename(
-                title="Select Backup File",
-                filetypes=[("Database files", "*.db"), ("All files", "*.*")]
-            )
-            if not file_path:
-                return
-                
-            # Confirm restore operation
-            if not messagebox.askyesno("Confirm Restore", 
-                                      "This will replace your current database.\n"
-                                      "Make sure the server is not running!\n\n"
-                                      "Continue?"):
-                return
-                
-            # Close server connection if possible
-            try:
-                requests.get(f"{BASE_URL}/shutdown", timeout=1)
-            except:
-                pass
-                
-            # Wait a moment for server to shut down
-            time.sleep(1)
-            
-            # Replace database file
-            shutil.copyfile(file_path, "database.db")
-            
-            # Restart server
-            threading.Thread(target=self.start_server).start()
-            
-            # Wait for server to start
-            time.sleep(1)
+        # Ask user to select backup file
+        file_path = filedialog.askopenfilename(
+            title="Select Backup File",
+            initialdir=backup.BACKUP_DIR if os.path.isdir(backup.BACKUP_DIR) else None,
+            filetypes=[("Database files", "*.db"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
             
+        # Confirm restore operation
+        if not messagebox.askyesno("Confirm Restore", 
+                                  "This will replace the database on the server with the backup.\n"
+                                  "Changes made since the backup will be lost.\n\n"
+                                  "Continue?"):
+            return
+        
+        dialog = ProgressDialog(self.root, "Restoring Database", unit="KB")
+        
+        def on_restored(_):
+            dialog.close()
             # Reload all data
-            self.load_groups()
-            self.load_periods()
-            self.update_visualization()
+            self.backend.cache.clear()
+            self.load_snapshot()
+            if hasattr(self, "period_tree") and self.period_tree.winfo_exists():
+                self.load_periods()
             
             messagebox.showinfo("Restore Successful", "Database restored successfully!")
-        except Exception as e:
-            messagebox.showerror("Restore Failed", f"Error restoring database: {str(e)}")
+        
+        def on_error(e):
+            dialog.close()
+            if not isinstance(e, backup.BackupCancelled):
+                messagebox.showerror("Restore Failed", f"Error restoring database: {str(e)}")
+        
+        self.dispatcher.run(
+            lambda: backup.restore(self.backend, file_path, dialog.progress, dialog.cancelled),
+            on_success=on_restored,
+            on_error=on_error
+        )
 
-    def start_server(self):
-        """Start the Node.js server"""
-        try:
-            os.system("node server.js")
-        except Exception as e:
-            print(f"Error starting server: {e}")
+    def import_entries(self):
+        """Import completed time entries from a CSV or ICS file"""
+        file_path = filedialog.askopenfilename(
+            title="Import Time Entries",
+            filetypes=[("CSV or calendar files", "*.csv *.ics"), ("CSV files", "*.csv"),
+                       ("Calendar files", "*.ics"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        dialog = ProgressDialog(self.root, "Importing Entries", unit="lines")
+        
+        def on_done(summary):
+            dialog.close()
+            self.backend.cache.clear()
+            self.load_snapshot()
+            
+            message = (f"Imported {summary['inserted']:,} entries "
+                       f"({summary['groups_created']} new groups, {summary['tasks_created']} new tasks).\n"
+                       f"Skipped {summary['duplicates']:,} duplicates and {summary['invalid']:,} invalid rows.")
+            if summary["errors"]:
+                message += "\n\n" + "\n".join(f"Line {line}: {error}" for line, error in summary["errors"][:10])
+            messagebox.showinfo("Import Finished", message)
+        
+        def on_error(e):
+            dialog.close()
+            if not isinstance(e, importer.ImportCancelled):
+                messagebox.showerror("Import Failed", f"Error importing entries: {str(e)}")
+        
+        self.dispatcher.run(
+            lambda: importer.import_file(self.backend, file_path, dialog.progress, dialog.cancelled),
+            on_success=on_done,
+            on_error=on_error
+        )
 
     def export_csv(self):
         """Export all data to CSV file"""
@@ -827,63 +1754,115 @@ class TimeTrackerApp:
         )
         if not file_path:
             return
-            
-        try:
-            # Get all data from server
-            groups = requests.get(f"{BASE_URL}/groups").json()
-            tasks = requests.get(f"{BASE_URL}/all_tasks").json()
-            time_entries = requests.get(f"{BASE_URL}/all_time_entries").json()
-            periods = requests.get(f"{BASE_URL}/periods").json()
-            
-            # Write to CSV
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write groups
-                writer.writerow(["Groups"])
-                writer.writerow(["ID", "Name"])
-                for group in groups:
-                    writer.writerow([group["id"], group["name"]])
-                
-                # Write separator
-                writer.writerow([])
-                writer.writerow(["Tasks"])
-                writer.writerow(["ID", "Name", "Group ID"])
-                for task in tasks:
-                    writer.writerow([task["id"], task["name"], task["group_id"]])
-                
-                # Write separator
-                writer.writerow([])
-                writer.writerow(["Time Entries"])
-                writer.writerow(["ID", "Task ID", "Start Time", "End Time", "Duration", "Note", "Period ID"])
-                for entry in time_entries:
-                    writer.writerow([
-                        entry["id"],
-                        entry["task_id"],
-                        entry["start_time"],
-                        entry["end_time"],
-                        entry["duration"],
-                        entry.get("note", ""),
-                        entry.get("period_id", "")
-                    ])
-                
-                # Write separator
-                writer.writerow([])
-                writer.writerow(["Academic Periods"])
-                writer.writerow(["ID", "Name", "Start Date", "End Date"])
-                for period in periods:
-                    writer.writerow([
-                        period["id"],
-                        period["name"],
-                        period["start_date"],
-                        period["end_date"]
-                    ])
-            
+        
+        dialog = ProgressDialog(self.root, "Exporting Database")
+        
+        def write_export():
+            # Rows are streamed from the server and written as they arrive
+            records = export.stream_records(self.backend, dialog.progress)
+            try:
+                export.write_csv(records, file_path, dialog.progress, dialog.cancelled)
+            finally:
+                records.close()
+        
+        def on_done(_):
+            dialog.close()
             messagebox.showinfo("Export Successful", f"Database exported to:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("Export Failed", f"Error exporting database: {str(e)}")
+        
+        def on_error(e):
+            dialog.close()
+            if not isinstance(e, export.ExportCancelled):
+                messagebox.showerror("Export Failed", f"Error exporting database: {str(e)}")
+        
+        self.dispatcher.run(write_export, on_success=on_done, on_error=on_error)
+
+    def export_columnar(self):
+        """Export all data as typed Arrow IPC or Parquet files for analysis"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".arrow",
+            filetypes=[("Arrow IPC files", "*.arrow"), ("Parquet files", "*.parquet")],
+            title="Save Columnar Export"
+        )
+        if not file_path:
+            return
+        
+        single_file = messagebox.askyesnocancel(
+            "Export Layout",
+            "Write a single file with one row per time entry (including task and group names)?\n\n"
+            "Choose No to write one file per table."
+        )
+        if single_file is None:
+            return
+        
+        dialog = ProgressDialog(self.root, "Exporting Database")
+        
+        def write_export():
+            records = export.stream_records(self.backend, dialog.progress)
+            try:
+                export.write_columnar(records, file_path, single_file, dialog.progress, dialog.cancelled)
+            finally:
+                records.close()
+        
+        def on_done(_):
+            dialog.close()
+            written = "\n".join(export.columnar_paths(file_path, single_file).values())
+            messagebox.showinfo("Export Successful", f"Database exported to:\n{written}")
+        
+        def on_error(e):
+            dialog.close()
+            if not isinstance(e, export.ExportCancelled):
+                messagebox.showerror("Export Failed", f"Error exporting database: {str(e)}")
+        
+        self.dispatcher.run(write_export, on_success=on_done, on_error=on_error)
+
+
+class ProgressDialog:
+    """Small modal window with a progress bar and a Cancel button
+
+    Worker threads only update the shared Progress counters and the cancelled
+    event; the dialog polls them from the Tk loop.
+    """
+    
+    def __init__(self, root, title, unit="rows", poll_interval=100):
+        self.progress = export.Progress()
+        self.unit = unit
+        self.cancelled = threading.Event()
+        self.poll_interval = poll_interval
+        
+        self.window = tk.Toplevel(root)
+        self.window.title(title)
+        self.window.geometry("360x120")
+        self.window.transient(root)
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+        
+        self.label = ttk.Label(self.window, text="Starting...")
+        self.label.pack(padx=10, pady=(15, 5))
+        self.bar = ttk.Progressbar(self.window, mode="determinate", length=320)
+        self.bar.pack(padx=10, pady=5)
+        ttk.Button(self.window, text="Cancel", command=self.cancel).pack(pady=5)
+        
+        self._poll()
+    
+    def cancel(self):
+        self.cancelled.set()
+        self.label.config(text="Cancelling...")
+    
+    def close(self):
+        if self.window.winfo_exists():
+            self.window.destroy()
+    
+    def _poll(self):
+        if not self.window.winfo_exists():
+            return
+        done, total = self.progress.done, self.progress.total
+        if total:
+            self.bar.config(maximum=total, value=min(done, total))
+            if not self.cancelled.is_set():
+                self.label.config(text=f"{done:,} of {total:,} {self.unit}")
+        self.window.after(self.poll_interval, self._poll)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # report workers in the packaged .exe
     root = tk.Tk()
     app = TimeTrackerApp(root)
     root.mainloop()
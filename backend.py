@@ -0,0 +1,343 @@
+"""
+Backend client for the Academic Time Tracker
+All HTTP traffic to the Node.js server goes through BackendClient so that
+connections are pooled and every call has a timeout. SimpleClient covers
+the few calls a CLI command makes with the standard library only.
+"""
+import http.client
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode, urlsplit
+
+from metrics import endpoint, metrics
+
+# Try to load configuration from config.py, fallback to defaults
+try:
+    import config
+except ImportError:
+    config = None
+
+
+def _setting(name, default):
+    return getattr(config, name, default) if config else default
+
+
+BASE_URL = _setting("BACKEND_URL", "http://192.168.2.19:5000")
+CONNECTION_TIMEOUT = _setting("CONNECTION_TIMEOUT", 3)
+READ_TIMEOUT = _setting("READ_TIMEOUT", 10)
+POOL_SIZE = _setting("POOL_SIZE", 8)
+MAX_RETRIES = _setting("MAX_RETRIES", 2)
+RETRY_BACKOFF = _setting("RETRY_BACKOFF", 0.3)
+CACHE_TTL = _setting("CACHE_TTL", 30)
+CACHE_SIZE = _setting("CACHE_SIZE", 256)
+HISTORY_PAGE_SIZE = _setting("HISTORY_PAGE_SIZE", 200)
+# The server sends a heartbeat every 20 s, so a silent change feed is dead
+EVENTS_READ_TIMEOUT = _setting("EVENTS_READ_TIMEOUT", 60)
+
+
+class BackendError(Exception):
+    """Raised when the backend cannot be reached or returns an error
+
+    status is the HTTP status code, or None if no response was received.
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of GET responses with a time-to-live
+
+    Entries are keyed by endpoint path and query parameters, so the task list
+    of one group can be invalidated without touching the others.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (path, params) -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path, params=None):
+        path = "/" + path.lstrip("/")
+        items = tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+        return path, items
+
+    def get(self, path, params=None):
+        key = self.key(path, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                metrics.count("cache misses")
+                return None
+            self._entries.move_to_end(key)
+        metrics.count("cache hits")
+        return entry[1]
+
+    def put(self, path, params, value):
+        key = self.key(path, params)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path, **params):
+        """Drop cached responses for a path whose params include all of the given ones"""
+        path, wanted = self.key(path, params)
+        wanted = set(wanted)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path and wanted.issubset(k[1])]:
+                del self._entries[key]
+
+    def update(self, path, func, **params):
+        """Patch cached responses in place
+
+        func(params, value) is called for each cached response of path whose
+        params include the given ones (params values are strings) and returns
+        the new value, or None to drop the entry. The entry keeps its expiry.
+        """
+        path, wanted = self.key(path, params)
+        wanted = set(wanted)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path and wanted.issubset(k[1])]:
+                expires_at, value = self._entries[key]
+                value = func(dict(key[1]), value)
+                if value is None:
+                    del self._entries[key]
+                else:
+                    self._entries[key] = (expires_at, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class BackendClient:
+    """Pooled, keep-alive HTTP client for the time tracker API"""
+
+    def __init__(self, base_url=BASE_URL, connect_timeout=CONNECTION_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, pool_size=POOL_SIZE,
+                 max_retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
+        # requests is only loaded once a client is made; it takes longer to
+        # import than a CLI command takes to run
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Connection failures are retried for every method because the request
+        # never reached the server. Read errors and 5xx responses are only
+        # retried for idempotent methods so a timer is never started twice.
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD", "DELETE"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.cache = ResponseCache()
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, timeout=None, **kwargs):
+        """Send a request and return the raw response, raising BackendError on failure"""
+        import requests
+        name = endpoint(method, path)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(path),
+                                            timeout=timeout or self.timeout,
+                                            **kwargs)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            metrics.record("request", name, (time.perf_counter() - start) * 1000)
+            metrics.count(f"request errors {name}")
+            raise BackendError(str(e), status) from e
+        # Streamed responses are timed up to the headers; size is the body length when known
+        length = response.headers.get("Content-Length")
+        metrics.record("request", name, (time.perf_counter() - start) * 1000,
+                       int(length) if length and length.isdigit() else None)
+        return response
+
+    def get(self, path, params=None, timeout=None):
+        return self.request("GET", path, params=params, timeout=timeout).json()
+
+    def cached_get(self, path, params=None):
+        """GET through the response cache"""
+        value = self.cache.get(path, params)
+        if value is None:
+            value = self.get(path, params=params)
+            self.cache.put(path, params, value)
+        return value
+
+    def peek(self, path, params=None):
+        """Return a cached response without touching the network, or None"""
+        return self.cache.get(path, params)
+
+    def invalidate(self, path, **params):
+        self.cache.invalidate(path, **params)
+
+    def invalidate_aggregates(self):
+        self.cache.invalidate("/time_by_group")
+        self.cache.invalidate("/time_by_task")
+        self.cache.invalidate("/intervals")
+
+    def snapshot(self, group_id=None, task_id=None, mode="group", period_id=None,
+                 limit=HISTORY_PAGE_SIZE):
+        """Fetch everything the main window shows in one request
+
+        Each part is stored in the cache under the key of the endpoint it
+        replaces, so the views rendered afterwards don't hit the network.
+        """
+        params = {"group_id": group_id, "task_id": task_id, "mode": mode,
+                  "period_id": period_id, "limit": limit}
+        snapshot = self.get("/snapshot", params={k: v for k, v in params.items() if v is not None})
+
+        self.cache.put("/groups", None, snapshot["groups"])
+        self.cache.put("/periods", None, snapshot["periods"])
+        if snapshot.get("tasks") is not None:
+            self.cache.put("/tasks", {"group_id": group_id}, snapshot["tasks"])
+        if snapshot.get("entries") is not None:
+            self.cache.put("/time_entries", {"task_id": task_id, "limit": limit}, snapshot["entries"])
+        if mode == "task":
+            self.cache.put("/time_by_task", {"group_id": group_id, "period_id": period_id},
+                           snapshot["aggregates"])
+        else:
+            self.cache.put("/time_by_group", {"period_id": period_id}, snapshot["aggregates"])
+        return snapshot
+
+    def iter_ndjson(self, path, params=None):
+        """Stream a newline-delimited JSON response one decoded object at a time"""
+        import requests
+        response = self.request("GET", path, params=params, stream=True)
+        try:
+            for line in response.iter_lines(chunk_size=64 * 1024):
+                if line:
+                    yield json.loads(line)
+        except requests.RequestException as e:
+            raise BackendError(str(e)) from e
+        finally:
+            response.close()
+
+    def iter_events(self, path, last_event_id=None, read_timeout=EVENTS_READ_TIMEOUT):
+        """Stream a server-sent events response as (id, event, data) tuples
+
+        data is the decoded JSON payload. Comments (heartbeats) are skipped.
+        """
+        headers = {"Accept": "text/event-stream"}
+        if last_event_id:
+            headers["Last-Event-ID"] = last_event_id
+        import requests
+        response = self.request("GET", path, stream=True, headers=headers,
+                                timeout=(self.timeout[0], read_timeout))
+        try:
+            event_id, event, data = None, "message", []
+            for line in response.iter_lines():
+                line = line.decode("utf-8")
+                if not line:
+                    # A blank line ends the event
+                    if data:
+                        yield event_id, event, json.loads("\n".join(data))
+                    event, data = "message", []
+                    continue
+                if line.startswith(":"):
+                    continue
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "id":
+                    event_id = value
+                elif field == "event":
+                    event = value
+                elif field == "data":
+                    data.append(value)
+        except requests.RequestException as e:
+            raise BackendError(str(e)) from e
+        finally:
+            response.close()
+
+    def post(self, path, payload=None, timeout=None):
+        return self.request("POST", path, json=payload, timeout=timeout).json()
+
+    def delete(self, path, timeout=None):
+        return self.request("DELETE", path, timeout=timeout).json()
+
+    def close(self):
+        self.session.close()
+
+
+class SimpleClient:
+    """Standard-library client for short-lived scripts such as the CLI
+
+    Keeps one connection open for the handful of calls a command makes.
+    There is no cache and no retrying; failures raise BackendError.
+    """
+
+    def __init__(self, base_url=BASE_URL, timeout=READ_TIMEOUT):
+        url = urlsplit(base_url.rstrip("/"))
+        connection = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.connection = connection(url.netloc, timeout=timeout)
+        self.prefix = url.path
+
+    def request(self, method, path, params=None, payload=None):
+        """Send a request and return the response, raising BackendError on failure"""
+        target = f"{self.prefix}/{path.lstrip('/')}"
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        if params:
+            target += "?" + urlencode(params)
+        body = json.dumps(payload) if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            self.connection.request(method, target, body, headers)
+            response = self.connection.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            self.connection.close()
+            raise BackendError(str(e)) from e
+        if response.status >= 400:
+            detail = response.read().decode("utf-8", "replace").strip()
+            raise BackendError(f"{response.status} {response.reason} for {method} {path}: {detail}",
+                               response.status)
+        return response
+
+    def get(self, path, params=None):
+        return json.load(self.request("GET", path, params))
+
+    def post(self, path, payload=None):
+        return json.load(self.request("POST", path, payload=payload))
+
+    def delete(self, path):
+        return json.load(self.request("DELETE", path))
+
+    def iter_ndjson(self, path, params=None):
+        """Stream a newline-delimited JSON response one decoded object at a time"""
+        response = self.request("GET", path, params)
+        try:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        except (OSError, http.client.HTTPException) as e:
+            self.connection.close()
+            raise BackendError(str(e)) from e
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,181 @@
+"""
+Database backup and restore
+The server takes backups online with SQLite's backup API and streams them
+gzip-compressed. After the first backup only the pages that changed since the
+previous one are downloaded and written over a copy of it, so every file in the
+backups folder is still a complete database that can be restored on its own.
+"""
+import hashlib
+import json
+import os
+import shutil
+import zlib
+from datetime import datetime
+
+import requests
+
+from backend import BackendError
+
+# Try to load configuration from config.py, fallback to defaults
+try:
+    import config
+except ImportError:
+    config = None
+
+BACKUP_DIR = getattr(config, "BACKUP_DIR", "backups")
+# Seconds to wait for the server while it takes the snapshot or restores one
+BACKUP_TIMEOUT = getattr(config, "BACKUP_TIMEOUT", 300)
+
+LATEST = "latest.json"  # id and file of the newest backup, the base of the next one
+UPLOAD_CHUNK_SIZE = 256 * 1024
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+class BackupCancelled(Exception):
+    """Raised when the user cancels a backup or restore in progress"""
+
+
+class _DigestMismatch(Exception):
+    """The rebuilt file differs from the server's snapshot"""
+
+
+def _latest(directory):
+    """(id, path) of the newest backup in directory, or (None, None)"""
+    try:
+        with open(os.path.join(directory, LATEST), encoding="utf-8") as f:
+            latest = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    path = os.path.join(directory, latest.get("file", ""))
+    if not latest.get("id") or not os.path.isfile(path):
+        return None, None
+    return latest["id"], path
+
+
+def _digest(file_path, page_size):
+    """SHA-1 of the SHA-1 of every page, as sent in X-Backup-Digest"""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                return digest.hexdigest()
+            digest.update(hashlib.sha1(page).digest())
+
+
+def _download(backend, file_path, base_id, base_path, progress, cancelled):
+    """Fetch one backup into file_path; returns its id"""
+    response = backend.request("GET", "/backup", params={"base": base_id} if base_id else None,
+                               stream=True, timeout=(backend.timeout[0], BACKUP_TIMEOUT))
+    partial = file_path + ".partial"
+    try:
+        headers = response.headers
+        page_size = int(headers["X-Backup-Page-Size"])
+        page_count = int(headers["X-Backup-Page-Count"])
+        pages = int(headers["X-Backup-Pages"])
+        if progress is not None:
+            progress.total = pages
+
+        # An incremental backup only has the pages that differ from the base
+        if headers.get("X-Backup-Base"):
+            shutil.copyfile(base_path, partial)
+        else:
+            open(partial, "wb").close()
+
+        record = 4 + page_size  # page number, then the page
+        buffer = bytearray()
+        received = 0
+        with open(partial, "r+b") as f:
+            for chunk in response.iter_content(chunk_size=UPLOAD_CHUNK_SIZE):
+                buffer += chunk
+                complete = len(buffer) - len(buffer) % record
+                view = memoryview(buffer)
+                for offset in range(0, complete, record):
+                    page = int.from_bytes(view[offset:offset + 4], "big")
+                    f.seek((page - 1) * page_size)
+                    f.write(view[offset + 4:offset + record])
+                view.release()
+                del buffer[:complete]
+
+                received += complete // record
+                if progress is not None:
+                    progress.done = received
+                if cancelled is not None and cancelled.is_set():
+                    raise BackupCancelled()
+            f.truncate(page_count * page_size)
+
+        if buffer or received != pages:
+            raise BackendError("Backup stream ended early")
+        if _digest(partial, page_size) != headers["X-Backup-Digest"]:
+            raise _DigestMismatch()
+        os.replace(partial, file_path)
+        return headers["X-Backup-Id"]
+    except requests.RequestException as e:
+        raise BackendError(str(e)) from e
+    finally:
+        response.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def backup(backend, directory=BACKUP_DIR, progress=None, cancelled=None, incremental=True):
+    """Download a backup of the server's database into directory; returns its path
+
+    progress counts pages received. A full backup is taken when there is no
+    previous one, the server no longer remembers it, or the local copy of it
+    has changed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    base_id, base_path = _latest(directory) if incremental else (None, None)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    file_path = os.path.join(directory, f"database_backup_{timestamp}.db")
+    suffix = 1
+    while os.path.exists(file_path):
+        suffix += 1
+        file_path = os.path.join(directory, f"database_backup_{timestamp}_{suffix}.db")
+
+    try:
+        backup_id = _download(backend, file_path, base_id, base_path, progress, cancelled)
+    except _DigestMismatch:
+        if base_id is None:
+            raise BackendError("Backup does not match the server's snapshot")
+        backup_id = _download(backend, file_path, None, None, progress, cancelled)
+
+    with open(os.path.join(directory, LATEST), "w", encoding="utf-8") as f:
+        json.dump({"id": backup_id, "file": os.path.basename(file_path)}, f)
+    return file_path
+
+
+def restore(backend, file_path, progress=None, cancelled=None):
+    """Replace the server's database with a backup file, without stopping it
+
+    The file is streamed gzip-compressed; progress counts KB sent. Returns the
+    server's reply.
+    """
+    with open(file_path, "rb") as f:
+        if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+            raise ValueError(f"{os.path.basename(file_path)} is not a SQLite database")
+    if progress is not None:
+        progress.total = -(-os.path.getsize(file_path) // 1024)
+
+    def body():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+        sent = 0
+        with open(file_path, "rb") as f:
+            while True:
+                chunk = f.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if cancelled is not None and cancelled.is_set():
+                    raise BackupCancelled()
+                yield compressor.compress(chunk)
+                sent += len(chunk)
+                if progress is not None:
+                    progress.done = sent // 1024
+        yield compressor.flush()
+
+    return backend.request(
+        "POST", "/restore", data=body(),
+        headers={"Content-Type": "application/octet-stream", "Content-Encoding": "gzip"},
+        timeout=(backend.timeout[0], BACKUP_TIMEOUT),
+    ).json()
@@ -0,0 +1,275 @@
+"""
+Client benchmarks
+Times the client's hot paths (task list, history, chart data, export) against
+mock_backend.py with a synthetic dataset, and the same operations through a
+real but hidden Tk window when a display is available. Results are written
+as JSON so runs can be compared:
+
+    python benchmark.py --size 10k --latency 20 --output before.json
+    python benchmark.py --size 10k --latency 20 --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import export
+from backend import BackendClient, HISTORY_PAGE_SIZE
+from mock_backend import SIZES, Dataset, MockBackend
+from models import EntryTable
+
+GUI_TIMEOUT = 120  # seconds to wait for a GUI operation before giving up
+REGRESSION_THRESHOLD = 0.2
+
+
+def measure(run, repeat, setup=None):
+    """Time run() repeat times after one warm-up call; returns milliseconds per run"""
+    times = []
+    for i in range(repeat + 1):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        if i:
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def stats(times):
+    return {
+        "runs": len(times),
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "max_ms": round(max(times), 3),
+    }
+
+
+def client_benchmarks(url, dataset, repeat):
+    """Backend client, model and export paths, without any GUI"""
+    backend = BackendClient(url)
+    task_id = dataset.tasks[0]["id"]
+    group_id = dataset.tasks[0]["group_id"]
+    results = {}
+
+    results["fetch_tasks"] = measure(lambda: backend.get("/tasks", params={"group_id": group_id}), repeat)
+    results["fetch_tasks_cached"] = measure(lambda: backend.cached_get("/tasks", {"group_id": group_id}), repeat)
+
+    def history_page():
+        page = backend.get("/time_entries", params={"task_id": task_id, "limit": HISTORY_PAGE_SIZE})
+        return EntryTable(page["entries"])
+    results["fetch_history_page"] = measure(history_page, repeat)
+
+    def full_history():
+        params = {"task_id": task_id, "limit": HISTORY_PAGE_SIZE}
+        table = EntryTable()
+        while True:
+            page = backend.get("/time_entries", params=params)
+            table.extend(page["entries"])
+            if not page["next_cursor"]:
+                return table
+            params["cursor"] = page["next_cursor"]
+    results["fetch_full_history"] = measure(full_history, repeat)
+
+    results["fetch_chart_by_group"] = measure(lambda: backend.get("/time_by_group"), repeat)
+    results["fetch_chart_by_task"] = measure(
+        lambda: backend.get("/time_by_task", params={"group_id": group_id, "period_id": 1}), repeat)
+    results["snapshot"] = measure(lambda: backend.snapshot(group_id=group_id, task_id=task_id), repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.csv")
+        results["export_csv"] = measure(
+            lambda: export.write_csv(export.stream_records(backend), path), repeat)
+
+    try:
+        import analytics
+    except ImportError:
+        pass  # NumPy is optional
+    else:
+        results["analytics"] = measure(
+            lambda: analytics.summarize(backend.get("/intervals"), dataset.groups, dataset.periods), repeat)
+
+    backend.close()
+    return results
+
+
+def pump_until(root, condition, timeout=GUI_TIMEOUT):
+    """Process Tk events until condition() is true"""
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("GUI operation did not finish")
+        root.update()
+        time.sleep(0.001)
+
+
+def probe(obj, name):
+    """Wrap obj.name so each call is counted; returns the list of calls"""
+    calls = []
+    original = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        result = original(*args, **kwargs)
+        calls.append(time.perf_counter())
+        return result
+    setattr(obj, name, wrapper)
+    return calls
+
+
+def gui_benchmarks(url, dataset, repeat):
+    """Refresh and render paths of the real window, kept hidden
+
+    Returns (results, startup phases), or raises tk.TclError without a display.
+    """
+    import tkinter as tk
+    from app import TimeTrackerApp
+    from journal import Journal
+    from timing import PhaseTimer
+
+    root = tk.Tk()
+    root.withdraw()
+    directory = tempfile.TemporaryDirectory()
+    startup = PhaseTimer()
+    try:
+        app = TimeTrackerApp(root, startup=startup, backend=BackendClient(url),
+                             journal=Journal(os.path.join(directory.name, "journal.db")))
+    except Exception:
+        root.destroy()
+        directory.cleanup()
+        raise
+    try:
+        pump_until(root, lambda: startup.has("first data") and startup.has("chart ready"))
+        results = {}
+        task_id = dataset.tasks[0]["id"]
+        group_id = dataset.tasks[0]["group_id"]
+
+        # Select a group and task the way a click would
+        tasks_rendered = probe(app, "render_tasks")
+        history_rendered = probe(app, "render_history")
+        app.group_tree.selection_set(str(group_id))
+        pump_until(root, lambda: tasks_rendered)
+        app.task_list.selection_set(str(task_id))
+        pump_until(root, lambda: history_rendered)
+
+        def refresh(calls, trigger):
+            count = len(calls)
+            trigger()
+            pump_until(root, lambda: len(calls) > count)
+
+        results["gui_load_tasks"] = measure(
+            lambda: refresh(tasks_rendered, app.load_tasks),
+            repeat, setup=lambda: app.backend.invalidate("/tasks"))
+        results["gui_load_history"] = measure(
+            lambda: refresh(history_rendered, app.load_history),
+            repeat, setup=lambda: app.backend.invalidate("/time_entries"))
+
+        # Rendering alone, into empty lists
+        tasks = app.backend.cached_get("/tasks", {"group_id": group_id})
+        results["gui_render_tasks"] = measure(
+            lambda: app.render_tasks(group_id, tasks), repeat, setup=lambda: app.task_sync.sync([]))
+        history = app.history
+        results["gui_render_history"] = measure(
+            lambda: app.render_history(history), repeat, setup=lambda: app.history_sync.sync([]))
+
+        # Fetch, pie layout and a full canvas draw (includes the chart's redraw delay)
+        draws = []
+        app.chart_canvas.mpl_connect("draw_event", lambda event: draws.append(event))
+
+        def reset_chart():
+            app.backend.invalidate_aggregates()
+            app.chart._shown = None
+            app.chart._pixels.clear()
+        results["gui_update_visualization"] = measure(
+            lambda: refresh(draws, app.update_visualization), repeat, setup=reset_chart)
+        return results, startup.phases()
+    finally:
+        app.on_close()
+        directory.cleanup()
+
+
+def run(size, latency, repeat, gui=True, seed=1):
+    dataset = Dataset(SIZES[size], seed)
+    report = {
+        "meta": {
+            "size": size,
+            "entries": len(dataset),
+            "latency_ms": latency,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": {},
+        "skipped": {},
+    }
+    with MockBackend(dataset, latency / 1000) as backend:
+        for name, times in client_benchmarks(backend.url, dataset, repeat).items():
+            report["results"][name] = stats(times)
+
+        if gui:
+            try:
+                results, phases = gui_benchmarks(backend.url, dataset, repeat)
+            except Exception as e:  # no display, Tk missing, ...
+                report["skipped"]["gui"] = str(e)
+            else:
+                for name, times in results.items():
+                    report["results"][name] = stats(times)
+                report["startup"] = [{"phase": name, "at_ms": round(at, 1)} for name, at, _ in phases]
+        report["meta"]["requests"] = backend.requests
+    return report
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print median changes against a baseline report; returns the names that regressed"""
+    regressed = []
+    for key in ("size", "latency_ms"):
+        if baseline.get("meta", {}).get(key) != report["meta"][key]:
+            print(f"Note: {key} differs from the baseline "
+                  f"({baseline.get('meta', {}).get(key)} vs {report['meta'][key]})")
+    for name, result in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        change = result["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {before['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  {change:+7.1%}{flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the client against a mock backend")
+    parser.add_argument("--size", choices=SIZES, default="10k", help="dataset size (time entries)")
+    parser.add_argument("--latency", type=float, default=0, help="delay per request in ms")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-gui", action="store_true", help="skip the Tk benchmarks")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown counted as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.size, args.latency, args.repeat, gui=not args.no_gui, seed=args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressed = compare(report, json.load(f), args.threshold)
+        return 1 if regressed else 0
+    if not args.output:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Live change feed
+ChangeFeed listens to the backend's /events stream on a background thread.
+apply_change() patches the response cache with each change, so the GUI
+re-renders from the cache instead of refetching whole lists.
+"""
+import queue
+import threading
+
+from backend import BackendError
+from metrics import metrics
+
+# Try to load configuration from config.py, fallback to defaults
+try:
+    import config
+except ImportError:
+    config = None
+
+FEED_RETRY_INTERVAL = getattr(config, "SYNC_RETRY_INTERVAL", 5)
+FEED_MAX_RETRY_INTERVAL = 60
+
+
+class ChangeFeed(threading.Thread):
+    """Background thread that reads server-sent change events
+
+    Events are queued as (event, data) for the UI thread to pick up with
+    drain(). After a dropped connection the feed resumes from the last event
+    id; if the server can no longer replay what was missed it sends a
+    "reset" event instead.
+    """
+
+    def __init__(self, backend, retry_interval=FEED_RETRY_INTERVAL):
+        super().__init__(name="change-feed", daemon=True)
+        self.backend = backend
+        self.retry_interval = retry_interval
+        self.connected = False
+        self.supported = True
+        self.last_event_id = None
+        self._stopped = threading.Event()
+        self._events = queue.SimpleQueue()
+
+    def stop(self):
+        self._stopped.set()
+
+    def drain(self):
+        """Return every (event, data) received since the last call"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def run(self):
+        delay = self.retry_interval
+        first = True
+        while not self._stopped.is_set():
+            try:
+                for event_id, event, data in self.backend.iter_events("/events", self.last_event_id):
+                    if not self.connected:
+                        self.connected = True
+                        delay = self.retry_interval
+                        # Changes made while we had no position in the feed are unknown
+                        if self.last_event_id is None and not first:
+                            self._events.put(("reset", {}))
+                    if event_id:
+                        self.last_event_id = event_id
+                    self._events.put((event, data))
+                    if self._stopped.is_set():
+                        return
+            except BackendError as e:
+                if e.status == 404:
+                    # Older server without a change feed; callers fall back to refetching
+                    self.supported = False
+                    return
+                metrics.error("change feed", e)
+                print(f"Change feed disconnected: {e}")
+            except Exception as e:
+                metrics.error("change feed", e)
+                print(f"Change feed failed: {e}")
+            finally:
+                self.connected = False
+            first = False
+            self._stopped.wait(delay)
+            delay = min(delay * 2, FEED_MAX_RETRY_INTERVAL)
+
+
+def _hours(seconds, days=1):
+    return round(seconds / 3600 / days, 2)
+
+
+def _same(a, b):
+    return a is not None and b is not None and str(a) == str(b)
+
+
+def _set_total(rows, row_id, seconds, field):
+    """Copy of a task/group list with one row's totals replaced"""
+    return [
+        dict(row, **{field: _hours(seconds), "hours_per_week": _hours(seconds, 7)})
+        if _same(row["id"], row_id) else row
+        for row in rows
+    ]
+
+
+def _without(rows, row_id):
+    return [row for row in rows if not _same(row["id"], row_id)]
+
+
+def _update_totals(cache, totals):
+    """Write a task's and its group's new rollup totals into every cached list"""
+    task_id = totals.get("task_id")
+    group_id = totals.get("group_id")
+    if "task_seconds" not in totals:
+        # The task is gone; nothing to update
+        return
+
+    cache.update("/tasks", lambda params, rows: _set_total(rows, task_id, totals["task_seconds"], "total_hours"),
+                 group_id=group_id)
+
+    # Period-filtered aggregates depend on the entry's day; refetch those
+    def task_chart(params, rows):
+        if "period_id" in params:
+            return None
+        return _set_total(rows, task_id, totals["task_seconds"], "total_time")
+
+    def group_chart(params, rows):
+        if "period_id" in params:
+            return None
+        return _set_total(rows, group_id, totals["group_seconds"], "total_time")
+
+    cache.update("/time_by_task", task_chart)
+    cache.update("/time_by_group", group_chart)
+    cache.invalidate("/intervals")
+
+
+def _entry_key(entry):
+    return entry["start_time"], entry["id"]
+
+
+def _add_entry(entry):
+    """Patch for cached history pages: insert or replace a completed entry"""
+    def patch(params, page):
+        if "cursor" in params:
+            return None  # older pages are refetched if scrolled to again
+        entries = [e for e in page["entries"] if not _same(e["id"], entry["id"])]
+        # Entries older than the first page belong to a later page
+        if page["next_cursor"] and entries and _entry_key(entry) < _entry_key(entries[-1]):
+            return dict(page, entries=entries)
+        index = 0
+        while index < len(entries) and _entry_key(entries[index]) > _entry_key(entry):
+            index += 1
+        return dict(page, entries=entries[:index] + [entry] + entries[index:])
+    return patch
+
+
+def _remove_entry(entry_id):
+    def patch(params, page):
+        return dict(page, entries=_without(page["entries"], entry_id))
+    return patch
+
+
+def apply_change(cache, event, data):
+    """Patch cached responses for one change event
+
+    Returns the names of the views that need re-rendering: "groups", "tasks",
+    "history", "chart", "periods", or "reset" when everything must be reloaded.
+    """
+    if event == "reset":
+        cache.clear()
+        return {"reset"}
+
+    if event == "group_added":
+        cache.update("/groups", lambda params, rows: _without(rows, data["id"]) + [data])
+        row = dict(data, total_time=0, hours_per_week=0)
+        cache.update("/time_by_group", lambda params, rows: _without(rows, data["id"]) + [row])
+        return {"groups", "chart"}
+
+    if event == "group_deleted":
+        cache.update("/groups", lambda params, rows: _without(rows, data["id"]))
+        cache.update("/time_by_group", lambda params, rows: _without(rows, data["id"]))
+        cache.invalidate("/tasks", group_id=data["id"])
+        return {"groups", "tasks", "chart"}
+
+    if event == "task_added":
+        task = {"id": data["id"], "name": data["name"], "total_hours": 0, "hours_per_week": 0}
+        cache.update("/tasks", lambda params, rows: _without(rows, data["id"]) + [task],
+                     group_id=data["group_id"])
+
+        def add_to_chart(params, rows):
+            if "group_id" in params and not _same(params["group_id"], data["group_id"]):
+                return rows
+            return _without(rows, data["id"]) + [dict(data, total_time=0, hours_per_week=0)]
+        cache.update("/time_by_task", add_to_chart)
+        return {"tasks", "chart"}
+
+    if event == "task_deleted":
+        cache.update("/tasks", lambda params, rows: _without(rows, data["id"]), group_id=data["group_id"])
+        cache.update("/time_by_task", lambda params, rows: _without(rows, data["id"]))
+        cache.update("/time_by_group", lambda params, rows: None if "period_id" in params else
+                     _set_total(rows, data["group_id"], data["group_seconds"], "total_time"))
+        cache.invalidate("/time_entries", task_id=data["id"])
+        cache.invalidate("/intervals")
+        return {"tasks", "history", "chart"}
+
+    if event == "entry_started":
+        # Running entries have no duration yet and are not listed in the history
+        return set()
+
+    if event == "entry_stopped":
+        entry = data["entry"]
+        cache.update("/time_entries", _add_entry(entry), task_id=entry["task_id"])
+        _update_totals(cache, data["totals"])
+        return {"tasks", "history", "chart"}
+
+    if event == "entry_deleted":
+        entry = data["entry"]
+        cache.update("/time_entries", _remove_entry(entry["id"]), task_id=entry["task_id"])
+        _update_totals(cache, data["totals"])
+        return {"tasks", "history", "chart"}
+
+    if event == "period_added":
+        cache.update("/periods", lambda params, rows: _without(rows, data["id"]) + [data])
+        return {"periods"}
+
+    if event == "period_deleted":
+        cache.update("/periods", lambda params, rows: _without(rows, data["id"]))
+        cache.invalidate("/time_by_group", period_id=data["id"])
+        cache.invalidate("/time_by_task", period_id=data["id"])
+        return {"periods", "chart"}
+
+    return set()
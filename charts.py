@@ -0,0 +1,152 @@
+"""
+Pie chart rendering for the visualization panel
+PieChart keeps one set of wedge and label artists and updates them in place,
+coalesces bursts of updates into a single idle redraw, and remembers the
+rendered pixels per chart key so switching back to a view repaints without
+rasterizing the figure again.
+"""
+import math
+from collections import OrderedDict
+
+import matplotlib
+from matplotlib.patches import Wedge
+
+from metrics import metrics, time_canvas_draws
+
+PIE_COLORS = matplotlib.colormaps["Paired"].colors
+REDRAW_DELAY = 30    # ms to wait for further updates before redrawing
+PIXEL_CACHE_SIZE = 16
+
+
+class PieChart:
+    """Pie chart on a FigureCanvasTkAgg axes that is updated rather than rebuilt"""
+
+    def __init__(self, canvas, ax, fg_color, redraw_delay=REDRAW_DELAY,
+                 cache_size=PIXEL_CACHE_SIZE):
+        self.canvas = canvas
+        self.ax = ax
+        self.fg_color = fg_color
+        self.redraw_delay = redraw_delay
+        self.cache_size = cache_size
+        self.widget = canvas.get_tk_widget()
+
+        # Same layout as ax.pie(): no frame, equal aspect, fixed limits
+        ax.set_frame_on(False)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_xlim(-1.25, 1.25)
+        ax.set_ylim(-1.25, 1.25)
+        ax.set_aspect("equal")
+        ax.set_autoscale_on(False)
+
+        self.slices = []  # (wedge, label, percentage) artists, reused between charts
+        self.message = ax.text(0.5, 0.5, "", transform=ax.transAxes,
+                               ha="center", va="center", visible=False)
+
+        self._pending = None   # state to show at the next flush
+        self._shown = None     # state the artists currently show
+        self._after_id = None
+        self._pixels = OrderedDict()  # key -> (state, saved canvas region)
+
+        time_canvas_draws(canvas, "chart")
+        canvas.mpl_connect("draw_event", self._on_draw)
+        canvas.mpl_connect("resize_event", lambda event: self._pixels.clear())
+
+    def show(self, key, title, data):
+        """Show a pie of data ({"name", "total_time"} rows); key identifies the view"""
+        labels = tuple(item["name"] for item in data)
+        sizes = tuple(float(item["total_time"] or 0) for item in data)
+        if not data or sum(sizes) <= 0:
+            self.show_message("No data available", title)
+            return
+        self._request((key, "pie", title, labels, sizes))
+
+    def show_message(self, text, title, color=None):
+        self._request((None, "message", title, text, color or self.fg_color))
+
+    def _request(self, state):
+        self._pending = state
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.redraw_delay, self._flush)
+
+    def _flush(self):
+        self._after_id = None
+        state, self._pending = self._pending, None
+        if state is None or state == self._shown:
+            return
+
+        key, kind = state[0], state[1]
+        if kind == "pie":
+            self._set_pie(*state[2:])
+        else:
+            self._set_message(*state[2:])
+        self._shown = state
+
+        cached = self._pixels.get(key) if key is not None else None
+        if cached is not None and cached[0] == state:
+            # Same view with the same data: repaint the saved pixels
+            self._pixels.move_to_end(key)
+            with metrics.timer("draw", "chart (cached pixels)"):
+                self.canvas.restore_region(cached[1])
+                self.canvas.blit(self.ax.figure.bbox)
+        else:
+            self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        # Remember what a full draw produced for this view
+        state = self._shown
+        if state is None or state[0] is None:
+            return
+        self._pixels[state[0]] = (state, self.canvas.copy_from_bbox(self.ax.figure.bbox))
+        self._pixels.move_to_end(state[0])
+        while len(self._pixels) > self.cache_size:
+            self._pixels.popitem(last=False)
+
+    def _slice(self, index):
+        while len(self.slices) <= index:
+            wedge = Wedge((0, 0), 1, 0, 0, clip_on=False)
+            self.ax.add_patch(wedge)
+            label = self.ax.text(0, 0, "", va="center", color=self.fg_color,
+                                 fontsize=10, clip_on=False)
+            percentage = self.ax.text(0, 0, "", ha="center", va="center",
+                                      color=self.fg_color, fontsize=10)
+            self.slices.append((wedge, label, percentage))
+        return self.slices[index]
+
+    def _set_pie(self, title, labels, sizes):
+        # Counterclockwise from 12 o'clock, like ax.pie(startangle=90)
+        total = sum(sizes)
+        theta1 = 90.0
+        for i, (name, size) in enumerate(zip(labels, sizes)):
+            wedge, label, percentage = self._slice(i)
+            fraction = size / total
+            theta2 = theta1 + 360.0 * fraction
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+            wedge.set_facecolor(PIE_COLORS[i % len(PIE_COLORS)])
+
+            middle = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment("left" if x > 0 else "right")
+            label.set_text(name)
+            percentage.set_position((0.6 * x, 0.6 * y))
+            percentage.set_text(f"{100 * fraction:1.1f}%")
+            for artist in (wedge, label, percentage):
+                artist.set_visible(True)
+            theta1 = theta2
+
+        for artists in self.slices[len(labels):]:
+            for artist in artists:
+                artist.set_visible(False)
+        self.message.set_visible(False)
+        self.ax.set_title(title, color=self.fg_color, fontsize=12)
+
+    def _set_message(self, title, text, color):
+        for artists in self.slices:
+            for artist in artists:
+                artist.set_visible(False)
+        self.message.set_text(text)
+        self.message.set_color(color)
+        self.message.set_visible(True)
+        self.ax.set_title(title, color=color)
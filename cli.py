@@ -0,0 +1,142 @@
+"""
+Command line interface
+Start and stop timers, check what is running, print reports and export the
+database without opening the GUI:
+
+    python -m cli start "Thesis/Writing"
+    python -m cli stop -m "Drafted chapter 2"
+    python -m cli status
+    python -m cli report --by task --period "Fall 2024"
+    python -m cli export backup.parquet
+"""
+import argparse
+import json
+import sys
+
+
+def _duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}h {(seconds % 3600) // 60:02d}m"
+
+
+def _task_label(timer):
+    return timer.task_name or f"task {timer.task_id}"
+
+
+def cmd_start(tracker, args):
+    from core import TrackerError
+    task = tracker.find_task(args.task)
+    if not args.force and any(timer.task_id == task.id for timer in tracker.running()):
+        raise TrackerError(f"{task.name} is already running (use --force to start another)")
+    timer = tracker.start(task, args.at)
+    print(f"Started {_task_label(timer)} (entry {timer.entry_id})")
+
+
+def cmd_stop(tracker, args):
+    running = tracker.running()
+    if args.task:
+        task = tracker.find_task(args.task)
+        running = [timer for timer in running if timer.task_id == task.id]
+    if not running:
+        print("No timer running")
+        return
+    if len(running) > 1 and not (args.task or args.all):
+        from core import TrackerError
+        names = ", ".join(_task_label(timer) for timer in running)
+        raise TrackerError(f"{len(running)} timers are running ({names}); name the task or use --all")
+
+    for timer in running:
+        duration = tracker.stop(timer, args.message, args.at)
+        print(f"Stopped {_task_label(timer)} after {_duration(duration)}")
+
+
+def cmd_status(tracker, args):
+    running = tracker.running()
+    if args.json:
+        print(json.dumps([
+            {"id": timer.entry_id, "task_id": timer.task_id, "task": timer.task_name,
+             "group_id": timer.group_id, "elapsed": int(timer.elapsed())}
+            for timer in running
+        ]))
+        return
+    if not running:
+        print("No timer running")
+    for timer in running:
+        print(f"{_task_label(timer)}: {_duration(timer.elapsed())} (entry {timer.entry_id})")
+
+
+def cmd_report(tracker, args):
+    report = tracker.report(args.by, args.period, args.group)
+    if args.json:
+        print(json.dumps(report))
+        return
+    print(f"{report['title']} - {report['period']}")
+    width = max([len(row["name"]) for row in report["rows"]] + [5])
+    for row in report["rows"]:
+        print(f"  {row['name']:<{width}}  {row['hours']:8.2f}h  {100 * row['share']:5.1f}%")
+    print(f"  {'Total':<{width}}  {report['total_hours']:8.2f}h")
+    if report["hours_per_week"] is not None:
+        print(f"  {'Per week':<{width}}  {report['hours_per_week']:8.2f}h")
+
+
+def cmd_export(tracker, args):
+    for path in tracker.export(args.file, args.single_file):
+        print(f"Wrote {path}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Academic Time Tracker")
+    parser.add_argument("--url", help="backend URL (default BACKEND_URL from config.py)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    start = commands.add_parser("start", help="start a timer")
+    start.add_argument("task", help='task id, name or "Group/Task"')
+    start.add_argument("--at", help="start time (ISO 8601, default now)")
+    start.add_argument("--force", action="store_true", help="start even if the task is already running")
+    start.set_defaults(func=cmd_start)
+
+    stop = commands.add_parser("stop", help="stop the running timer")
+    stop.add_argument("task", nargs="?", help="only stop this task's timer")
+    stop.add_argument("-m", "--message", default="", help="session note")
+    stop.add_argument("--at", help="end time (ISO 8601, default now)")
+    stop.add_argument("--all", action="store_true", help="stop every running timer")
+    stop.set_defaults(func=cmd_stop)
+
+    status = commands.add_parser("status", help="show running timers")
+    status.add_argument("--json", action="store_true")
+    status.set_defaults(func=cmd_status)
+
+    report = commands.add_parser("report", help="print hours per group or task")
+    report.add_argument("--by", choices=("group", "task"), default="group")
+    report.add_argument("--period", help="period id or name (default all time)")
+    report.add_argument("--group", help="with --by task, only this group's tasks")
+    report.add_argument("--json", action="store_true")
+    report.set_defaults(func=cmd_report)
+
+    export = commands.add_parser("export", help="export the database (.csv, .arrow or .parquet)")
+    export.add_argument("file")
+    export.add_argument("--single-file", action="store_true",
+                        help="columnar formats: one time entries file with task and group names")
+    export.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Imported after parsing so --help doesn't wait for them
+    from backend import BASE_URL, BackendError, SimpleClient
+    from core import TimeTracker, TrackerError
+
+    tracker = TimeTracker(SimpleClient(args.url or BASE_URL))
+    try:
+        args.func(tracker, args)
+    except (TrackerError, BackendError, ImportError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        tracker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,5 +15,44 @@ BACKEND_URL = "http://192.168.2.19:5000"
 # Connection timeout in seconds
 CONNECTION_TIMEOUT = 3
 
+# Read timeout in seconds (how long to wait for a response once connected)
+READ_TIMEOUT = 10
+
+# Number of keep-alive connections kept open to the backend
+POOL_SIZE = 8
+
+# Retries for failed requests and the backoff factor between them (seconds)
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.3
+
+# How long cached lists are reused before being fetched again (seconds),
+# and how many responses to keep in memory
+CACHE_TTL = 30
+CACHE_SIZE = 256
+
+# Number of time entries fetched per page in the history view
+HISTORY_PAGE_SIZE = 200
+
+# Local journal that keeps timer and delete operations while the backend is
+# unreachable, and how often (seconds) to retry sending them
+JOURNAL_PATH = "journal.db"
+SYNC_RETRY_INTERVAL = 5
+
+# Seconds without any data (the server sends a heartbeat every 20 s) before
+# the live change feed is considered dropped and reconnected
+EVENTS_READ_TIMEOUT = 60
+
+# Folder for database backups, and how long to wait (seconds) for the server
+# to take or restore a snapshot
+BACKUP_DIR = "backups"
+BACKUP_TIMEOUT = 300
+
+# Default folder for period reports, and how many reports render at once
+# (each in its own process)
+REPORT_DIR = "reports"
+REPORT_WORKERS = 4
+
 # Show backend connection warnings
-SHOW_BACKEND_WARNINGS = True
\ No newline at end of file
+SHOW_BACKEND_WARNINGS = True
+# Print how long each start-up phase took (imports, window, first data, chart)
+LOG_STARTUP_TIMING = True
@@ -0,0 +1,167 @@
+"""
+Headless tracker API
+TimeTracker starts and stops timers, builds reports and exports the database
+through the backend without a GUI, for the command line (cli.py) and scripts.
+Nothing here imports tkinter, matplotlib or NumPy.
+"""
+import os
+from datetime import date
+
+import export
+from backend import BackendClient
+from journal import utc_now
+from models import Group, Period, Task, parse_time
+from timers import Timer
+
+
+class TrackerError(Exception):
+    """Raised when a request can't be carried out, e.g. an unknown task name"""
+
+
+def _matches(name, spec):
+    return name is not None and name.casefold() == spec.casefold()
+
+
+class TimeTracker:
+    """Scriptable access to timers, reports and exports
+
+    Tasks and periods can be given as objects, ids, names or, for tasks,
+    "Group/Task".
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or BackendClient()
+
+    def close(self):
+        self.backend.close()
+
+    # Lookups
+    def groups(self):
+        return [Group.from_json(row) for row in self.backend.get("/groups")]
+
+    def tasks(self, group_id=None):
+        """Tasks of one group with their totals, or every task (without totals)"""
+        if group_id is None:
+            return [Task.from_json(row) for row in self.backend.get("/all_tasks")]
+        return [Task.from_json(row, group_id)
+                for row in self.backend.get("/tasks", params={"group_id": group_id})]
+
+    def periods(self):
+        return [Period.from_json(row) for row in self.backend.get("/periods")]
+
+    def find_task(self, spec):
+        """The task for an id, a task name or "Group/Task" (names ignore case)"""
+        if isinstance(spec, Task):
+            return spec
+        spec = str(spec).strip()
+        tasks = self.tasks()
+        if spec.isdigit():
+            found = [task for task in tasks if task.id == int(spec)]
+        else:
+            group_name, _, task_name = spec.rpartition("/")
+            found = [task for task in tasks if _matches(task.name, task_name)]
+            if group_name:
+                groups = {group.id: group.name for group in self.groups()}
+                found = [task for task in found if _matches(groups.get(task.group_id), group_name)]
+
+        if not found:
+            raise TrackerError(f"No task named '{spec}'")
+        if len(found) > 1:
+            raise TrackerError(f"'{spec}' matches {len(found)} tasks; use Group/Task or the task id")
+        return found[0]
+
+    def find_period(self, spec):
+        """The period for an id or name, or None for all time"""
+        if spec is None or isinstance(spec, Period):
+            return spec
+        spec = str(spec).strip()
+        if _matches(spec, "All Time"):
+            return None
+        for period in self.periods():
+            if str(period.id) == spec or _matches(period.name, spec):
+                return period
+        raise TrackerError(f"No period named '{spec}'")
+
+    # Timers
+    def running(self):
+        """Timers that have been started and not stopped, oldest first"""
+        return [Timer.from_json(row) for row in self.backend.get("/timer/running")]
+
+    def start(self, task, start_time=None):
+        """Start timing a task; returns the Timer"""
+        task = self.find_task(task)
+        start_time = start_time or utc_now()
+        result = self.backend.post("/timer/start", {"task_id": task.id, "start_time": start_time})
+        return Timer(task.id, task.name, task.group_id, parse_time(start_time), entry_id=result["id"])
+
+    def stop(self, timer, note="", end_time=None):
+        """Stop a running timer (a Timer or entry id); returns the duration in seconds"""
+        timer_id = timer.entry_id if isinstance(timer, Timer) else int(timer)
+        result = self.backend.post("/timer/stop", {
+            "id": timer_id, "note": note or "", "end_time": end_time or utc_now()
+        })
+        return result["duration"]
+
+    # Reports
+    def report(self, mode="group", period=None, group=None):
+        """Hours per group (or per task with mode="task") for a period or all time
+
+        Returns {"title", "period", "rows": [{"name", "hours", "share"}, ...],
+        "total_hours", "hours_per_week"}, rows sorted by hours. hours_per_week
+        is averaged over the period's length, so it is None for all time.
+        """
+        period = self.find_period(period)
+        params = {"period_id": period.id} if period else {}
+        if mode == "task":
+            if group is not None:
+                group_id = group.id if isinstance(group, Group) else self._group_id(group)
+                params["group_id"] = group_id
+            rows = self.backend.get("/time_by_task", params=params)
+            title = "Time by Task"
+        else:
+            rows = self.backend.get("/time_by_group", params=params)
+            title = "Time by Group"
+
+        total = sum(row["total_time"] or 0 for row in rows)
+        report_rows = [
+            {"name": row["name"], "hours": row["total_time"] or 0,
+             "share": (row["total_time"] or 0) / total if total else 0.0}
+            for row in rows
+        ]
+        report_rows.sort(key=lambda row: (-row["hours"], row["name"]))
+
+        hours_per_week = None
+        if period:
+            try:
+                days = (date.fromisoformat(period.end_date) - date.fromisoformat(period.start_date)).days + 1
+                hours_per_week = total / (days / 7) if days > 0 else None
+            except ValueError:
+                pass
+        return {
+            "title": title,
+            "period": period.name if period else "All Time",
+            "rows": report_rows,
+            "total_hours": total,
+            "hours_per_week": hours_per_week,
+        }
+
+    def _group_id(self, spec):
+        spec = str(spec).strip()
+        for group in self.groups():
+            if str(group.id) == spec or _matches(group.name, spec):
+                return group.id
+        raise TrackerError(f"No group named '{spec}'")
+
+    # Export
+    def export(self, file_path, single_file=False, progress=None):
+        """Export the database to CSV, or Arrow/Parquet by file extension
+
+        Returns the paths written.
+        """
+        records = export.stream_records(self.backend, progress)
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in export.COLUMNAR_FORMATS:
+            export.write_columnar(records, file_path, single_file, progress)
+            return list(export.columnar_paths(file_path, single_file).values())
+        export.write_csv(records, file_path, progress)
+        return [file_path]
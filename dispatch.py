@@ -0,0 +1,118 @@
+"""
+Background execution for the Tk GUI
+Backend calls run on a small thread pool and their results are handed back to
+the Tk main loop with root.after, so the window never blocks on the network.
+"""
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+
+class UIDispatcher:
+    """Runs blocking work off the Tk main loop and delivers results on it
+
+    Jobs can be tagged with a view name (e.g. "tasks"). Starting a new job for
+    the same view, or calling cancel(view), makes earlier results for that view
+    stale: they are dropped instead of being rendered.
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=15):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="backend")
+        self._results = queue.SimpleQueue()
+        self._generations = {}   # view name -> current generation
+        self._futures = {}       # view name -> latest future for that view
+        self._pending = 0
+        self._polling = False
+        self._closed = False
+
+    def run(self, work, on_success=None, on_error=None, view=None):
+        """Run work() on the pool; call on_success(result) or on_error(exc) on the UI thread"""
+        if self._closed:
+            return None
+
+        generation = None
+        if view is not None:
+            generation = self._generations.get(view, 0) + 1
+            self._generations[view] = generation
+            previous = self._futures.get(view)
+            if previous is not None:
+                previous.cancel()
+
+        def job():
+            start = time.perf_counter()
+            try:
+                result = work()
+            except Exception as e:
+                metrics.error(view or "background", e)
+                self._results.put((view, generation, on_error, e))
+            else:
+                self._results.put((view, generation, on_success, result))
+            finally:
+                metrics.record("job", view or "background", (time.perf_counter() - start) * 1000)
+
+        future = self.executor.submit(job)
+        if view is not None:
+            self._futures[view] = future
+        future.add_done_callback(self._cancelled_callback)
+        self._pending += 1
+        self._schedule_poll()
+        return future
+
+    def cancel(self, view):
+        """Drop any in-flight results for a view"""
+        self._generations[view] = self._generations.get(view, 0) + 1
+        future = self._futures.pop(view, None)
+        if future is not None:
+            future.cancel()
+
+    def is_current(self, view, generation):
+        return view is None or self._generations.get(view) == generation
+
+    def close(self):
+        self._closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _cancelled_callback(self, future):
+        # A job cancelled before it started never reports back, so account for it here
+        if future.cancelled():
+            self._results.put(None)
+
+    def _schedule_poll(self):
+        if not self._polling and not self._closed:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if item is None:
+                continue
+
+            view, generation, callback, value = item
+            if callback is None:
+                if isinstance(value, Exception):
+                    print(f"Background task failed: {value}")
+                continue
+            if not self.is_current(view, generation):
+                metrics.count("stale results dropped")
+                continue
+            start = time.perf_counter()
+            try:
+                callback(value)
+            except Exception as e:
+                metrics.error(f"{view or 'background'} callback", e)
+                print(f"Error in UI callback: {e}")
+            metrics.record("ui", view or "callback", (time.perf_counter() - start) * 1000)
+
+        if self._pending > 0:
+            self._schedule_poll()
@@ -0,0 +1,261 @@
+"""
+Database export
+Rows are streamed from the backend's /export endpoint and written straight to
+disk, so exporting never holds the whole database in memory.
+"""
+import csv
+import os
+from datetime import date, datetime
+
+# (table, CSV section title, [(column header, row key), ...]) in export order
+CSV_SECTIONS = [
+    ("groups", "Groups", [("ID", "id"), ("Name", "name")]),
+    ("tasks", "Tasks", [("ID", "id"), ("Name", "name"), ("Group ID", "group_id")]),
+    ("time_entries", "Time Entries", [
+        ("ID", "id"), ("Task ID", "task_id"), ("Start Time", "start_time"),
+        ("End Time", "end_time"), ("Duration", "duration"), ("Note", "note"),
+        ("Period ID", "period_id"),
+    ]),
+    ("academic_periods", "Academic Periods", [
+        ("ID", "id"), ("Name", "name"), ("Start Date", "start_date"), ("End Date", "end_date"),
+    ]),
+]
+
+
+class ExportCancelled(Exception):
+    """Raised when the user cancels an export in progress"""
+
+
+class Progress:
+    """Row counter shared between an export worker and the progress dialog"""
+
+    def __init__(self):
+        self.done = 0
+        self.total = 0
+
+
+def stream_records(backend, progress=None):
+    """Yield (table, row) pairs from the backend export stream"""
+    for record in backend.iter_ndjson("/export"):
+        if "counts" in record:
+            if progress is not None:
+                progress.total = sum(record["counts"].values())
+            continue
+        yield record["table"], record["row"]
+
+
+def write_csv(records, file_path, progress=None, cancelled=None):
+    """Write (table, row) pairs as the multi-section export CSV
+
+    records must arrive grouped by table in CSV_SECTIONS order. A partially
+    written file is removed if the export is cancelled or fails.
+    """
+    sections = {table: (title, columns) for table, title, columns in CSV_SECTIONS}
+    order = [table for table, _, _ in CSV_SECTIONS]
+
+    try:
+        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            written = 0  # number of sections whose header has been written
+            keys = None
+            count = 0
+
+            def start_section(index):
+                title, columns = sections[order[index]]
+                # Write separator
+                if index > 0:
+                    writer.writerow([])
+                writer.writerow([title])
+                writer.writerow([header for header, _ in columns])
+                return [key for _, key in columns]
+
+            for table, row in records:
+                # Emit headers for this table and any empty tables before it
+                while written <= order.index(table):
+                    keys = start_section(written)
+                    written += 1
+
+                writer.writerow([row.get(key) for key in keys])
+
+                count += 1
+                if progress is not None:
+                    progress.done = count
+                if cancelled is not None and count % 500 == 0 and cancelled.is_set():
+                    raise ExportCancelled()
+
+            while written < len(order):
+                start_section(written)
+                written += 1
+
+            if cancelled is not None and cancelled.is_set():
+                raise ExportCancelled()
+    except BaseException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
+
+# Columnar export (Arrow IPC / Parquet). pyarrow is optional and only imported
+# when a columnar export is requested.
+COLUMNAR_BATCH_SIZE = 10000
+
+COLUMNAR_FORMATS = {".arrow": "arrow", ".feather": "arrow", ".parquet": "parquet"}
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Columnar export needs pyarrow. Install it with: pip install pyarrow")
+    return pa, pq
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _schemas(pa):
+    ts = pa.timestamp("ms", tz="UTC")
+    return {
+        "groups": pa.schema([("id", pa.int64()), ("name", pa.string())]),
+        "tasks": pa.schema([("id", pa.int64()), ("name", pa.string()), ("group_id", pa.int64())]),
+        "time_entries": pa.schema([
+            ("id", pa.int64()), ("task_id", pa.int64()), ("start_time", ts), ("end_time", ts),
+            ("duration", pa.int64()), ("note", pa.string()), ("period_id", pa.int64()),
+        ]),
+        "academic_periods": pa.schema([
+            ("id", pa.int64()), ("name", pa.string()),
+            ("start_date", pa.date32()), ("end_date", pa.date32()),
+        ]),
+        # Single-file mode: one row per time entry with its task and group names
+        "entries": pa.schema([
+            ("id", pa.int64()), ("task_id", pa.int64()), ("task_name", pa.string()),
+            ("group_id", pa.int64()), ("group_name", pa.string()),
+            ("start_time", ts), ("end_time", ts), ("duration", pa.int64()),
+            ("note", pa.string()), ("period_id", pa.int64()),
+        ]),
+    }
+
+
+# Per-column converters from the JSON value to the Arrow value
+_CONVERTERS = {
+    "start_time": _timestamp,
+    "end_time": _timestamp,
+    "start_date": _date,
+    "end_date": _date,
+}
+
+
+class _ColumnarWriter:
+    """Buffers rows for one table and flushes them as record batches"""
+
+    def __init__(self, pa, pq, path, schema, fmt):
+        self.pa = pa
+        self.schema = schema
+        self.columns = {name: [] for name in schema.names}
+        self.rows = 0
+        if fmt == "parquet":
+            self.writer = pq.ParquetWriter(path, schema)
+        else:
+            # Uncompressed IPC files can be memory-mapped without parsing
+            self.writer = pa.ipc.new_file(path, schema)
+
+    def append(self, row):
+        for name, values in self.columns.items():
+            value = row.get(name)
+            convert = _CONVERTERS.get(name)
+            values.append(convert(value) if convert else value)
+        self.rows += 1
+        if self.rows >= COLUMNAR_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        batch = self.pa.RecordBatch.from_pydict(self.columns, schema=self.schema)
+        if hasattr(self.writer, "write_batch"):
+            self.writer.write_batch(batch)
+        else:
+            self.writer.write_table(self.pa.Table.from_batches([batch]))
+        for values in self.columns.values():
+            values.clear()
+        self.rows = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def columnar_paths(file_path, single_file):
+    """Map each output table to its file; per-table files get a _<table> suffix"""
+    if single_file:
+        return {"entries": file_path}
+    base, ext = os.path.splitext(file_path)
+    return {table: f"{base}_{table}{ext}" for table, _, _ in CSV_SECTIONS}
+
+
+def write_columnar(records, file_path, single_file=False, progress=None, cancelled=None):
+    """Write (table, row) pairs as typed Arrow IPC or Parquet files
+
+    The format follows the file extension (.arrow/.feather or .parquet). With
+    single_file, only time entries are written, joined with their task and
+    group names; otherwise every table gets its own file.
+    """
+    pa, pq = _load_pyarrow()
+    fmt = COLUMNAR_FORMATS.get(os.path.splitext(file_path)[1].lower(), "arrow")
+    schemas = _schemas(pa)
+    paths = columnar_paths(file_path, single_file)
+    writers = {}
+
+    # Names for single-file mode; groups and tasks stream before time entries
+    group_names = {}
+    tasks = {}
+
+    try:
+        for count, (table, row) in enumerate(records, 1):
+            if single_file:
+                if table == "groups":
+                    group_names[row["id"]] = row["name"]
+                elif table == "tasks":
+                    tasks[row["id"]] = (row["name"], row["group_id"])
+                elif table == "time_entries":
+                    task_name, group_id = tasks.get(row["task_id"], (None, None))
+                    row = dict(row, task_name=task_name, group_id=group_id,
+                               group_name=group_names.get(group_id))
+                table = "entries" if table == "time_entries" else None
+
+            if table is not None:
+                writer = writers.get(table)
+                if writer is None:
+                    writer = writers[table] = _ColumnarWriter(pa, pq, paths[table], schemas[table], fmt)
+                writer.append(row)
+
+            if progress is not None:
+                progress.done = count
+            if cancelled is not None and count % 500 == 0 and cancelled.is_set():
+                raise ExportCancelled()
+
+        # Tables with no rows still get an (empty) file with the right schema
+        for table, path in paths.items():
+            if table not in writers:
+                writers[table] = _ColumnarWriter(pa, pq, path, schemas[table], fmt)
+        for writer in writers.values():
+            writer.close()
+    except BaseException:
+        for writer in writers.values():
+            try:
+                writer.writer.close()
+            except Exception:
+                pass
+        for path in paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise
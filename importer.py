@@ -0,0 +1,326 @@
+"""
+Bulk import
+Reads time entries from CSV files (this app's own export, or a flat table with
+group/task/start/end columns as written by most other trackers) or from ICS
+calendars, validates and deduplicates them, and streams them to the backend's
+/import endpoint, which inserts them in large batched transactions. Times
+without a time zone are taken as local time.
+"""
+import csv
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+# Try to load configuration from config.py, fallback to defaults
+try:
+    import config
+except ImportError:
+    config = None
+
+# Group for entries from files that only name a task (most ICS calendars)
+IMPORT_DEFAULT_GROUP = getattr(config, "IMPORT_DEFAULT_GROUP", "Imported")
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_ERRORS = 100
+
+# Flat CSV column names, in order of preference (compared lowercased)
+COLUMNS = {
+    "group": ("group", "group name", "project", "client", "category"),
+    "task": ("task", "task name", "activity", "description"),
+    "start": ("start time", "start", "start_time", "started", "start datetime"),
+    "end": ("end time", "end", "end_time", "stopped", "end datetime"),
+    "start_date": ("start date",),
+    "end_date": ("end date",),
+    "duration": ("duration", "duration (seconds)"),
+    "note": ("note", "notes", "comment", "comments"),
+}
+
+TIME_FORMATS = ("%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M")
+
+ICS_DURATION = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+class ImportCancelled(Exception):
+    """Raised when the user cancels an import in progress"""
+
+
+def parse_timestamp(value):
+    """Aware datetime from an ISO 8601 or common tracker timestamp, or None"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in TIME_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    return parsed if parsed.tzinfo else parsed.astimezone()
+
+
+def parse_duration(value):
+    """Seconds from "3600", "1:30:00" or "1:30", or None"""
+    value = (value or "").strip()
+    if value.isdigit():
+        return int(value)
+    parts = value.split(":")
+    if 2 <= len(parts) <= 3 and all(part.isdigit() for part in parts):
+        hours, minutes, seconds = (list(map(int, parts)) + [0])[:3]
+        return hours * 3600 + minutes * 60 + seconds
+    return None
+
+
+def _utc(moment):
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _entry(group, task, start, end=None, duration=None, note=""):
+    """Validated entry for the backend, or the reason it is invalid"""
+    group, task = (group or "").strip() or IMPORT_DEFAULT_GROUP, (task or "").strip()
+    if not task:
+        return "Missing task"
+    start = parse_timestamp(start) if isinstance(start, str) else start
+    if start is None:
+        return "Invalid start time"
+    if isinstance(end, str):
+        end = parse_timestamp(end) if end.strip() else None
+        if end is None and duration is None:
+            return "Invalid or missing end time"
+    if end is None:
+        seconds = parse_duration(duration) if isinstance(duration, str) else duration
+        if seconds is None:
+            return "Invalid or missing end time"
+        end = start + timedelta(seconds=seconds)
+    if end < start:
+        return "End time is before start time"
+    return {"group": group, "task": task, "start_time": _utc(start), "end_time": _utc(end), "note": note or ""}
+
+
+def read_export_csv(rows, section):
+    """(line, entry or error) from this app's own multi-section export"""
+    groups, tasks = {}, {}
+    header = None
+    for line, row in rows:
+        if not row:
+            section = header = None
+        elif section is None:
+            section = row[0]
+        elif header is None:
+            header = row
+        else:
+            values = dict(zip(header, row))
+            if section == "Groups":
+                groups[values.get("ID")] = values.get("Name")
+            elif section == "Tasks":
+                tasks[values.get("ID")] = (values.get("Name"), groups.get(values.get("Group ID")))
+            elif section == "Time Entries":
+                if values.get("Task ID") not in tasks:
+                    yield line, "Unknown task"
+                    continue
+                task, group = tasks[values["Task ID"]]
+                yield line, _entry(group, task, values.get("Start Time"), values.get("End Time", ""),
+                                   None, values.get("Note"))
+
+
+def read_flat_csv(header, rows):
+    """(line, entry or error) from a table with one entry per row"""
+    names = [name.strip().lower() for name in header]
+    columns = {}
+    for key, aliases in COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                columns[key] = names.index(alias)
+                break
+    if "task" not in columns or ("start" not in columns and "start_date" not in columns):
+        raise ValueError("The CSV needs at least a task and a start time column")
+
+    def value(row, key):
+        index = columns.get(key)
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    def moment(row, key):
+        # Separate date and time columns (e.g. "Start date", "Start time") are joined
+        date = value(row, f"{key}_date")
+        time = value(row, key)
+        return f"{date} {time}".strip() if date and len(time) <= 8 else time
+
+    for line, row in rows:
+        if not any(cell.strip() for cell in row):
+            continue
+        duration = value(row, "duration")
+        yield line, _entry(value(row, "group"), value(row, "task"), moment(row, "start"),
+                           moment(row, "end"), duration or None, value(row, "note"))
+
+
+def read_csv(file_path):
+    """(line, entry or error) from a CSV file of either layout"""
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        rows = ((reader.line_num, row) for row in reader)
+        for _, header in rows:
+            if any(cell.strip() for cell in header):
+                break
+        else:
+            return
+        if header[0] == "Groups" and len(header) == 1:
+            yield from read_export_csv(rows, header[0])
+        else:
+            yield from read_flat_csv(header, rows)
+
+
+def _ics_lines(f):
+    """Unfolded (line number, content line) pairs"""
+    current, start = None, 0
+    for number, line in enumerate(f, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield start, current
+        current, start = line, number
+    if current is not None:
+        yield start, current
+
+
+def _ics_text(value):
+    return (value.replace("\\n", "\n").replace("\\N", "\n")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def _ics_time(value, params):
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return None  # all-day events are not sessions
+    try:
+        moment = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None
+    if value.endswith("Z"):
+        return moment.replace(tzinfo=timezone.utc)
+    zone = params.get("TZID", "").strip('"')
+    if zone and ZoneInfo is not None:
+        try:
+            return moment.replace(tzinfo=ZoneInfo(zone))
+        except (KeyError, ValueError):
+            pass
+    return moment.astimezone()
+
+
+def _ics_duration(value):
+    match = ICS_DURATION.match(value)
+    if not match or not any(match.groups()):
+        return None
+    weeks, days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return (((weeks * 7 + days) * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def read_ics(file_path):
+    """(line, entry or error) for each event of an iCalendar file"""
+    with open(file_path, encoding="utf-8-sig") as f:
+        event = None
+        for line, content in _ics_lines(f):
+            name, _, value = content.partition(":")
+            name, *raw_params = name.split(";")
+            name = name.upper()
+            params = dict(param.partition("=")[::2] for param in raw_params)
+            if name == "BEGIN" and value.upper() == "VEVENT":
+                event = {"line": line}
+            elif event is None:
+                continue
+            elif name == "END" and value.upper() == "VEVENT":
+                if "start" not in event:
+                    yield event["line"], "Missing or all-day start time"
+                else:
+                    yield event["line"], _entry(event.get("group"), event.get("task"), event["start"],
+                                                event.get("end"), event.get("duration"), event.get("note"))
+                event = None
+            elif name == "SUMMARY":
+                event["task"] = _ics_text(value)
+            elif name == "CATEGORIES":
+                event["group"] = _ics_text(re.split(r"(?<!\\),", value)[0])
+            elif name == "DESCRIPTION":
+                event["note"] = _ics_text(value)
+            elif name == "DTSTART":
+                start = _ics_time(value, params)
+                if start is not None:
+                    event["start"] = start
+            elif name == "DTEND":
+                event["end"] = _ics_time(value, params)
+            elif name == "DURATION":
+                event["duration"] = _ics_duration(value)
+
+
+def read_entries(file_path):
+    """(line, entry or error) pairs from a CSV or ICS file"""
+    if os.path.splitext(file_path)[1].lower() in (".ics", ".ical", ".ifb"):
+        return read_ics(file_path)
+    return read_csv(file_path)
+
+
+def count_lines(file_path):
+    with open(file_path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def import_file(backend, file_path, progress=None, cancelled=None):
+    """Validate and send every entry in file_path to the backend; returns a summary
+
+    The summary has the backend's counts (inserted, duplicates, groups_created,
+    tasks_created) plus rows rejected here; errors lists (line, reason) for the
+    first rejected rows. progress counts lines read. Entries already sent are
+    kept if the import is cancelled, and skipped when the file is imported again.
+    """
+    if progress is not None:
+        progress.total = count_lines(file_path)
+    errors = []
+    rejected = {"invalid": 0, "duplicates": 0}
+    seen = set()
+
+    def reject(line, error):
+        rejected["invalid"] += 1
+        if len(errors) < MAX_ERRORS:
+            errors.append((line, error))
+
+    def body():
+        chunk = []
+        size = 0
+        for line, entry in read_entries(file_path):
+            if progress is not None:
+                progress.done = line
+            if isinstance(entry, str):
+                reject(line, entry)
+                continue
+            key = (entry["group"], entry["task"], entry["start_time"])
+            if key in seen:
+                rejected["duplicates"] += 1
+                continue
+            seen.add(key)
+
+            entry["line"] = line  # so the backend reports file lines
+            text = json.dumps(entry) + "\n"
+            chunk.append(text)
+            size += len(text)
+            if size >= UPLOAD_CHUNK_SIZE:
+                if cancelled is not None and cancelled.is_set():
+                    raise ImportCancelled()
+                yield "".join(chunk).encode("utf-8")
+                chunk, size = [], 0
+        if chunk:
+            yield "".join(chunk).encode("utf-8")
+
+    summary = backend.request("POST", "/import", data=body(),
+                              headers={"Content-Type": "application/x-ndjson"}).json()
+    summary["invalid"] += rejected["invalid"]
+    summary["duplicates"] += rejected["duplicates"]
+    summary["errors"] = errors + [(error["line"], error["error"]) for error in summary["errors"]]
+    return summary
@@ -0,0 +1,78 @@
+"""
+Interval index
+IntervalIndex answers "which intervals contain this point" with a binary
+search, even when the intervals overlap (academic periods are free-form).
+find_overlaps() finds sessions that overlap each other in a single sorted
+pass over the history's columns.
+"""
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class IntervalIndex:
+    """Static index over half-open [start, end) intervals
+
+    The interval boundaries split the line into elementary segments; each
+    segment stores the values of the intervals covering it, so a lookup is
+    one bisect plus the size of the answer.
+    """
+
+    def __init__(self, intervals):
+        intervals = [(start, end, value) for start, end, value in intervals if start < end]
+        self.bounds = sorted({start for start, _, _ in intervals} | {end for _, end, _ in intervals})
+        self.segments = [[] for _ in self.bounds]
+        # Narrowest interval first, so segments[i][0] is the most specific match
+        for start, end, value in sorted(intervals, key=lambda item: item[1] - item[0]):
+            for i in range(bisect_right(self.bounds, start) - 1, bisect_right(self.bounds, end) - 1):
+                self.segments[i].append(value)
+
+    def find(self, point):
+        """Values of every interval containing point, narrowest first"""
+        i = bisect_right(self.bounds, point) - 1
+        if i < 0:
+            return []
+        return self.segments[i]
+
+
+def day_number(value):
+    """Days since 1970-01-01 for an ISO date string"""
+    return date.fromisoformat(value[:10]).toordinal() - EPOCH_ORDINAL
+
+
+def period_index(periods):
+    """IntervalIndex of periods over day numbers; end dates are inclusive
+
+    Periods whose dates don't parse or run backwards are left out.
+    """
+    intervals = []
+    for period in periods:
+        try:
+            start = day_number(period["start_date"])
+            end = day_number(period["end_date"]) + 1
+        except (TypeError, ValueError):
+            continue
+        intervals.append((start, end, period))
+    return IntervalIndex(intervals)
+
+
+def find_overlaps(ids, starts, ends, now=None):
+    """Ids of entries whose session overlaps another entry's
+
+    Takes parallel columns of ids and epoch-second start/end times; a
+    running entry (NaN or None end) lasts until now.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc).timestamp()
+    overlapping = set()
+    latest = None  # (end, id) of the entry reaching furthest so far
+    for i in sorted(range(len(ids)), key=lambda i: (starts[i], ids[i])):
+        if latest is not None and starts[i] < latest[0]:
+            overlapping.update((ids[i], latest[1]))
+        end = ends[i]
+        if end is None or end != end:
+            end = now
+        if latest is None or end > latest[0]:
+            latest = (end, ids[i])
+    return overlapping
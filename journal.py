@@ -0,0 +1,233 @@
+"""
+Offline write-ahead journal
+Timer and delete operations are written to a local SQLite file first and
+replayed to the backend by a background thread, so nothing is lost while the
+server is unreachable.
+"""
+import json
+import queue
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from backend import BackendError
+from metrics import metrics
+
+# Try to load configuration from config.py, fallback to defaults
+try:
+    import config
+except ImportError:
+    config = None
+
+JOURNAL_PATH = getattr(config, "JOURNAL_PATH", "journal.db")
+SYNC_RETRY_INTERVAL = getattr(config, "SYNC_RETRY_INTERVAL", 5)
+SYNC_MAX_RETRY_INTERVAL = 60
+
+
+def utc_now():
+    """Current time in the ISO format the server stores (2024-01-31T12:00:00.000Z)"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def ref(key):
+    """Placeholder for the server id created by an earlier journaled operation"""
+    return {"$ref": key}
+
+
+class Journal:
+    """Append-only queue of pending backend writes stored in SQLite (WAL mode)"""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS operations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL UNIQUE,
+                method TEXT NOT NULL,
+                path TEXT NOT NULL,
+                payload TEXT,
+                created_at TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_operations_status ON operations(status, id);
+            CREATE TABLE IF NOT EXISTS id_map (
+                key TEXT PRIMARY KEY,
+                server_id INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            );
+        """)
+        # Ids are only needed until the operations referring to them are replayed
+        self._conn.execute("DELETE FROM id_map WHERE created_at < datetime('now', '-30 days')")
+
+    def record(self, method, path, payload=None):
+        """Journal an operation and return its idempotency key"""
+        key = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO operations (key, method, path, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, method, path, json.dumps(payload) if payload is not None else None, utc_now())
+            )
+        return key
+
+    def pending(self, limit=50):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, key, method, path, payload FROM operations "
+                "WHERE status = 'pending' ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {"id": id, "key": key, "method": method, "path": path,
+             "payload": json.loads(payload) if payload else None}
+            for id, key, method, path, payload in rows
+        ]
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM operations WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def resolve(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT server_id FROM id_map WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def complete(self, op, server_id=None):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            if server_id is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO id_map (key, server_id, created_at) VALUES (?, ?, datetime('now'))",
+                    (op["key"], server_id)
+                )
+            self._conn.execute("DELETE FROM operations WHERE id = ?", (op["id"],))
+            self._conn.execute("COMMIT")
+
+    def fail(self, op, error, permanent):
+        """Record a failed attempt; permanent failures are taken out of the queue"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE operations SET attempts = attempts + 1, last_error = ?, status = ? WHERE id = ?",
+                (str(error), "failed" if permanent else "pending", op["id"])
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JournalSyncer(threading.Thread):
+    """Background thread that replays journaled operations to the backend in order
+
+    Each operation is sent with its journal key as an Idempotency-Key header,
+    so a replay after a lost response is harmless. Results are collected for
+    the UI thread to pick up with drain().
+    """
+
+    def __init__(self, journal, backend, retry_interval=SYNC_RETRY_INTERVAL):
+        super().__init__(name="journal-sync", daemon=True)
+        self.journal = journal
+        self.backend = backend
+        self.retry_interval = retry_interval
+        self.online = True
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._completed = queue.SimpleQueue()
+
+    def notify(self):
+        """Wake the syncer after a new operation has been journaled"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def drain(self):
+        """Return (key, result, error) for every operation finished since the last call"""
+        finished = []
+        while True:
+            try:
+                finished.append(self._completed.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def run(self):
+        delay = self.retry_interval
+        while not self._stopped.is_set():
+            self._wake.clear()
+            try:
+                synced = self.sync_pending()
+            except Exception as e:
+                synced = False
+                self.last_error = str(e)
+                metrics.error("journal sync", e)
+                print(f"Journal sync failed: {e}")
+
+            if synced:
+                delay = self.retry_interval
+                timeout = None  # nothing left; sleep until notified
+            else:
+                timeout = delay
+                delay = min(delay * 2, SYNC_MAX_RETRY_INTERVAL)
+            self._wake.wait(timeout)
+
+    def sync_pending(self):
+        """Replay pending operations; returns False if the backend is unreachable"""
+        while not self._stopped.is_set():
+            batch = self.journal.pending()
+            if not batch:
+                self.online = True
+                return True
+
+            for op in batch:
+                try:
+                    payload = self._resolve(op["payload"])
+                except KeyError as e:
+                    error = BackendError(f"Depends on an operation that failed: {e}")
+                    self.journal.fail(op, error, permanent=True)
+                    self._completed.put((op["key"], None, error))
+                    continue
+
+                try:
+                    response = self.backend.request(
+                        op["method"], op["path"], json=payload,
+                        headers={"Idempotency-Key": op["key"]}
+                    )
+                    result = response.json()
+                except BackendError as e:
+                    permanent = e.status is not None and 400 <= e.status < 500
+                    self.journal.fail(op, e, permanent)
+                    if not permanent:
+                        self.online = False
+                        self.last_error = str(e)
+                        return False
+                    self._completed.put((op["key"], None, e))
+                    continue
+
+                server_id = result.get("id") if op["path"] == "/timer/start" else None
+                self.journal.complete(op, server_id)
+                self.online = True
+                self.last_error = None
+                self._completed.put((op["key"], result, None))
+        return True
+
+    def _resolve(self, payload):
+        """Replace {"$ref": key} placeholders with the server ids they stand for"""
+        if not isinstance(payload, dict):
+            return payload
+        resolved = {}
+        for name, value in payload.items():
+            if isinstance(value, dict) and "$ref" in value:
+                server_id = self.journal.resolve(value["$ref"])
+                if server_id is None:
+                    raise KeyError(value["$ref"])
+                value = server_id
+            resolved[name] = value
+        return resolved
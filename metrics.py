@@ -0,0 +1,196 @@
+"""
+Runtime instrumentation
+A process-wide Metrics registry collects latency histograms for backend
+requests, Treeview syncs, UI callbacks and chart draws, plus counters and
+the most recent errors. It is cheap enough to leave on all the time; the
+Diagnostics window shows it and exports it as JSON. Profiler wraps cProfile
+for capturing what the UI thread is doing.
+"""
+import cProfile
+import io
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Upper bounds of the histogram buckets in ms; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+RECENT_SAMPLES = 512   # samples kept per series for percentiles
+RECENT_ERRORS = 50
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint(method, path):
+    """Series name for a request, with ids folded: DELETE /tasks/12 -> DELETE /tasks/:id"""
+    return f"{method} {_ID_SEGMENT.sub('/:id', path)}"
+
+
+class Histogram:
+    """Bucketed durations plus a window of recent samples for percentiles"""
+
+    __slots__ = ("count", "total", "max", "buckets", "recent", "size_total")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.size_total = 0  # sum of sizes (rows, bytes) where one was given
+
+    def add(self, ms, size=None):
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.recent.append(ms)
+        if size is not None:
+            self.size_total += size
+
+    def percentile(self, fraction):
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "max_ms": round(self.max, 3),
+            "mean_size": round(self.size_total / self.count, 1) if self.count and self.size_total else None,
+            "buckets": {f"<={bound}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}": n
+                        for i, (bound, n) in enumerate(zip(BUCKETS_MS + (None,), self.buckets)) if n},
+        }
+
+
+class Metrics:
+    """Thread-safe registry of timing series, counters and recent errors
+
+    Series are keyed by (category, name), e.g. ("request", "GET /tasks") or
+    ("render", "history").
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.series = {}
+        self.counters = {}
+        self.errors = deque(maxlen=RECENT_ERRORS)
+
+    def record(self, category, name, ms, size=None):
+        with self._lock:
+            histogram = self.series.get((category, name))
+            if histogram is None:
+                histogram = self.series[(category, name)] = Histogram()
+            histogram.add(ms, size)
+
+    @contextmanager
+    def timer(self, category, name, size=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, (time.perf_counter() - start) * 1000, size)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def error(self, source, error):
+        with self._lock:
+            self.errors.append({
+                "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "source": source,
+                "error": str(error),
+            })
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.series.clear()
+            self.counters.clear()
+            self.errors.clear()
+
+    def snapshot(self):
+        """Everything recorded so far as plain data"""
+        with self._lock:
+            return {
+                "since": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+                "series": [
+                    dict(category=category, name=name, **histogram.summary())
+                    for (category, name), histogram in sorted(self.series.items())
+                ],
+                "counters": dict(sorted(self.counters.items())),
+                "errors": list(self.errors),
+            }
+
+    def export(self, file_path, extra=None):
+        data = self.snapshot()
+        if extra:
+            data.update(extra)
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+def time_canvas_draws(canvas, name, registry=None):
+    """Record every full draw of a matplotlib canvas as ("draw", name)"""
+    registry = registry or metrics
+    draw = canvas.draw
+
+    def timed_draw(*args, **kwargs):
+        with registry.timer("draw", name):
+            return draw(*args, **kwargs)
+    canvas.draw = timed_draw
+
+
+class Profiler:
+    """On/off cProfile capture of the thread that starts it (the Tk main loop)"""
+
+    def __init__(self):
+        self._profile = None
+        self.stats = None
+
+    @property
+    def running(self):
+        return self._profile is not None
+
+    def start(self):
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self):
+        """Stop capturing; the result is kept in self.stats"""
+        if self._profile is None:
+            return None
+        import pstats  # slow to import, and only needed once a capture exists
+        self._profile.disable()
+        self.stats = pstats.Stats(self._profile)
+        self._profile = None
+        return self.stats
+
+    def summary(self, limit=30):
+        """Top functions by cumulative time as text"""
+        if self.stats is None:
+            return ""
+        out = io.StringIO()
+        self.stats.stream = out
+        self.stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def save(self, file_path):
+        """Write the capture in the .prof format read by pstats and snakeviz"""
+        self.stats.dump_stats(file_path)
+
+
+metrics = Metrics()
@@ -0,0 +1,352 @@
+"""
+Mock backend for benchmarks
+A stand-in for server.js that serves the same read endpoints (and the timer
+endpoints) from a synthetic dataset held in memory, with an optional delay
+per request to imitate network latency. Used by benchmark.py, or run it on
+its own and point BACKEND_URL at it:
+
+    python mock_backend.py --size 10k --latency 20 --port 5000
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Dataset sizes by name: number of time entries
+SIZES = {"10": 10, "10k": 10_000, "1m": 1_000_000}
+DATASET_END = datetime(2025, 6, 1, tzinfo=timezone.utc)
+DATASET_DAYS = 730
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _iso(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _hours(seconds, days=1):
+    return round(seconds / 3600 / days, 2)
+
+
+class Dataset:
+    """Synthetic groups, tasks, periods and time entries, generated from a seed
+
+    Entries are stored as columns in start-time order, so entry ids follow
+    the same (start_time, id) order the server pages by.
+    """
+
+    def __init__(self, entries, seed=1):
+        rng = random.Random(seed)
+        n_groups = 2 if entries < 100 else 8
+        tasks_per_group = 2 if entries < 100 else 10
+
+        self.groups = [{"id": g, "name": f"Group {g}"} for g in range(1, n_groups + 1)]
+        self.tasks = [
+            {"id": (g - 1) * tasks_per_group + t, "name": f"Task {g}.{t}", "group_id": g}
+            for g in range(1, n_groups + 1) for t in range(1, tasks_per_group + 1)
+        ]
+        self.task_group = {task["id"]: task["group_id"] for task in self.tasks}
+
+        # Four half-year periods covering the dataset
+        first_day = (DATASET_END - timedelta(days=DATASET_DAYS)).date()
+        self.periods = []
+        for p in range(4):
+            start = first_day + timedelta(days=p * DATASET_DAYS // 4)
+            end = first_day + timedelta(days=(p + 1) * DATASET_DAYS // 4 - 1)
+            self.periods.append({"id": p + 1, "name": f"Term {p + 1}",
+                                 "start_date": start.isoformat(), "end_date": end.isoformat()})
+
+        end = DATASET_END.timestamp()
+        starts = sorted(end - rng.random() * DATASET_DAYS * 86400 for _ in range(entries))
+        self.starts = array("d", (round(start) for start in starts))
+        self.durations = array("q", (rng.randint(300, 4 * 3600) for _ in range(entries)))
+        self.task_ids = array("q", (rng.choice(self.tasks)["id"] for _ in range(entries)))
+
+        # Per-task entry positions (ascending) and rollups per task and per period
+        self.by_task = {task["id"]: array("q") for task in self.tasks}
+        self.task_seconds = {task["id"]: 0 for task in self.tasks}
+        self.period_seconds = {(period["id"], task["id"]): 0 for period in self.periods for task in self.tasks}
+        period_bounds = [(self._period_span(period), period["id"]) for period in self.periods]
+        for i in range(entries):
+            task_id = self.task_ids[i]
+            self.by_task[task_id].append(i)
+            self.task_seconds[task_id] += self.durations[i]
+            for (start, end), period_id in period_bounds:
+                if start <= self.starts[i] < end:
+                    self.period_seconds[(period_id, task_id)] += self.durations[i]
+
+    @staticmethod
+    def _period_span(period):
+        """[start, end) of a period in epoch seconds; the end date is inclusive"""
+        start = datetime.fromisoformat(period["start_date"]).replace(tzinfo=timezone.utc)
+        end = datetime.fromisoformat(period["end_date"]).replace(tzinfo=timezone.utc) + timedelta(days=1)
+        return start.timestamp(), end.timestamp()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def entry(self, i):
+        return {
+            "id": i + 1, "task_id": self.task_ids[i], "start_time": _iso(self.starts[i]),
+            "end_time": _iso(self.starts[i] + self.durations[i]), "duration": self.durations[i],
+            "note": f"Session {i + 1}",
+        }
+
+    def task_totals(self, task_id, period_id=None):
+        if period_id:
+            return self.period_seconds.get((int(period_id), task_id), 0)
+        return self.task_seconds[task_id]
+
+    def tasks_with_totals(self, group_id):
+        return [
+            {"id": task["id"], "name": task["name"],
+             "total_hours": _hours(self.task_seconds[task["id"]]),
+             "hours_per_week": _hours(self.task_seconds[task["id"]], 7)}
+            for task in self.tasks if task["group_id"] == int(group_id)
+        ]
+
+    def entries_page(self, task_id, limit, cursor=None):
+        positions = self.by_task.get(int(task_id), array("q"))
+        end = len(positions)
+        if cursor:
+            end = bisect_left(positions, int(cursor.rpartition("|")[2]) - 1)
+        page = [self.entry(positions[k]) for k in range(end - 1, max(end - limit, 0) - 1, -1)]
+        more = end - limit > 0
+        return {"entries": page,
+                "next_cursor": f"{page[-1]['start_time']}|{page[-1]['id']}" if more and page else None}
+
+    def time_by_group(self, period_id=None):
+        rows = []
+        for group in self.groups:
+            seconds = sum(self.task_totals(task["id"], period_id)
+                          for task in self.tasks if task["group_id"] == group["id"])
+            rows.append({"id": group["id"], "name": group["name"],
+                         "total_time": _hours(seconds), "hours_per_week": _hours(seconds, 7)})
+        return rows
+
+    def time_by_task(self, group_id=None, period_id=None):
+        rows = []
+        for task in self.tasks:
+            if group_id and task["group_id"] != int(group_id):
+                continue
+            seconds = self.task_totals(task["id"], period_id)
+            rows.append({"id": task["id"], "name": task["name"], "group_id": task["group_id"],
+                         "total_time": _hours(seconds), "hours_per_week": _hours(seconds, 7)})
+        return rows
+
+    def entry_range(self, period_id=None):
+        """Positions of entries starting within a period (all entries without one)"""
+        if not period_id:
+            return range(len(self))
+        period = next(p for p in self.periods if p["id"] == int(period_id))
+        start, end = self._period_span(period)
+        return range(bisect_left(self.starts, start), bisect_left(self.starts, end))
+
+    def intervals(self, period_id=None):
+        positions = self.entry_range(period_id)
+        return {
+            "task_id": [self.task_ids[i] for i in positions],
+            "group_id": [self.task_group[self.task_ids[i]] for i in positions],
+            "start": [int(self.starts[i] * 1000) for i in positions],
+            "end": [int((self.starts[i] + self.durations[i]) * 1000) for i in positions],
+        }
+
+    def export_lines(self):
+        """The /export NDJSON stream as a sequence of text chunks"""
+        counts = {"groups": len(self.groups), "tasks": len(self.tasks),
+                  "time_entries": len(self), "academic_periods": len(self.periods)}
+        yield json.dumps({"counts": counts}) + "\n"
+        for table, rows in (("groups", self.groups), ("tasks", self.tasks)):
+            yield "".join(json.dumps({"table": table, "row": row}) + "\n" for row in rows)
+        for first in range(0, len(self), EXPORT_CHUNK_SIZE):
+            yield "".join(
+                json.dumps({"table": "time_entries", "row": dict(self.entry(i), period_id=None)}) + "\n"
+                for i in range(first, min(first + EXPORT_CHUNK_SIZE, len(self)))
+            )
+        yield "".join(json.dumps({"table": "academic_periods", "row": row}) + "\n" for row in self.periods)
+
+
+class MockBackend:
+    """Serves a Dataset over HTTP on a background thread
+
+    latency is added to every request, in seconds. GET responses are cached
+    per URL, so repeated requests measure the client rather than the mock.
+    """
+
+    def __init__(self, dataset, latency=0.0, host="127.0.0.1", port=0):
+        self.dataset = dataset
+        self.latency = latency
+        self.requests = 0
+        self.running = {}  # entry id -> running timer row
+        self.next_id = len(dataset) + 1
+        self._responses = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def get(self, path, query):
+        """JSON value for a GET request, or None if the path is unknown"""
+        data = self.dataset
+        arg = lambda name: query.get(name, [None])[0]
+        if path == "/groups":
+            return data.groups
+        if path == "/periods":
+            return data.periods
+        if path == "/all_tasks":
+            return data.tasks
+        if path == "/tasks":
+            return data.tasks_with_totals(arg("group_id"))
+        if path == "/time_entries":
+            limit = int(arg("limit") or 0)
+            if not limit:
+                return [data.entry(i) for i in data.by_task.get(int(arg("task_id")), ())]
+            return data.entries_page(arg("task_id"), limit, arg("cursor"))
+        if path == "/time_by_group":
+            return data.time_by_group(arg("period_id"))
+        if path == "/time_by_task":
+            return data.time_by_task(arg("group_id"), arg("period_id"))
+        if path == "/intervals":
+            return data.intervals(arg("period_id"))
+        if path == "/timer/running":
+            return sorted(self.running.values(), key=lambda row: (row["start_time"], row["id"]))
+        if path == "/snapshot":
+            mode = "task" if arg("mode") == "task" else "group"
+            limit = int(arg("limit") or 200)
+            return {
+                "mode": mode,
+                "groups": data.groups,
+                "periods": data.periods,
+                "tasks": data.tasks_with_totals(arg("group_id")) if arg("group_id") else None,
+                "entries": data.entries_page(arg("task_id"), limit) if arg("task_id") else None,
+                "aggregates": (data.time_by_task(arg("group_id"), arg("period_id")) if mode == "task"
+                               else data.time_by_group(arg("period_id"))),
+            }
+        return None
+
+    def post(self, path, body):
+        if path == "/timer/start":
+            with self._lock:
+                entry_id, self.next_id = self.next_id, self.next_id + 1
+            task = next((t for t in self.dataset.tasks if t["id"] == body.get("task_id")), {})
+            self.running[entry_id] = {"id": entry_id, "task_id": body.get("task_id"),
+                                      "task_name": task.get("name"), "group_id": task.get("group_id"),
+                                      "start_time": body.get("start_time") or _iso(time.time())}
+            return {"id": entry_id}
+        if path == "/timer/stop":
+            row = self.running.pop(body.get("id"), None)
+            if row is None:
+                return None
+            start = datetime.fromisoformat(row["start_time"].replace("Z", "+00:00")).timestamp()
+            end = datetime.fromisoformat((body.get("end_time") or _iso(time.time())).replace("Z", "+00:00"))
+            return {"duration": int(end.timestamp() - start)}
+        return None
+
+    def _handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the Node server
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def log_message(self, format, *args):
+                pass
+
+            def _begin(self):
+                backend.requests += 1
+                if backend.latency:
+                    time.sleep(backend.latency)
+
+            def _send(self, status, body, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._begin()
+                url = urlparse(self.path)
+                if url.path == "/export":
+                    return self._stream(backend.dataset.export_lines())
+
+                body = backend._responses.get(self.path)
+                if body is None:
+                    value = backend.get(url.path, parse_qs(url.query))
+                    if value is None:
+                        return self._send(404, b"Not found", "text/plain")
+                    body = json.dumps(value).encode("utf-8")
+                    if url.path != "/timer/running":
+                        backend._responses[self.path] = body
+                self._send(200, body)
+
+            def do_POST(self):
+                self._begin()
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                value = backend.post(urlparse(self.path).path, body)
+                if value is None:
+                    return self._send(404, b"Not found", "text/plain")
+                self._send(200, json.dumps(value).encode("utf-8"))
+
+            def do_DELETE(self):
+                self._begin()
+                self._send(404, b"Not found", "text/plain")
+
+            def _stream(self, chunks):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in chunks:
+                    data = chunk.encode("utf-8")
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic dataset like server.js")
+    parser.add_argument("--size", choices=SIZES, default="10k", help="number of time entries")
+    parser.add_argument("--latency", type=float, default=0, help="delay per request in ms")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    dataset = Dataset(SIZES[args.size], args.seed)
+    backend = MockBackend(dataset, args.latency / 1000, host="0.0.0.0", port=args.port)
+    print(f"Serving {len(dataset):,} entries on port {args.port}")
+    try:
+        backend.server.serve_forever()
+    except KeyboardInterrupt:
+        backend.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
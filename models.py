@@ -0,0 +1,242 @@
+"""
+Client-side model layer
+Entities from the backend are kept as small __slots__ objects indexed by id
+(and periods by name), and the history's time entries as typed array
+columns, instead of lists of JSON dicts or values read back from widgets.
+"""
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+NO_DURATION = -1  # duration column value for an entry that is still running
+
+
+def parse_time(value):
+    """Epoch seconds for an ISO timestamp as stored by the server (UTC if no zone)"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+@dataclass
+class Group:
+    __slots__ = ("id", "name")
+    id: int
+    name: str
+
+    @classmethod
+    def from_json(cls, row):
+        return cls(row["id"], row["name"])
+
+
+@dataclass
+class Task:
+    __slots__ = ("id", "name", "group_id", "total_hours", "hours_per_week")
+    id: int
+    name: str
+    group_id: int
+    total_hours: float
+    hours_per_week: float
+
+    @classmethod
+    def from_json(cls, row, group_id=None):
+        return cls(row["id"], row["name"], row.get("group_id", group_id),
+                   row.get("total_hours", 0), row.get("hours_per_week", 0))
+
+
+@dataclass
+class Period:
+    __slots__ = ("id", "name", "start_date", "end_date")
+    id: int
+    name: str
+    start_date: str
+    end_date: str
+
+    @classmethod
+    def from_json(cls, row):
+        return cls(row["id"], row["name"], row["start_date"], row["end_date"])
+
+
+@dataclass
+class TimeEntry:
+    __slots__ = ("id", "task_id", "start", "end", "duration", "note")
+    id: int
+    task_id: int
+    start: float            # epoch seconds
+    end: float              # epoch seconds, or None while running
+    duration: int           # seconds, or None while running
+    note: str
+
+
+class EntryTable:
+    """Time entries as parallel typed columns, newest first
+
+    Timestamps are epoch seconds (float64), ids and durations int64; a
+    running entry has a NaN end and NO_DURATION. Looking up an entry by id
+    is O(1). Removed rows are only marked, and dropped in one pass the next
+    time the columns are read, so a burst of deletes costs a single copy.
+    """
+
+    __slots__ = ("_ids", "_task_ids", "_starts", "_ends", "_durations", "_notes", "_positions", "_removed")
+
+    def __init__(self, rows=()):
+        self._ids = array("q")
+        self._task_ids = array("q")
+        self._starts = array("d")
+        self._ends = array("d")
+        self._durations = array("q")
+        self._notes = []
+        self._positions = {}  # entry id -> row
+        self._removed = set()  # rows removed since the last compaction
+        self.extend(rows)
+
+    def _compact(self):
+        if not self._removed:
+            return
+        keep = [i for i in range(len(self._ids)) if i not in self._removed]
+        self._ids = array("q", (self._ids[i] for i in keep))
+        self._task_ids = array("q", (self._task_ids[i] for i in keep))
+        self._starts = array("d", (self._starts[i] for i in keep))
+        self._ends = array("d", (self._ends[i] for i in keep))
+        self._durations = array("q", (self._durations[i] for i in keep))
+        self._notes = [self._notes[i] for i in keep]
+        self._positions = {entry_id: i for i, entry_id in enumerate(self._ids)}
+        self._removed.clear()
+
+    @property
+    def ids(self):
+        self._compact()
+        return self._ids
+
+    @property
+    def task_ids(self):
+        self._compact()
+        return self._task_ids
+
+    @property
+    def starts(self):
+        self._compact()
+        return self._starts
+
+    @property
+    def ends(self):
+        self._compact()
+        return self._ends
+
+    @property
+    def durations(self):
+        self._compact()
+        return self._durations
+
+    @property
+    def notes(self):
+        self._compact()
+        return self._notes
+
+    def __len__(self):
+        return len(self._ids) - len(self._removed)
+
+    def extend(self, rows):
+        """Append JSON rows from /time_entries"""
+        self._compact()
+        for row in rows:
+            self._positions[row["id"]] = len(self._ids)
+            self._ids.append(row["id"])
+            self._task_ids.append(row["task_id"])
+            self._starts.append(parse_time(row["start_time"]))
+            self._ends.append(parse_time(row["end_time"]) if row.get("end_time") else float("nan"))
+            duration = row.get("duration")
+            self._durations.append(NO_DURATION if duration is None else duration)
+            self._notes.append(row.get("note") or "")
+
+    def _take(self, rows):
+        """New table with the given row positions, in order"""
+        self._compact()
+        table = EntryTable()
+        for i in rows:
+            table._positions[self._ids[i]] = len(table._ids)
+            table._ids.append(self._ids[i])
+            table._task_ids.append(self._task_ids[i])
+            table._starts.append(self._starts[i])
+            table._ends.append(self._ends[i])
+            table._durations.append(self._durations[i])
+            table._notes.append(self._notes[i])
+        return table
+
+    def append(self, other):
+        """Append another table's rows in place"""
+        self._compact()
+        for entry_id in other.ids:
+            self._positions[entry_id] = len(self._ids)
+            self._ids.append(entry_id)
+        self._task_ids.extend(other.task_ids)
+        self._starts.extend(other.starts)
+        self._ends.extend(other.ends)
+        self._durations.extend(other.durations)
+        self._notes.extend(other.notes)
+
+    def key(self, i):
+        """Sort key of row i, matching the server's (start_time, id) order"""
+        self._compact()
+        return self._starts[i], self._ids[i]
+
+    def older_than(self, key):
+        """Rows that sort before key, i.e. appear after it in the history"""
+        self._compact()
+        return self._take(i for i in range(len(self)) if self.key(i) < key)
+
+    def remove(self, entry_id):
+        """Remove an entry in place, if present"""
+        position = self._positions.pop(entry_id, None)
+        if position is not None:
+            self._removed.add(position)
+
+    def __contains__(self, entry_id):
+        return entry_id in self._positions
+
+    def entry(self, i):
+        self._compact()
+        duration = self._durations[i]
+        end = self._ends[i]
+        return TimeEntry(self._ids[i], self._task_ids[i], self._starts[i],
+                         None if end != end else end,
+                         None if duration == NO_DURATION else duration, self._notes[i])
+
+
+class Store:
+    """Groups, tasks and periods currently known to the client, indexed by id
+
+    Ids are ints; Treeview rows use str(id) as their iid, so a selection
+    maps straight to an entity without reading the widget's values.
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self.tasks = {}
+        self.periods = {}
+        self.periods_by_name = {}
+
+    def set_groups(self, rows):
+        groups = [Group.from_json(row) for row in rows]
+        self.groups = {group.id: group for group in groups}
+        return groups
+
+    def set_tasks(self, group_id, rows):
+        """Replace the tasks of one group"""
+        tasks = [Task.from_json(row, group_id) for row in rows]
+        self.tasks = {task_id: task for task_id, task in self.tasks.items() if task.group_id != group_id}
+        self.tasks.update((task.id, task) for task in tasks)
+        return tasks
+
+    def set_periods(self, rows):
+        periods = [Period.from_json(row) for row in rows]
+        self.periods = {period.id: period for period in periods}
+        self.periods_by_name = {period.name: period for period in periods}
+        return periods
+
+    def group(self, iid):
+        return self.groups.get(int(iid))
+
+    def task(self, iid):
+        return self.tasks.get(int(iid))
@@ -0,0 +1,349 @@
+"""
+Period reports
+collect() gathers hours per group and per task for one academic period (or
+all time) from the chart's aggregate endpoints, /time_by_group and
+/time_by_task. render() turns a report into a multi-page PDF or a single
+self-contained HTML file with matplotlib charts. Rendering is CPU-bound, so
+ReportPool runs it in worker processes: several reports render at once on
+separate cores while the Tk loop stays responsive.
+"""
+import html
+import io
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+# Try to load configuration from config.py, fallback to defaults
+try:
+    import config
+except ImportError:
+    config = None
+
+REPORT_DIR = getattr(config, "REPORT_DIR", "reports")
+# Worker processes for rendering; each report renders in one of them
+REPORT_WORKERS = getattr(config, "REPORT_WORKERS", min(4, os.cpu_count() or 1))
+
+REPORT_FORMATS = (".pdf", ".html")
+PAGE_SIZE = (8.27, 11.69)   # A4 portrait, inches
+TABLE_ROWS_PER_PAGE = 30
+CHART_TOP = 15              # bars per task chart; the tables list everything
+PIE_SLICES = 8              # largest groups on the summary pie, the rest as "Other"
+LABEL_WIDTH = 40            # longer names are shortened on chart axes
+NO_GROUP = "No group"
+
+
+def _weeks(period):
+    """Length of a period in weeks, or None for all time"""
+    if period is None:
+        return None
+    try:
+        days = (date.fromisoformat(period.end_date) - date.fromisoformat(period.start_date)).days + 1
+    except ValueError:
+        return None
+    return days / 7 if days > 0 else None
+
+
+def _share(part, whole):
+    return part / whole if whole else 0.0
+
+
+def collect(backend, period=None):
+    """Per-group and per-task hours for a period (None for all time) as plain data
+
+    Returns {"title", "start_date", "end_date", "generated", "total_hours",
+    "hours_per_week", "active_tasks", "groups": [{"name", "hours", "share",
+    "hours_per_week", "tasks": [{"name", "hours", "share"}, ...]}, ...]},
+    groups and tasks sorted by hours. A task's share is of its group's hours.
+    hours_per_week is averaged over the period's length, so it is None for
+    all time. The result is picklable, for render() in a worker process.
+    """
+    params = {"period_id": period.id} if period else None
+    group_rows = backend.cached_get("/time_by_group", params)
+    task_rows = backend.cached_get("/time_by_task", params)
+    weeks = _weeks(period)
+
+    groups = {row["id"]: {"name": row["name"], "hours": row["total_time"] or 0, "tasks": []}
+              for row in group_rows}
+    for row in task_rows:
+        group = groups.get(row.get("group_id"))
+        if group is None:
+            # Tasks whose group is gone still count towards the total
+            group = groups.setdefault(None, {"name": NO_GROUP, "hours": 0, "tasks": []})
+            group["hours"] += row["total_time"] or 0
+        group["tasks"].append({"name": row["name"], "hours": row["total_time"] or 0})
+
+    total = sum(group["hours"] for group in groups.values())
+    for group in groups.values():
+        group["share"] = _share(group["hours"], total)
+        group["hours_per_week"] = group["hours"] / weeks if weeks else None
+        for task in group["tasks"]:
+            task["share"] = _share(task["hours"], group["hours"])
+        group["tasks"].sort(key=lambda task: (-task["hours"], task["name"]))
+
+    return {
+        "title": period.name if period else "All Time",
+        "start_date": period.start_date if period else None,
+        "end_date": period.end_date if period else None,
+        "generated": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "total_hours": total,
+        "hours_per_week": total / weeks if weeks else None,
+        "active_tasks": sum(1 for row in task_rows if row["total_time"]),
+        "groups": sorted(groups.values(), key=lambda group: (-group["hours"], group["name"])),
+    }
+
+
+def report_filename(report, extension):
+    """File name for a report, e.g. Fall_2024_report_20241218.pdf"""
+    name = re.sub(r"[^\w-]+", "_", report["title"]).strip("_") or "report"
+    return f"{name}_report_{datetime.now():%Y%m%d}{extension}"
+
+
+def _period_line(report):
+    if report["start_date"]:
+        return f"{report['start_date']} to {report['end_date']}"
+    return "All recorded time"
+
+
+def _summary_lines(report):
+    active = [group for group in report["groups"] if group["hours"]]
+    lines = [
+        f"Total: {report['total_hours']:.2f} hours",
+        f"Groups with time: {len(active)} of {len(report['groups'])}",
+        f"Tasks with time: {report['active_tasks']}",
+    ]
+    if report["hours_per_week"] is not None:
+        lines.insert(1, f"Per week: {report['hours_per_week']:.2f} hours")
+    return lines
+
+
+def _group_rows(report):
+    rows = []
+    for group in report["groups"]:
+        row = [group["name"], f"{group['hours']:.2f}", f"{100 * group['share']:.1f}%"]
+        if report["hours_per_week"] is not None:
+            row.append(f"{group['hours_per_week']:.2f}")
+        rows.append(row)
+    return rows
+
+
+def _group_columns(report):
+    columns = ["Group", "Hours", "Share"]
+    if report["hours_per_week"] is not None:
+        columns.append("Per week")
+    return columns
+
+
+def _task_rows(group):
+    return [[task["name"], f"{task['hours']:.2f}", f"{100 * task['share']:.1f}%"]
+            for task in group["tasks"]]
+
+
+# Charts
+def _label(name):
+    return name if len(name) <= LABEL_WIDTH else name[:LABEL_WIDTH - 1] + "…"
+
+
+def _pie_chart(fig, rect, report):
+    """Share of hours by group, with the smallest groups folded into Other"""
+    ax = fig.add_axes(rect)
+    groups = [group for group in report["groups"] if group["hours"] > 0]
+    if not groups:
+        ax.text(0.5, 0.5, "No time recorded", ha="center", va="center", transform=ax.transAxes)
+        ax.axis("off")
+        return
+    labels = [_label(group["name"]) for group in groups[:PIE_SLICES]]
+    sizes = [group["hours"] for group in groups[:PIE_SLICES]]
+    if len(groups) > PIE_SLICES:
+        labels.append("Other")
+        sizes.append(sum(group["hours"] for group in groups[PIE_SLICES:]))
+    ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90, counterclock=False,
+           textprops={"fontsize": 8})
+    ax.set_title("Hours by Group", fontsize=11)
+    ax.axis("equal")
+
+
+def _bar_chart(fig, rect, title, items):
+    """Horizontal bars of hours, largest first"""
+    ax = fig.add_axes(rect)
+    items = [item for item in items if item["hours"] > 0][:CHART_TOP]
+    if not items:
+        ax.text(0.5, 0.5, "No time recorded", ha="center", va="center", transform=ax.transAxes)
+        ax.axis("off")
+        return
+    positions = range(len(items))
+    ax.barh(positions, [item["hours"] for item in items], color="#1f78b4")
+    ax.set_yticks(positions, [_label(item["name"]) for item in items], fontsize=8)
+    ax.invert_yaxis()
+    ax.set_xlabel("Hours", fontsize=9)
+    ax.tick_params(axis="x", labelsize=8)
+    ax.set_title(title, fontsize=11)
+
+
+def _table(fig, rect, columns, rows):
+    ax = fig.add_axes(rect)
+    ax.axis("off")
+    if not rows:
+        return
+    table = ax.table(cellText=rows, colLabels=columns, loc="upper center", cellLoc="right",
+                     colLoc="right", colWidths=[0.55] + [0.45 / (len(columns) - 1)] * (len(columns) - 1))
+    table.auto_set_font_size(False)
+    table.set_fontsize(8)
+    for (row, column), cell in table.get_celld().items():
+        cell.set_height(1 / (TABLE_ROWS_PER_PAGE + 1))
+        if column == 0:
+            cell.set_text_props(ha="left")
+            cell.PAD = 0.02
+        if row == 0:
+            cell.set_text_props(weight="bold")
+            cell.set_facecolor("#e8e8e8")
+
+
+def _chunks(rows, size=TABLE_ROWS_PER_PAGE):
+    return [rows[i:i + size] for i in range(0, len(rows), size)] or [[]]
+
+
+# PDF
+def _page(report, heading):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=PAGE_SIZE)
+    fig.text(0.08, 0.95, heading, fontsize=16, weight="bold")
+    fig.text(0.08, 0.925, f"{report['title']} — {_period_line(report)}", fontsize=9, color="#555555")
+    fig.text(0.92, 0.03, f"Generated {report['generated']}", fontsize=7, color="#888888", ha="right")
+    return fig
+
+
+def _render_pdf(report, file_path):
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    with PdfPages(file_path) as pdf:
+        info = pdf.infodict()
+        info["Title"] = f"Time Report: {report['title']}"
+
+        def add_pages(heading, draw, columns, rows):
+            # The first page has a chart above half a page of table rows;
+            # rows that don't fit continue on full pages
+            first, rest = rows[:TABLE_ROWS_PER_PAGE // 2], rows[TABLE_ROWS_PER_PAGE // 2:]
+            fig = _page(report, heading)
+            draw(fig)
+            _table(fig, (0.08, 0.06, 0.84, 0.36), columns, first)
+            pdf.savefig(fig)
+            for chunk in _chunks(rest) if rest else []:
+                fig = _page(report, f"{heading} (continued)")
+                _table(fig, (0.08, 0.06, 0.84, 0.84), columns, chunk)
+                pdf.savefig(fig)
+
+        def draw_summary(fig):
+            for line_number, line in enumerate(_summary_lines(report)):
+                fig.text(0.08, 0.88 - 0.02 * line_number, line, fontsize=10)
+            _pie_chart(fig, (0.2, 0.47, 0.6, 0.3), report)
+
+        add_pages(f"Time Report: {report['title']}", draw_summary,
+                  _group_columns(report), _group_rows(report))
+
+        # One section per group with time: task chart, then the task table
+        for group in report["groups"]:
+            if group["hours"]:
+                add_pages(f"{group['name']}: {group['hours']:.2f} hours",
+                          lambda fig: _bar_chart(fig, (0.3, 0.5, 0.62, 0.38), "Hours by Task", group["tasks"]),
+                          ["Task", "Hours", "Share of group"], _task_rows(group))
+        return pdf.get_pagecount()
+
+
+# HTML
+HTML_STYLE = """
+body { font-family: Segoe UI, Helvetica, Arial, sans-serif; margin: 2em auto; max-width: 50em; color: #222; }
+h1 { margin-bottom: 0; } .period { color: #666; margin-top: 0.2em; }
+table { border-collapse: collapse; width: 100%; margin: 1em 0 2em; font-size: 0.9em; }
+th, td { padding: 0.3em 0.6em; border-bottom: 1px solid #ddd; text-align: right; }
+th:first-child, td:first-child { text-align: left; } th { background: #eee; }
+svg { max-width: 100%; height: auto; } footer { color: #888; font-size: 0.8em; }
+@media print { section { page-break-before: always; } }
+"""
+
+
+def _svg(draw):
+    """A chart drawn by draw(fig) as inline SVG"""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(7, 4))
+    draw(fig)
+    out = io.StringIO()
+    fig.savefig(out, format="svg", bbox_inches="tight")
+    svg = out.getvalue()
+    return svg[svg.index("<svg"):]  # drop the XML prolog and doctype
+
+
+def _html_table(columns, rows):
+    head = "".join(f"<th>{html.escape(column)}</th>" for column in columns)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>"
+                   for row in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _render_html(report, file_path):
+    title = html.escape(report["title"])
+    parts = [
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Time Report: {title}</title>",
+        f"<style>{HTML_STYLE}</style></head><body>",
+        f"<h1>Time Report: {title}</h1><p class=\"period\">{html.escape(_period_line(report))}</p>",
+        "<ul>" + "".join(f"<li>{html.escape(line)}</li>" for line in _summary_lines(report)) + "</ul>",
+        _svg(lambda fig: _pie_chart(fig, (0.1, 0.05, 0.8, 0.85), report)),
+        _html_table(_group_columns(report), _group_rows(report)),
+    ]
+    pages = 1
+    for group in report["groups"]:
+        if not group["hours"]:
+            continue
+        parts.append(f"<section><h2>{html.escape(group['name'])}: {group['hours']:.2f} hours</h2>")
+        parts.append(_svg(lambda fig: _bar_chart(fig, (0.35, 0.12, 0.6, 0.8), "Hours by Task", group["tasks"])))
+        parts.append(_html_table(["Task", "Hours", "Share of group"], _task_rows(group)))
+        parts.append("</section>")
+        pages += 1
+    parts.append(f"<footer>Generated {html.escape(report['generated'])}</footer></body></html>")
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+    return pages
+
+
+def render(report, file_path):
+    """Write a report from collect() as PDF or HTML, by file extension
+
+    Returns the number of pages (sections, for HTML). Only needs matplotlib,
+    which is imported here so worker processes load it on first use.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {extension or file_path}")
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    if extension == ".pdf":
+        return _render_pdf(report, file_path)
+    return _render_html(report, file_path)
+
+
+class ReportPool:
+    """Renders reports in worker processes
+
+    Workers are started on first use and kept for later reports. They are
+    spawned rather than forked, so they never inherit the GUI's Tk state or
+    threads.
+    """
+
+    def __init__(self, max_workers=REPORT_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._executor = None
+
+    def submit(self, report, file_path):
+        """Start rendering; returns a Future for render()'s page count"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor.submit(render, report, file_path)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -3,12 +3,19 @@ const sqlite3 = require('sqlite3').verbose();
 const bodyParser = require('body-parser');
 const path = require('path');
 const fs = require('fs');
+const zlib = require('zlib');
+const crypto = require('crypto');
+const { pipeline } = require('stream');
 
 const app = express();
 const port = 5000;
 // Use data directory for database persistence in Docker
 const dbPath = process.env.NODE_ENV === 'production' ? './data/database.db' : './database.db';
 const db = new sqlite3.Database(dbPath);
+// Bulk imports write through their own connection; wait for their batch
+// transaction to commit instead of failing with SQLITE_BUSY
+const DB_BUSY_TIMEOUT_MS = 10000;
+db.configure('busyTimeout', DB_BUSY_TIMEOUT_MS);
 
 app.use(bodyParser.json());
 
@@ -18,13 +25,39 @@ app.use((req, res, next) => {
     next();
 });
 
+// Idempotency keys: a write sent with an Idempotency-Key header is applied at
+// most once. Replays (e.g. from a client's offline journal) get the stored
+// response instead of repeating the write.
+app.use((req, res, next) => {
+  const key = req.get('Idempotency-Key');
+  if (!key || req.method === 'GET') return next();
+
+  db.get('SELECT status, body FROM idempotency_keys WHERE key = ?', [key], (err, row) => {
+    if (err) return next(err);
+    if (row) return res.status(row.status).type('json').send(row.body);
+
+    const json = res.json.bind(res);
+    res.json = (body) => {
+      db.run('INSERT OR IGNORE INTO idempotency_keys (key, status, body) VALUES (?, ?, ?)',
+        [key, res.statusCode, JSON.stringify(body)]);
+      return json(body);
+    };
+    next();
+  });
+});
+
 // Handle favicon requests
 app.get('/favicon.ico', (req, res) => {
     res.status(204).end();
 });
 
-// Create tables synchronously before starting server
-db.serialize(() => {
+// Search index row kinds; the search index's rowid is id * 4 + kind. Declared
+// before createSchema, which db.serialize runs synchronously at load.
+const SEARCH_KINDS = { group: 0, task: 1, entry: 2 };
+
+// Tables, indexes, rollups and the period index. Everything is IF NOT EXISTS,
+// so this also brings a restored older database up to date.
+function createSchema() {
   db.run(`CREATE TABLE IF NOT EXISTS groups (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL
@@ -48,16 +81,48 @@ db.serialize(() => {
     FOREIGN KEY(task_id) REFERENCES tasks(id)
   )`);
 
+  // Supports the newest-first, keyset-paginated history query in GET /time_entries
+  db.run(`CREATE INDEX IF NOT EXISTS idx_time_entries_task_start
+    ON time_entries(task_id, start_time DESC, id DESC)`);
+
   db.run(`CREATE TABLE IF NOT EXISTS academic_periods (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
     start_date DATE NOT NULL,
     end_date DATE NOT NULL
   )`);
+
+  // Covering indexes for the aggregate endpoints: per-task sums restricted to a
+  // start_time range are answered from the index without touching the table
+  db.run('CREATE INDEX IF NOT EXISTS idx_time_entries_task_start_duration ON time_entries(task_id, start_time, duration)');
+  db.run('CREATE INDEX IF NOT EXISTS idx_time_entries_start ON time_entries(start_time)');
+  db.run('CREATE INDEX IF NOT EXISTS idx_tasks_group ON tasks(group_id, id)');
+  // Running timers are the few entries without an end time
+  db.run('CREATE INDEX IF NOT EXISTS idx_time_entries_running ON time_entries(start_time, id) WHERE end_time IS NULL');
+
+  db.run(`CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    body TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+  )`);
+  db.run("DELETE FROM idempotency_keys WHERE created_at < datetime('now', '-30 days')");
+
+  createRollups();
+  createPeriodIndex();
+  createSearchIndex();
+}
+
+// Create tables synchronously before starting server
+db.serialize(() => {
+  createSchema();
   
   // Start server AFTER tables are created
   const server = app.listen(port, () => console.log(`Server running on port ${port}`));
-  
+  // Keep idle client connections open so pooled desktop clients can reuse them
+  server.keepAliveTimeout = 65000;
+  server.headersTimeout = 66000;
+
   // Add shutdown endpoint
   app.get('/shutdown', (req, res) => {
       res.json({ success: true });
@@ -68,6 +133,314 @@ db.serialize(() => {
   });
 });
 
+// Rollup tables: running per-task, per-group and per-task-per-day totals of
+// completed time entries. Triggers keep them in step with time_entries inside
+// the same transaction as the write, so the totals endpoints read a handful of
+// rows instead of summing the whole history.
+function createRollups() {
+  db.run(`CREATE TABLE IF NOT EXISTS task_totals (
+    task_id INTEGER PRIMARY KEY,
+    total_seconds INTEGER NOT NULL DEFAULT 0,
+    entry_count INTEGER NOT NULL DEFAULT 0
+  )`);
+
+  db.run(`CREATE TABLE IF NOT EXISTS group_totals (
+    group_id INTEGER PRIMARY KEY,
+    total_seconds INTEGER NOT NULL DEFAULT 0
+  )`);
+
+  db.run(`CREATE TABLE IF NOT EXISTS daily_totals (
+    task_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    total_seconds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (task_id, day)
+  ) WITHOUT ROWID`);
+
+  // Add an entry's duration to every rollup (only once it has one)
+  const addEntry = (row) => `
+    INSERT INTO task_totals (task_id, total_seconds, entry_count)
+      SELECT ${row}.task_id, ${row}.duration, 1 WHERE ${row}.duration IS NOT NULL
+      ON CONFLICT(task_id) DO UPDATE SET
+        total_seconds = total_seconds + excluded.total_seconds,
+        entry_count = entry_count + 1;
+    INSERT INTO group_totals (group_id, total_seconds)
+      SELECT group_id, ${row}.duration FROM tasks
+      WHERE id = ${row}.task_id AND group_id IS NOT NULL AND ${row}.duration IS NOT NULL
+      ON CONFLICT(group_id) DO UPDATE SET total_seconds = total_seconds + excluded.total_seconds;
+    INSERT INTO daily_totals (task_id, day, total_seconds)
+      SELECT ${row}.task_id, substr(${row}.start_time, 1, 10), ${row}.duration WHERE ${row}.duration IS NOT NULL
+      ON CONFLICT(task_id, day) DO UPDATE SET total_seconds = total_seconds + excluded.total_seconds;`;
+
+  // Take an entry's duration back out of every rollup
+  const removeEntry = (row) => `
+    UPDATE task_totals SET total_seconds = total_seconds - ${row}.duration, entry_count = entry_count - 1
+      WHERE task_id = ${row}.task_id AND ${row}.duration IS NOT NULL;
+    UPDATE group_totals SET total_seconds = total_seconds - ${row}.duration
+      WHERE group_id = (SELECT group_id FROM tasks WHERE id = ${row}.task_id) AND ${row}.duration IS NOT NULL;
+    UPDATE daily_totals SET total_seconds = total_seconds - ${row}.duration
+      WHERE task_id = ${row}.task_id AND day = substr(${row}.start_time, 1, 10) AND ${row}.duration IS NOT NULL;`;
+
+  db.run(`CREATE TRIGGER IF NOT EXISTS rollup_entry_insert AFTER INSERT ON time_entries
+    BEGIN ${addEntry('NEW')} END`);
+  db.run(`CREATE TRIGGER IF NOT EXISTS rollup_entry_update
+    AFTER UPDATE OF task_id, start_time, duration ON time_entries
+    BEGIN ${removeEntry('OLD')} ${addEntry('NEW')} END`);
+  db.run(`CREATE TRIGGER IF NOT EXISTS rollup_entry_delete AFTER DELETE ON time_entries
+    BEGIN ${removeEntry('OLD')} END`);
+
+  // Deleted tasks and groups stop counting towards any total
+  db.run(`CREATE TRIGGER IF NOT EXISTS rollup_task_delete AFTER DELETE ON tasks
+    BEGIN
+      UPDATE group_totals
+        SET total_seconds = total_seconds - COALESCE((SELECT total_seconds FROM task_totals WHERE task_id = OLD.id), 0)
+        WHERE group_id = OLD.group_id;
+      DELETE FROM task_totals WHERE task_id = OLD.id;
+      DELETE FROM daily_totals WHERE task_id = OLD.id;
+    END`);
+  db.run(`CREATE TRIGGER IF NOT EXISTS rollup_group_delete AFTER DELETE ON groups
+    BEGIN
+      DELETE FROM group_totals WHERE group_id = OLD.id;
+    END`);
+
+  // Populate the rollups the first time they exist on a database with history,
+  // or on demand with `node server.js --rebuild-rollups`
+  db.get(`SELECT NOT EXISTS (SELECT 1 FROM task_totals)
+            AND EXISTS (SELECT 1 FROM time_entries WHERE duration IS NOT NULL) AS empty`, (err, row) => {
+    if (err) return console.error(err);
+    if (row.empty || process.argv.includes('--rebuild-rollups')) {
+      rebuildRollups((err) => {
+        if (err) return console.error("Failed to rebuild rollups:", err);
+        console.log("Rollup tables rebuilt");
+      });
+    }
+  });
+}
+
+// Recompute every rollup table from time_entries in a single transaction
+function rebuildRollups(callback) {
+  db.exec(`
+    BEGIN IMMEDIATE;
+    DELETE FROM task_totals;
+    DELETE FROM group_totals;
+    DELETE FROM daily_totals;
+    INSERT INTO task_totals (task_id, total_seconds, entry_count)
+      SELECT time_entries.task_id, SUM(duration), COUNT(*)
+      FROM time_entries JOIN tasks ON tasks.id = time_entries.task_id
+      WHERE duration IS NOT NULL
+      GROUP BY time_entries.task_id;
+    INSERT INTO daily_totals (task_id, day, total_seconds)
+      SELECT time_entries.task_id, substr(start_time, 1, 10), SUM(duration)
+      FROM time_entries JOIN tasks ON tasks.id = time_entries.task_id
+      WHERE duration IS NOT NULL
+      GROUP BY time_entries.task_id, substr(start_time, 1, 10);
+    INSERT INTO group_totals (group_id, total_seconds)
+      SELECT tasks.group_id, SUM(task_totals.total_seconds)
+      FROM task_totals JOIN tasks ON tasks.id = task_totals.task_id
+      WHERE tasks.group_id IS NOT NULL
+      GROUP BY tasks.group_id;
+    COMMIT;
+  `, (err) => {
+    if (err) return db.exec('ROLLBACK', () => callback(err));
+    callback(null);
+  });
+}
+
+// Period index: an R*Tree over academic period day ranges, so "which periods
+// contain this day" is a logarithmic lookup even when periods overlap. Triggers
+// use it to keep time_entries.period_id set to the narrowest period containing
+// the entry's start day, both when entries are written and when periods change.
+// period_id holds one period per entry (ties go to the lower id), so it names
+// the entry's period in exports; period filters and totals go by the period's
+// date range instead, so an entry inside overlapping periods counts in each.
+// Days are counted from 1970-01-01 (UTC), matching substr(start_time, 1, 10).
+function createPeriodIndex() {
+  db.run('CREATE VIRTUAL TABLE IF NOT EXISTS period_index USING rtree(id, start_day, end_day)');
+
+  const day = (value) => `CAST(julianday(substr(${value}, 1, 10)) - 2440587.5 AS INTEGER)`;
+  const periodOf = (value) => `(SELECT id FROM period_index
+      WHERE start_day <= ${day(value)} AND end_day >= ${day(value)}
+      ORDER BY end_day - start_day, id LIMIT 1)`;
+  // Periods with unparseable or reversed dates are not indexed
+  const indexPeriod = (row, source = '') => `
+    INSERT INTO period_index (id, start_day, end_day)
+      SELECT ${row}.id, ${day(`${row}.start_date`)}, ${day(`${row}.end_date`)} ${source}
+      WHERE julianday(${row}.start_date) IS NOT NULL AND julianday(${row}.end_date) IS NOT NULL
+        AND ${row}.start_date <= ${row}.end_date;`;
+  // Re-assign entries starting within a period's range (an index range scan on start_time)
+  const reassign = (row) => `
+    UPDATE time_entries SET period_id = ${periodOf('time_entries.start_time')}
+      WHERE start_time >= ${row}.start_date AND start_time < date(${row}.end_date, '+1 day');`;
+
+  db.run(`CREATE TRIGGER IF NOT EXISTS period_entry_insert AFTER INSERT ON time_entries
+    BEGIN
+      UPDATE time_entries SET period_id = ${periodOf('NEW.start_time')} WHERE id = NEW.id;
+    END`);
+  db.run(`CREATE TRIGGER IF NOT EXISTS period_entry_update AFTER UPDATE OF start_time ON time_entries
+    BEGIN
+      UPDATE time_entries SET period_id = ${periodOf('NEW.start_time')} WHERE id = NEW.id;
+    END`);
+
+  db.run(`CREATE TRIGGER IF NOT EXISTS period_insert AFTER INSERT ON academic_periods
+    BEGIN ${indexPeriod('NEW')} ${reassign('NEW')} END`);
+  db.run(`CREATE TRIGGER IF NOT EXISTS period_update AFTER UPDATE OF start_date, end_date ON academic_periods
+    BEGIN
+      DELETE FROM period_index WHERE id = OLD.id;
+      ${indexPeriod('NEW')} ${reassign('OLD')} ${reassign('NEW')}
+    END`);
+  db.run(`CREATE TRIGGER IF NOT EXISTS period_delete AFTER DELETE ON academic_periods
+    BEGIN
+      DELETE FROM period_index WHERE id = OLD.id;
+      ${reassign('OLD')}
+    END`);
+
+  // Build the index (and assign existing entries) the first time it exists
+  db.get(`SELECT NOT EXISTS (SELECT 1 FROM period_index)
+            AND EXISTS (SELECT 1 FROM academic_periods) AS empty`, (err, row) => {
+    if (err) return console.error(err);
+    if (!row.empty) return;
+    db.exec(`
+      BEGIN IMMEDIATE;
+      ${indexPeriod('academic_periods', 'FROM academic_periods')}
+      UPDATE time_entries SET period_id = ${periodOf('time_entries.start_time')};
+      COMMIT;
+    `, (err) => {
+      if (err) return db.exec('ROLLBACK', () => console.error("Failed to build period index:", err));
+      console.log("Period index built");
+    });
+  });
+}
+
+// Search index: one FTS5 table over group names, task names and entry notes,
+// kept in step by triggers. Each row's rowid encodes what it indexes:
+// id * 4 for a group, id * 4 + 1 for a task and id * 4 + 2 for a time entry,
+// so updates and deletes find their row by rowid instead of scanning.
+function createSearchIndex() {
+  db.run(`CREATE VIRTUAL TABLE IF NOT EXISTS search_index
+    USING fts5(text, tokenize = 'porter unicode61 remove_diacritics 2')`);
+
+  const indexName = (table, kind) => {
+    const rowid = (row) => `${row}.id * 4 + ${kind}`;
+    db.run(`CREATE TRIGGER IF NOT EXISTS search_${table}_insert AFTER INSERT ON ${table}
+      BEGIN INSERT INTO search_index (rowid, text) VALUES (${rowid('NEW')}, NEW.name); END`);
+    db.run(`CREATE TRIGGER IF NOT EXISTS search_${table}_update AFTER UPDATE OF name ON ${table}
+      BEGIN UPDATE search_index SET text = NEW.name WHERE rowid = ${rowid('NEW')}; END`);
+    db.run(`CREATE TRIGGER IF NOT EXISTS search_${table}_delete AFTER DELETE ON ${table}
+      BEGIN DELETE FROM search_index WHERE rowid = ${rowid('OLD')}; END`);
+  };
+  indexName('groups', SEARCH_KINDS.group);
+  indexName('tasks', SEARCH_KINDS.task);
+
+  // Notes are usually added when the timer stops, which is an UPDATE
+  const indexNote = `INSERT INTO search_index (rowid, text)
+    SELECT NEW.id * 4 + ${SEARCH_KINDS.entry}, NEW.note WHERE NEW.note <> '';`;
+  const dropNote = `DELETE FROM search_index WHERE rowid = OLD.id * 4 + ${SEARCH_KINDS.entry};`;
+  db.run(`CREATE TRIGGER IF NOT EXISTS search_entry_insert AFTER INSERT ON time_entries
+    BEGIN ${indexNote} END`);
+  db.run(`CREATE TRIGGER IF NOT EXISTS search_entry_update AFTER UPDATE OF note ON time_entries
+    BEGIN ${dropNote} ${indexNote} END`);
+  db.run(`CREATE TRIGGER IF NOT EXISTS search_entry_delete AFTER DELETE ON time_entries
+    BEGIN ${dropNote} END`);
+
+  // Index existing names and notes the first time the index exists
+  db.get(`SELECT NOT EXISTS (SELECT 1 FROM search_index)
+            AND EXISTS (SELECT 1 FROM groups) AS empty`, (err, row) => {
+    if (err) return console.error(err);
+    if (!row.empty) return;
+    db.exec(`
+      BEGIN IMMEDIATE;
+      INSERT INTO search_index (rowid, text) SELECT id * 4 + ${SEARCH_KINDS.group}, name FROM groups;
+      INSERT INTO search_index (rowid, text) SELECT id * 4 + ${SEARCH_KINDS.task}, name FROM tasks;
+      INSERT INTO search_index (rowid, text)
+        SELECT id * 4 + ${SEARCH_KINDS.entry}, note FROM time_entries WHERE note <> '';
+      COMMIT;
+    `, (err) => {
+      if (err) return db.exec('ROLLBACK', () => console.error("Failed to build search index:", err));
+      console.log("Search index built");
+    });
+  });
+}
+
+app.post('/rollups/rebuild', (req, res) => {
+  rebuildRollups((err) => {
+    if (err) return res.status(500).send(err.message);
+    publish('reset', {});
+    res.json({ success: true });
+  });
+});
+
+// Change feed: every write is published as a Server-Sent Event on GET /events
+// carrying just the changed rows (and the affected rollup totals), so clients
+// patch what they show instead of refetching whole lists. Event ids are
+// "<boot>-<seq>"; a reconnecting client sends Last-Event-ID and is replayed
+// what it missed, or told to reset if that is no longer in the buffer.
+const EVENT_BUFFER_SIZE = 1000;
+const EVENT_HEARTBEAT_MS = 20000;
+const changeFeed = { boot: Date.now().toString(36), seq: 0, recent: [], clients: new Set() };
+
+function formatEvent(event) {
+  return `id: ${changeFeed.boot}-${event.seq}\nevent: ${event.type}\ndata: ${JSON.stringify(event.data)}\n\n`;
+}
+
+function publish(type, data) {
+  const event = { seq: ++changeFeed.seq, type, data };
+  changeFeed.recent.push(event);
+  if (changeFeed.recent.length > EVENT_BUFFER_SIZE) changeFeed.recent.shift();
+
+  const text = formatEvent(event);
+  for (const client of changeFeed.clients) client.write(text);
+}
+
+app.get('/events', (req, res) => {
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive'
+  });
+  res.write('retry: 3000\n\n');
+
+  const lastId = req.get('Last-Event-ID');
+  if (lastId) {
+    const [boot, seq] = lastId.split('-');
+    const since = parseInt(seq, 10);
+    const oldest = changeFeed.recent.length ? changeFeed.recent[0].seq : changeFeed.seq + 1;
+    if (boot !== changeFeed.boot || isNaN(since) || since < oldest - 1) {
+      res.write(formatEvent({ seq: changeFeed.seq, type: 'reset', data: {} }));
+    } else {
+      changeFeed.recent.filter((event) => event.seq > since).forEach((event) => res.write(formatEvent(event)));
+    }
+  }
+
+  changeFeed.clients.add(res);
+  const heartbeat = setInterval(() => res.write(': ping\n\n'), EVENT_HEARTBEAT_MS);
+  req.on('close', () => {
+    clearInterval(heartbeat);
+    changeFeed.clients.delete(res);
+  });
+});
+
+// Current rollup totals for a task and its group, sent along with entry events
+function readTotals(task_id, callback) {
+  const query = `
+    SELECT
+      tasks.id AS task_id,
+      tasks.group_id,
+      COALESCE(task_totals.total_seconds, 0) AS task_seconds,
+      COALESCE(group_totals.total_seconds, 0) AS group_seconds
+    FROM tasks
+    LEFT JOIN task_totals ON task_totals.task_id = tasks.id
+    LEFT JOIN group_totals ON group_totals.group_id = tasks.group_id
+    WHERE tasks.id = ?
+  `;
+  db.get(query, [task_id], (err, totals) => callback(err, totals || { task_id }));
+}
+
+function publishEntry(type, entry) {
+  readTotals(entry.task_id, (err, totals) => {
+    if (err) return console.error(err);
+    publish(type, { entry, totals });
+  });
+}
+
 // Academic Period endpoints
 app.get('/periods', (_, res) => {
   db.all('SELECT * FROM academic_periods', (err, rows) => {
@@ -81,6 +454,7 @@ app.post('/periods', (req, res) => {
   db.run('INSERT INTO academic_periods (name, start_date, end_date) VALUES (?, ?, ?)', 
     [name, start_date, end_date], function(err) {
       if (err) return res.status(500).send(err.message);
+      publish('period_added', { id: this.lastID, name, start_date, end_date });
       res.json({ id: this.lastID, name, start_date, end_date });
   });
 });
@@ -90,6 +464,7 @@ app.post('/groups', (req, res) => {
   const { name } = req.body;
   db.run('INSERT INTO groups (name) VALUES (?)', [name], function(err) {
     if (err) return res.status(500).send(err.message);
+    publish('group_added', { id: this.lastID, name });
     res.json({ id: this.lastID, name });
   });
 });
@@ -107,27 +482,42 @@ app.post('/tasks', (req, res) => {
   db.run('INSERT INTO tasks (name, group_id) VALUES (?, ?)', [name, group_id], 
     function(err) {
       if (err) return res.status(500).send(err.message);
+      publish('task_added', { id: this.lastID, name, group_id });
       res.json({ id: this.lastID, name, group_id });
   });
 });
 
 // Timer endpoints
+
+// Timer endpoints accept an optional client timestamp so operations recorded
+// offline keep the time they actually happened
+function parseTimestamp(value) {
+  if (value === undefined || value === null) return new Date();
+  const date = new Date(value);
+  return isNaN(date.getTime()) ? null : date;
+}
+
 app.post('/timer/start', (req, res) => {
   const { task_id } = req.body;
-  const start_time = new Date().toISOString();
+  const start = parseTimestamp(req.body.start_time);
+  if (!start) return res.status(400).send("Invalid start_time");
+  const start_time = start.toISOString();
   db.run('INSERT INTO time_entries (task_id, start_time) VALUES (?, ?)', [task_id, start_time],
     function(err) {
       if (err) return res.status(500).send(err.message);
+      publishEntry('entry_started', { id: this.lastID, task_id, start_time });
       res.json({ id: this.lastID });
   });
 });
 
 app.post('/timer/stop', (req, res) => {
   const { id, note } = req.body;
-  const end_time = new Date();
+  const end_time = parseTimestamp(req.body.end_time);
+  if (!end_time) return res.status(400).send("Invalid end_time");
   
-  db.get('SELECT start_time FROM time_entries WHERE id = ?', [id], (err, row) => {
+  db.get('SELECT task_id, start_time FROM time_entries WHERE id = ?', [id], (err, row) => {
     if (err) return res.status(500).send(err.message);
+    if (!row) return res.status(404).send("Time entry not found");
     
     const start = new Date(row.start_time);
     const duration = Math.floor((end_time - start) / 1000); // seconds
@@ -136,71 +526,276 @@ app.post('/timer/stop', (req, res) => {
       [end_time.toISOString(), duration, note || "", id],
       function(err) {
         if (err) return res.status(500).send(err.message);
+        publishEntry('entry_stopped', {
+          id, task_id: row.task_id, start_time: row.start_time,
+          end_time: end_time.toISOString(), duration, note: note || ""
+        });
         res.json({ duration });
       }
     );
   });
 });
 
-app.get('/tasks', (req, res) => {
-  const group_id = req.query.group_id;
-  if (!group_id) return res.status(400).send("group_id is required");
-  
+// Timers that have been started and not stopped, oldest first, with their task
+// so clients can show or stop them without further lookups
+// (a scan of the small partial index on open entries)
+function queryRunningTimers(callback) {
+  const query = `
+    SELECT time_entries.id, time_entries.task_id, tasks.name AS task_name, tasks.group_id,
+      time_entries.start_time
+    FROM time_entries
+    LEFT JOIN tasks ON tasks.id = time_entries.task_id
+    WHERE time_entries.end_time IS NULL
+    ORDER BY time_entries.start_time, time_entries.id
+  `;
+  db.all(query, callback);
+}
+
+app.get('/timer/running', (req, res) => {
+  queryRunningTimers((err, rows) => {
+    if (err) return res.status(500).send(err.message);
+    res.json(rows);
+  });
+});
+
+// Shared read queries. Each takes its parameters and a Node-style callback, so
+// the individual endpoints and /snapshot run exactly the same SQL. Errors that
+// should become a 4xx response carry a status property.
+function httpError(status, message) {
+  return Object.assign(new Error(message), { status });
+}
+
+function sendError(res, err) {
+  if (!err.status) console.error(err);
+  res.status(err.status || 500).send(err.message);
+}
+
+const MAX_PAGE_SIZE = 1000;
+const DEFAULT_PAGE_SIZE = 200;
+
+function queryTasksWithTotals(group_id, callback) {
   const query = `
     SELECT 
       tasks.id, 
       tasks.name,
-      ROUND(COALESCE(SUM(time_entries.duration), 0) / 3600.0, 2) AS total_hours,
-      ROUND(COALESCE(SUM(time_entries.duration), 0) / 3600.0 / 7, 2) AS hours_per_week
+      ROUND(COALESCE(task_totals.total_seconds, 0) / 3600.0, 2) AS total_hours,
+      ROUND(COALESCE(task_totals.total_seconds, 0) / 3600.0 / 7, 2) AS hours_per_week
     FROM tasks
-    LEFT JOIN time_entries ON tasks.id = time_entries.task_id
+    LEFT JOIN task_totals ON tasks.id = task_totals.task_id
     WHERE tasks.group_id = ?
-    GROUP BY tasks.id
   `;
+  db.all(query, [group_id], callback);
+}
+
+// Keyset pagination, newest first. The cursor is "<start_time>|<id>" of the
+// last row of the previous page, so each page is a single index range scan.
+function queryTimeEntriesPage(task_id, limit, cursor, callback) {
+  const pageSize = Math.min(Math.max(limit, 1), MAX_PAGE_SIZE);
+  let query = 'SELECT id, task_id, start_time, end_time, duration, note FROM time_entries WHERE task_id = ?';
+  const params = [task_id];
+
+  if (cursor) {
+    const split = cursor.lastIndexOf('|');
+    if (split === -1) return callback(httpError(400, "Invalid cursor"));
+    query += ' AND (start_time, id) < (?, ?)';
+    params.push(cursor.slice(0, split), parseInt(cursor.slice(split + 1), 10));
+  }
+
+  query += ' ORDER BY start_time DESC, id DESC LIMIT ?';
+  params.push(pageSize + 1);
+
+  db.all(query, params, (err, rows) => {
+    if (err) return callback(err);
+    const hasMore = rows.length > pageSize;
+    const entries = hasMore ? rows.slice(0, pageSize) : rows;
+    const last = entries[entries.length - 1];
+    callback(null, {
+      entries,
+      next_cursor: hasMore ? `${last.start_time}|${last.id}` : null
+    });
+  });
+}
+
+// Resolve a period id into an inclusive [start_date, end_date] day range, or
+// null when no period is given
+function periodRange(period_id, callback) {
+  if (!period_id) return callback(null, null);
+
+  db.get('SELECT start_date, end_date FROM academic_periods WHERE id = ?', [period_id], (err, period) => {
+    if (err) return callback(err);
+    if (!period) return callback(httpError(404, "Period not found"));
+    callback(null, [period.start_date, period.end_date]);
+  });
+}
+
+function queryTimeByGroup(period_id, callback) {
+  periodRange(period_id, (err, range) => {
+    if (err) return callback(err);
+
+    // All time reads one rollup row per group; a period sums the per-day rollups
+    // of the days it covers
+    const query = range ? `
+      SELECT 
+        groups.id, 
+        groups.name,
+        ROUND(COALESCE(SUM(daily_totals.total_seconds), 0) / 3600.0, 2) AS total_time,
+        ROUND(COALESCE(SUM(daily_totals.total_seconds), 0) / 3600.0 / 7, 2) AS hours_per_week
+      FROM groups
+      LEFT JOIN tasks ON groups.id = tasks.group_id
+      LEFT JOIN daily_totals ON tasks.id = daily_totals.task_id AND daily_totals.day BETWEEN ? AND ?
+      GROUP BY groups.id
+    ` : `
+      SELECT 
+        groups.id, 
+        groups.name,
+        ROUND(COALESCE(group_totals.total_seconds, 0) / 3600.0, 2) AS total_time,
+        ROUND(COALESCE(group_totals.total_seconds, 0) / 3600.0 / 7, 2) AS hours_per_week
+      FROM groups
+      LEFT JOIN group_totals ON groups.id = group_totals.group_id
+    `;
+
+    db.all(query, range || [], callback);
+  });
+}
+
+function queryTimeByTask(group_id, period_id, callback) {
+  periodRange(period_id, (err, range) => {
+    if (err) return callback(err);
+
+    let query = range ? `
+      SELECT 
+        tasks.id, 
+        tasks.name,
+        tasks.group_id,
+        ROUND(COALESCE(SUM(daily_totals.total_seconds), 0) / 3600.0, 2) AS total_time,
+        ROUND(COALESCE(SUM(daily_totals.total_seconds), 0) / 3600.0 / 7, 2) AS hours_per_week
+      FROM tasks
+      LEFT JOIN daily_totals ON tasks.id = daily_totals.task_id AND daily_totals.day BETWEEN ? AND ?
+    ` : `
+      SELECT 
+        tasks.id, 
+        tasks.name,
+        tasks.group_id,
+        ROUND(COALESCE(task_totals.total_seconds, 0) / 3600.0, 2) AS total_time,
+        ROUND(COALESCE(task_totals.total_seconds, 0) / 3600.0 / 7, 2) AS hours_per_week
+      FROM tasks
+      LEFT JOIN task_totals ON tasks.id = task_totals.task_id
+    `;
+
+    const params = range ? [...range] : [];
+    if (group_id) {
+      query += ' WHERE tasks.group_id = ? ';
+      params.push(group_id);
+    }
+
+    query += ' GROUP BY tasks.id ';
+
+    db.all(query, params, callback);
+  });
+}
+
+app.get('/tasks', (req, res) => {
+  const group_id = req.query.group_id;
+  if (!group_id) return res.status(400).send("group_id is required");
   
-  db.all(query, [group_id], (err, rows) => {
-    if (err) return res.status(500).send(err.message);
+  queryTasksWithTotals(group_id, (err, rows) => {
+    if (err) return sendError(res, err);
     res.json(rows);
   });
 });
 
 app.get('/time_entries', (req, res) => {
   const task_id = req.query.task_id;
-  db.all('SELECT id, task_id, start_time, end_time, duration, note FROM time_entries WHERE task_id = ?', [task_id], (err, rows) => {
-    if (err) return res.status(500).send(err.message);
-    res.json(rows);
+  const limit = parseInt(req.query.limit, 10);
+
+  // Without a limit, return every entry as a plain array (older clients rely on this)
+  if (!limit) {
+    return db.all('SELECT id, task_id, start_time, end_time, duration, note FROM time_entries WHERE task_id = ?', [task_id], (err, rows) => {
+      if (err) return res.status(500).send(err.message);
+      res.json(rows);
+    });
+  }
+
+  queryTimeEntriesPage(task_id, limit, req.query.cursor, (err, page) => {
+    if (err) return sendError(res, err);
+    res.json(page);
   });
 });
 
 // Time by group endpoint
 app.get('/time_by_group', (req, res) => {
-  const query = `
-    SELECT 
-      groups.id, 
-      groups.name,
-      ROUND(COALESCE(SUM(time_entries.duration), 0) / 3600.0, 2) AS total_time,
-      ROUND(COALESCE(SUM(time_entries.duration), 0) / 3600.0 / 7, 2) AS hours_per_week
-    FROM groups
-    LEFT JOIN tasks ON groups.id = tasks.group_id
-    LEFT JOIN time_entries ON tasks.id = time_entries.task_id
-    GROUP BY groups.id
-  `;
-  
-  db.all(query, (err, rows) => {
-    if (err) {
-      console.error(err);
-      return res.status(500).send(err.message);
-    }
+  queryTimeByGroup(req.query.period_id, (err, rows) => {
+    if (err) return sendError(res, err);
     res.json(rows);
   });
 });
 
+// Completed time entries as compact columns for the analytics view. Times are
+// epoch milliseconds; tasks without a group get group_id 0. With period_id,
+// only entries starting within the period are returned.
+app.get('/intervals', (req, res) => {
+  periodRange(req.query.period_id, (err, range) => {
+    if (err) return sendError(res, err);
+
+    let query = `
+      SELECT
+        time_entries.task_id,
+        COALESCE(tasks.group_id, 0) AS group_id,
+        CAST(ROUND((julianday(start_time) - 2440587.5) * 86400000) AS INTEGER) AS start_ms,
+        CAST(ROUND((julianday(end_time) - 2440587.5) * 86400000) AS INTEGER) AS end_ms
+      FROM time_entries
+      JOIN tasks ON tasks.id = time_entries.task_id
+      WHERE end_time IS NOT NULL
+    `;
+    const params = [];
+    if (range) {
+      query += " AND start_time >= ? AND start_time < date(?, '+1 day')";
+      params.push(...range);
+    }
+
+    db.all(query, params, (err, rows) => {
+      if (err) return sendError(res, err);
+      res.json({
+        task_id: rows.map((row) => row.task_id),
+        group_id: rows.map((row) => row.group_id),
+        start: rows.map((row) => row.start_ms),
+        end: rows.map((row) => row.end_ms)
+      });
+    });
+  });
+});
+
+// Dashboard snapshot: everything the main window shows, in one round trip.
+// Groups and periods are always included; tasks, the first page of history
+// and the chart aggregates follow the client's current selection.
+app.get('/snapshot', (req, res) => {
+  const { group_id, task_id, period_id } = req.query;
+  const mode = req.query.mode === 'task' ? 'task' : 'group';
+  const limit = parseInt(req.query.limit, 10) || DEFAULT_PAGE_SIZE;
+
+  const run = (fn, ...args) => new Promise((resolve, reject) => {
+    fn(...args, (err, result) => (err ? reject(err) : resolve(result)));
+  });
+
+  Promise.all([
+    run(db.all.bind(db), 'SELECT * FROM groups'),
+    run(db.all.bind(db), 'SELECT * FROM academic_periods'),
+    group_id ? run(queryTasksWithTotals, group_id) : null,
+    task_id ? run(queryTimeEntriesPage, task_id, limit, null) : null,
+    mode === 'task' ? run(queryTimeByTask, group_id, period_id) : run(queryTimeByGroup, period_id),
+    run(queryRunningTimers)
+  ]).then(([groups, periods, tasks, entries, aggregates, running]) => {
+    res.json({ mode, groups, periods, tasks, entries, aggregates, running });
+  }).catch((err) => sendError(res, err));
+});
+
 // Delete group endpoint
 app.delete('/groups/:id', (req, res) => {
   const { id } = req.params;
   db.run('DELETE FROM groups WHERE id = ?', [id], function(err) {
     if (err) return res.status(500).send(err.message);
     if (this.changes === 0) return res.status(404).send("Group not found");
+    publish('group_deleted', { id: Number(id) });
     res.json({ success: true });
   });
 });
@@ -208,20 +803,34 @@ app.delete('/groups/:id', (req, res) => {
 // Delete task endpoint
 app.delete('/tasks/:id', (req, res) => {
   const { id } = req.params;
-  db.run('DELETE FROM tasks WHERE id = ?', [id], function(err) {
+  db.get('SELECT group_id FROM tasks WHERE id = ?', [id], (err, task) => {
     if (err) return res.status(500).send(err.message);
-    if (this.changes === 0) return res.status(404).send("Task not found");
-    res.json({ success: true });
+    if (!task) return res.status(404).send("Task not found");
+
+    db.run('DELETE FROM tasks WHERE id = ?', [id], function(err) {
+      if (err) return res.status(500).send(err.message);
+      db.get('SELECT COALESCE(SUM(total_seconds), 0) AS group_seconds FROM group_totals WHERE group_id = ?',
+        [task.group_id], (err, totals) => {
+          if (err) return console.error(err);
+          publish('task_deleted', { id: Number(id), group_id: task.group_id, group_seconds: totals.group_seconds });
+        });
+      res.json({ success: true });
+    });
   });
 });
 
 // Delete time entry endpoint
 app.delete('/time_entries/:id', (req, res) => {
   const { id } = req.params;
-  db.run('DELETE FROM time_entries WHERE id = ?', [id], function(err) {
+  db.get('SELECT id, task_id, start_time, end_time, duration, note FROM time_entries WHERE id = ?', [id], (err, entry) => {
     if (err) return res.status(500).send(err.message);
-    if (this.changes === 0) return res.status(404).send("Time entry not found");
-    res.json({ success: true });
+    if (!entry) return res.status(404).send("Time entry not found");
+
+    db.run('DELETE FROM time_entries WHERE id = ?', [id], function(err) {
+      if (err) return res.status(500).send(err.message);
+      publishEntry('entry_deleted', entry);
+      res.json({ success: true });
+    });
   });
 });
 
@@ -233,11 +842,520 @@ app.get('/all_tasks', (req, res) => {
   });
 });
 
-// Get all time entries without filtering
-app.get('/all_time_entries', (req, res) => {
-  db.all('SELECT * FROM time_entries', (err, rows) => {
+// Streaming export of the whole database as NDJSON. The first line carries
+// row counts for progress reporting; every following line is
+// {"table": ..., "row": {...}}. Rows are read in id-ordered chunks and written
+// with backpressure, so memory use does not depend on the database size.
+const EXPORT_TABLES = ['groups', 'tasks', 'time_entries', 'academic_periods'];
+const EXPORT_CHUNK_SIZE = 1000;
+
+app.get('/export', (req, res) => {
+  const counts = EXPORT_TABLES.map((table) => `(SELECT COUNT(*) FROM ${table}) AS ${table}`).join(', ');
+
+  db.get(`SELECT ${counts}`, (err, totals) => {
     if (err) return res.status(500).send(err.message);
-    res.json(rows);
+
+    let closed = false;
+    res.on('close', () => { closed = true; });
+    res.setHeader('Content-Type', 'application/x-ndjson');
+
+    const write = (text, next) => {
+      if (res.write(text)) next();
+      else res.once('drain', next);
+    };
+
+    const streamTable = (index, lastId) => {
+      if (closed) return;
+      if (index === EXPORT_TABLES.length) return res.end();
+
+      const table = EXPORT_TABLES[index];
+      db.all(`SELECT * FROM ${table} WHERE id > ? ORDER BY id LIMIT ?`, [lastId, EXPORT_CHUNK_SIZE], (err, rows) => {
+        if (err) {
+          console.error(err);
+          return res.destroy(err);
+        }
+        if (rows.length === 0) return streamTable(index + 1, 0);
+
+        const chunk = rows.map((row) => JSON.stringify({ table, row })).join('\n') + '\n';
+        write(chunk, () => streamTable(index, rows[rows.length - 1].id));
+      });
+    };
+
+    write(JSON.stringify({ counts: totals }) + '\n', () => streamTable(0, 0));
+  });
+});
+
+// Online backup and restore. GET /backup takes a consistent snapshot with
+// SQLite's backup API a few pages per step, so other queries run in between
+// (writes made during the copy go through this connection and are applied to
+// the snapshot as well). The snapshot is streamed gzip-compressed as records of
+// a 4-byte page number followed by the page. Page hashes of recent snapshots
+// are kept, so a client passing ?base=<id of its previous backup> receives
+// only the pages that changed since. POST /restore copies an uploaded database
+// into the live one the same way, without restarting the server.
+const BACKUP_STEP_PAGES = 256;
+const BACKUP_READ_PAGES = 256;
+const BACKUP_MANIFESTS = 4;
+const BACKUP_HASH_SIZE = 20;
+const backupDir = path.dirname(dbPath);
+const backupManifests = new Map();  // backup id -> { pageSize, hashes }, oldest first
+let maintenance = null;  // 'backup', 'restore' or 'import' while one is running
+
+function refuseDuringMaintenance(res) {
+  res.status(409).send(`The database is busy (${maintenance} in progress)`);
+}
+
+// Run a backup (in either direction) to completion, pages at a time
+function runBackup(backup, pages, callback) {
+  const step = () => backup.step(pages, (err) => {
+    if (err || backup.completed || backup.failed) {
+      return backup.finish(() => callback(err || (backup.failed ? new Error('Backup failed') : null)));
+    }
+    setImmediate(step);
+  });
+  step();
+}
+
+// Call onBatch(buffer, firstPage, count, next) for consecutive runs of pages of a database file
+function readPages(fd, pageSize, pageCount, onBatch, callback) {
+  const read = (first) => {
+    if (first > pageCount) return callback(null);
+    const count = Math.min(BACKUP_READ_PAGES, pageCount - first + 1);
+    const buffer = Buffer.allocUnsafe(count * pageSize);
+    fs.read(fd, buffer, 0, buffer.length, (first - 1) * pageSize, (err, bytes) => {
+      if (err) return callback(err);
+      if (bytes < buffer.length) return callback(new Error('Snapshot ended early'));
+      onBatch(buffer, first, count, () => read(first + count));
+    });
+  };
+  read(1);
+}
+
+// Page size from the database header (bytes 16-17, where 1 means 65536)
+function readPageSize(fd, callback) {
+  const header = Buffer.alloc(100);
+  fs.read(fd, header, 0, 100, 0, (err, bytes) => {
+    if (err) return callback(err);
+    if (bytes < 100 || header.toString('latin1', 0, 16) !== 'SQLite format 3\0') {
+      return callback(new Error('Not a SQLite database'));
+    }
+    const size = header.readUInt16BE(16);
+    callback(null, size === 1 ? 65536 : size);
+  });
+}
+
+function rememberManifest(id, manifest) {
+  backupManifests.set(id, manifest);
+  if (backupManifests.size > BACKUP_MANIFESTS) {
+    backupManifests.delete(backupManifests.keys().next().value);
+  }
+}
+
+// Hash every page of a snapshot; returns the hashes and the pages that differ from base
+function diffPages(fd, pageSize, pageCount, base, callback) {
+  const previous = base && base.pageSize === pageSize ? base.hashes : null;
+  const hashes = Buffer.alloc(pageCount * BACKUP_HASH_SIZE);
+  const changed = [];
+  readPages(fd, pageSize, pageCount, (buffer, first, count, next) => {
+    for (let i = 0; i < count; i++) {
+      const page = first + i;
+      const start = (page - 1) * BACKUP_HASH_SIZE;
+      const end = start + BACKUP_HASH_SIZE;
+      crypto.createHash('sha1').update(buffer.subarray(i * pageSize, (i + 1) * pageSize)).digest().copy(hashes, start);
+      if (!previous || end > previous.length || previous.compare(hashes, start, end, start, end) !== 0) {
+        changed.push(page);
+      }
+    }
+    next();
+  }, (err) => callback(err, hashes, changed));
+}
+
+app.get('/backup', (req, res) => {
+  if (maintenance) return refuseDuringMaintenance(res);
+  maintenance = 'backup';
+
+  const id = crypto.randomBytes(8).toString('hex');
+  const file = path.join(backupDir, `.backup-${id}.db`);
+  let fd = null;
+  let closed = false;
+  let finished = false;
+  res.on('close', () => { closed = true; });
+
+  const done = (err) => {
+    if (finished) return;
+    finished = true;
+    maintenance = null;
+    if (fd !== null) fs.close(fd, () => {});
+    fs.unlink(file, () => {});
+    if (!err) return;
+    console.error("Backup failed:", err);
+    if (res.headersSent) res.destroy(err);
+    else res.status(500).send(err.message);
+  };
+
+  const backup = db.backup(file, (err) => {
+    if (err) return done(err);
+    runBackup(backup, BACKUP_STEP_PAGES, (err) => {
+      if (err) return done(err);
+      fs.open(file, 'r', (err, opened) => {
+        if (err) return done(err);
+        fd = opened;
+        fs.fstat(fd, (err, stat) => {
+          if (err) return done(err);
+          readPageSize(fd, (err, pageSize) => {
+            if (err) return done(err);
+            sendPages(pageSize, stat.size / pageSize);
+          });
+        });
+      });
+    });
+  });
+
+  const sendPages = (pageSize, pageCount) => {
+    const base = backupManifests.get(req.query.base);
+    diffPages(fd, pageSize, pageCount, base, (err, hashes, changed) => {
+      if (err) return done(err);
+      rememberManifest(id, { pageSize, hashes });
+      if (closed) return done(null);
+
+      res.writeHead(200, {
+        'Content-Type': 'application/octet-stream',
+        'Content-Encoding': 'gzip',
+        'X-Backup-Id': id,
+        'X-Backup-Base': base && base.pageSize === pageSize ? req.query.base : '',
+        'X-Backup-Page-Size': pageSize,
+        'X-Backup-Page-Count': pageCount,
+        'X-Backup-Pages': changed.length,
+        // SHA-1 of the page hashes, to check the file rebuilt by the client
+        'X-Backup-Digest': crypto.createHash('sha1').update(hashes).digest('hex')
+      });
+      const gzip = zlib.createGzip({ level: 6 });
+      gzip.pipe(res);
+
+      const wanted = new Set(changed);
+      readPages(fd, pageSize, pageCount, (buffer, first, count, next) => {
+        if (closed) return done(null);
+        let flowing = true;
+        for (let i = 0; i < count; i++) {
+          if (!wanted.has(first + i)) continue;
+          const number = Buffer.alloc(4);
+          number.writeUInt32BE(first + i);
+          gzip.write(number);
+          flowing = gzip.write(buffer.subarray(i * pageSize, (i + 1) * pageSize));
+        }
+        if (flowing) next();
+        else gzip.once('drain', next);
+      }, (err) => {
+        if (err) return done(err);
+        gzip.end();
+        if (closed) done(null);
+        else res.once('close', () => done(null));
+      });
+    });
+  };
+});
+
+app.post('/restore', (req, res) => {
+  if (maintenance) return refuseDuringMaintenance(res);
+  maintenance = 'restore';
+
+  const file = path.join(backupDir, `.restore-${crypto.randomBytes(8).toString('hex')}.db`);
+  const done = (err) => {
+    maintenance = null;
+    fs.unlink(file, () => {});
+    if (!err) return;
+    console.error("Restore failed:", err);
+    if (!res.headersSent) res.status(err.status || 500).send(err.message);
+  };
+
+  const streams = req.get('Content-Encoding') === 'gzip'
+    ? [req, zlib.createGunzip(), fs.createWriteStream(file)]
+    : [req, fs.createWriteStream(file)];
+  pipeline(...streams, (err) => {
+    if (err) return done(err);
+    checkBackup(file, (err) => {
+      if (err) {
+        err.status = 400;
+        return done(err);
+      }
+      // One step: readers never see a half-restored database
+      const restore = db.backup(file, 'main', 'main', false, (err) => {
+        if (err) return done(err);
+        runBackup(restore, -1, (err) => {
+          if (err) return done(err);
+          db.serialize(() => createSchema());
+          db.get('SELECT COUNT(*) AS entries FROM time_entries', (err, row) => {
+            if (err) return done(err);
+            publish('reset', {});
+            res.json({ success: true, entries: row.entries });
+            done(null);
+          });
+        });
+      });
+    });
+  });
+});
+
+// An uploaded backup must be an intact time tracker database before it replaces the live one
+function checkBackup(file, callback) {
+  const backup = new sqlite3.Database(file, sqlite3.OPEN_READONLY, (err) => {
+    if (err) return callback(err);
+    const close = (err) => backup.close(() => callback(err));
+    backup.get('PRAGMA quick_check', (err, row) => {
+      if (err) return close(err);
+      if (row.quick_check !== 'ok') return close(new Error(`Backup is damaged: ${row.quick_check}`));
+      backup.get(`SELECT COUNT(*) AS found FROM sqlite_master WHERE type = 'table'
+                    AND name IN ('groups', 'tasks', 'time_entries', 'academic_periods')`, (err, row) => {
+        if (err) return close(err);
+        if (row.found !== 4) return close(new Error('Not a time tracker database'));
+        close(null);
+      });
+    });
+  });
+}
+
+// Bulk import: POST /import with an NDJSON body of completed entries
+// {"group", "task", "start_time", "end_time", "note"}, with the group and task
+// given by name and created when missing. Rows are inserted through prepared
+// statements in one transaction per batch, on a connection of the import's own
+// so that other requests' writes are never part of (or rolled back with) a
+// batch; they wait on the database lock instead. Only one import runs at a
+// time, and none during a backup or restore. An entry whose task already has
+// an entry with the same start time is skipped, so importing a file twice is
+// harmless and an interrupted import can simply be run again.
+const IMPORT_BATCH_SIZE = 5000;
+const IMPORT_MAX_ERRORS = 100;
+
+// Run a prepared statement once per parameter list; onRun gets each run's result (lastID, changes)
+function runEach(statement, paramsList, onRun, callback) {
+  let remaining = paramsList.length;
+  let failed = null;
+  if (remaining === 0) return callback(null);
+  paramsList.forEach((params) => statement.run(params, function(err) {
+    if (err) failed = failed || err;
+    else onRun(params, this);
+    if (--remaining === 0) callback(failed);
+  }));
+}
+
+// Insert one batch: missing groups, then missing tasks, then the entries
+function importBatch(rows, state, callback) {
+  const { connection, statements, groups, tasks, summary } = state;
+  const taskKey = (row) => `${groups.get(row.group)}\0${row.task}`;
+
+  connection.run('BEGIN IMMEDIATE', (err) => {
+    if (err) return callback(err);
+    const fail = (err) => connection.run('ROLLBACK', () => callback(err));
+
+    const newGroups = [...new Set(rows.map((row) => row.group))].filter((name) => !groups.has(name));
+    runEach(statements.group, newGroups.map((name) => [name]), ([name], result) => {
+      groups.set(name, result.lastID);
+      summary.groups_created++;
+    }, (err) => {
+      if (err) return fail(err);
+
+      const newTasks = new Map();
+      rows.forEach((row) => {
+        if (!tasks.has(taskKey(row))) newTasks.set(taskKey(row), [row.task, groups.get(row.group)]);
+      });
+      runEach(statements.task, [...newTasks.values()], ([name, group_id], result) => {
+        tasks.set(`${group_id}\0${name}`, result.lastID);
+        summary.tasks_created++;
+      }, (err) => {
+        if (err) return fail(err);
+
+        const entries = rows.map((row) => [tasks.get(taskKey(row)), row.start_time, row.end_time, row.duration, row.note]);
+        runEach(statements.entry, entries, (params, result) => {
+          if (result.changes) summary.inserted++;
+          else summary.duplicates++;
+        }, (err) => {
+          if (err) return fail(err);
+          connection.run('COMMIT', (err) => (err ? fail(err) : callback(null)));
+        });
+      });
+    });
+  });
+}
+
+app.post('/import', (req, res) => {
+  if (maintenance) {
+    req.resume();
+    return refuseDuringMaintenance(res);
+  }
+  maintenance = 'import';
+
+  const summary = { inserted: 0, duplicates: 0, invalid: 0, groups_created: 0, tasks_created: 0, errors: [] };
+  const connection = new sqlite3.Database(dbPath);
+  connection.configure('busyTimeout', DB_BUSY_TIMEOUT_MS);
+  const state = { summary, connection, statements: {}, groups: new Map(), tasks: new Map() };
+  let batch = [];
+  let pending = '';
+  let line = 0;
+  let ended = false;
+  let failed = false;
+  let busy = false;
+
+  const reject = (line, error) => {
+    summary.invalid++;
+    if (summary.errors.length < IMPORT_MAX_ERRORS) summary.errors.push({ line, error });
+  };
+
+  const parse = (text, line) => {
+    let row;
+    try {
+      row = JSON.parse(text);
+    } catch (e) {
+      return reject(line, 'Invalid JSON');
+    }
+    if (Number.isInteger(row.line)) line = row.line;  // line in the client's source file
+    const group = typeof row.group === 'string' ? row.group.trim() : '';
+    const task = typeof row.task === 'string' ? row.task.trim() : '';
+    if (!group || !task) return reject(line, 'Missing group or task');
+    const start = typeof row.start_time === 'string' ? new Date(row.start_time) : null;
+    const end = typeof row.end_time === 'string' ? new Date(row.end_time) : null;
+    if (!start || !end || isNaN(start.getTime()) || isNaN(end.getTime())) {
+      return reject(line, 'Invalid start_time or end_time');
+    }
+    if (end < start) return reject(line, 'end_time is before start_time');
+    batch.push({
+      group, task,
+      start_time: start.toISOString(),
+      end_time: end.toISOString(),
+      duration: Math.floor((end - start) / 1000),
+      note: row.note == null ? '' : String(row.note)
+    });
+  };
+
+  // Release the connection and let the next import, backup or restore run
+  let released = false;
+  const finalize = () => {
+    if (released) return;
+    released = true;
+    maintenance = null;
+    const statements = Object.values(state.statements);
+    let remaining = statements.length;
+    if (remaining === 0) return connection.close();
+    statements.forEach((statement) => statement.finalize(() => {
+      if (--remaining === 0) connection.close();
+    }));
+  };
+
+  const flush = (next) => {
+    const rows = batch;
+    batch = [];
+    if (rows.length === 0) return next();
+    busy = true;
+    importBatch(rows, state, (err) => {
+      busy = false;
+      if (!err) return next();
+      failed = true;
+      finalize();
+      req.resume();  // discard the rest of the upload
+      sendError(res, err);
+    });
+  };
+
+  const finish = () => {
+    finalize();
+    if (summary.inserted || summary.groups_created || summary.tasks_created) publish('reset', {});
+    res.json(summary);
+  };
+
+  const failBeforeUpload = (err) => {
+    finalize();
+    req.resume();
+    sendError(res, err);
+  };
+
+  // Existing names map to their oldest group or task
+  connection.all('SELECT id, name FROM groups ORDER BY id', (err, groupRows) => {
+    if (err) return failBeforeUpload(err);
+    connection.all('SELECT id, name, group_id FROM tasks ORDER BY id', (err, taskRows) => {
+      if (err) return failBeforeUpload(err);
+      groupRows.forEach((row) => { if (!state.groups.has(row.name)) state.groups.set(row.name, row.id); });
+      taskRows.forEach((row) => {
+        const key = `${row.group_id}\0${row.name}`;
+        if (!state.tasks.has(key)) state.tasks.set(key, row.id);
+      });
+      state.statements = {
+        group: connection.prepare('INSERT INTO groups (name) VALUES (?)'),
+        task: connection.prepare('INSERT INTO tasks (name, group_id) VALUES (?, ?)'),
+        entry: connection.prepare(`INSERT INTO time_entries (task_id, start_time, end_time, duration, note)
+          SELECT ?1, ?2, ?3, ?4, ?5
+          WHERE NOT EXISTS (SELECT 1 FROM time_entries WHERE task_id = ?1 AND start_time = ?2)`)
+      };
+
+      req.setEncoding('utf8');
+      req.on('data', (chunk) => {
+        if (failed) return;
+        const lines = (pending + chunk).split('\n');
+        pending = lines.pop();
+        lines.forEach((text) => {
+          line++;
+          if (text.trim()) parse(text, line);
+        });
+        if (batch.length >= IMPORT_BATCH_SIZE) {
+          req.pause();
+          flush(() => (failed ? flush(finalize) : req.resume()));
+        }
+      });
+      req.on('end', () => {
+        ended = true;
+        if (failed) return;
+        line++;
+        if (pending.trim()) parse(pending, line);
+        flush(finish);
+      });
+      // Batches already committed are kept when the client goes away mid-upload
+      req.on('close', () => {
+        if (!ended && !failed) {
+          failed = true;
+          if (!busy) flush(finalize);
+        }
+      });
+    });
+  });
+});
+
+// Search: every word of q must match (as a prefix, so results update while
+// typing), best matches first by bm25. Paged with offset; next_offset is null
+// on the last page. kind limits results to groups, tasks or entries.
+const MAX_SEARCH_LIMIT = 100;
+const DEFAULT_SEARCH_LIMIT = 20;
+
+app.get('/search', (req, res) => {
+  const words = String(req.query.q || '').match(/[\p{L}\p{N}_]+/gu) || [];
+  const limit = Math.min(parseInt(req.query.limit, 10) || DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT);
+  const offset = Math.max(parseInt(req.query.offset, 10) || 0, 0);
+  const kind = Object.hasOwn(SEARCH_KINDS, req.query.kind || '') ? SEARCH_KINDS[req.query.kind] : null;
+  if (words.length === 0) return res.json({ results: [], next_offset: null });
+
+  const query = `
+    WITH hits AS (
+      SELECT rowid, snippet(search_index, 0, '[', ']', '...', 12) AS snippet, rank
+      FROM search_index
+      WHERE search_index MATCH ?1 AND (?2 IS NULL OR rowid % 4 = ?2)
+      ORDER BY rank LIMIT ?3 OFFSET ?4
+    )
+    SELECT
+      CASE hits.rowid % 4 WHEN 0 THEN 'group' WHEN 1 THEN 'task' ELSE 'entry' END AS kind,
+      hits.rowid / 4 AS id, hits.snippet, hits.rank,
+      time_entries.start_time, time_entries.duration,
+      tasks.id AS task_id, tasks.name AS task_name,
+      groups.id AS group_id, groups.name AS group_name
+    FROM hits
+    LEFT JOIN time_entries ON hits.rowid % 4 = 2 AND time_entries.id = hits.rowid / 4
+    LEFT JOIN tasks ON tasks.id = CASE hits.rowid % 4 WHEN 1 THEN hits.rowid / 4 WHEN 2 THEN time_entries.task_id END
+    LEFT JOIN groups ON groups.id = CASE hits.rowid % 4 WHEN 0 THEN hits.rowid / 4 ELSE tasks.group_id END
+    ORDER BY hits.rank
+  `;
+  const match = words.map((word) => `"${word}"*`).join(' ');
+  db.all(query, [match, kind, limit + 1, offset], (err, rows) => {
+    if (err) return sendError(res, err);
+    res.json({
+      results: rows.slice(0, limit),
+      next_offset: rows.length > limit ? offset + limit : null
+    });
   });
 });
 
@@ -247,37 +1365,15 @@ app.delete('/periods/:id', (req, res) => {
   db.run('DELETE FROM academic_periods WHERE id = ?', [id], function(err) {
     if (err) return res.status(500).send(err.message);
     if (this.changes === 0) return res.status(404).send("Period not found");
+    publish('period_deleted', { id: Number(id) });
     res.json({ success: true });
   });
 });
 
 // Time by task endpoint
 app.get('/time_by_task', (req, res) => {
-  const group_id = req.query.group_id;
-  
-  let query = `
-    SELECT 
-      tasks.id, 
-      tasks.name,
-      ROUND(COALESCE(SUM(time_entries.duration), 0) / 3600.0, 2) AS total_time,
-      ROUND(COALESCE(SUM(time_entries.duration), 0) / 3600.0 / 7, 2) AS hours_per_week
-    FROM tasks
-    LEFT JOIN time_entries ON tasks.id = time_entries.task_id
-  `;
-
-  const params = [];
-  if (group_id) {
-    query += ' WHERE tasks.group_id = ? ';
-    params.push(group_id);
-  }
-
-  query += ' GROUP BY tasks.id ';
-
-  db.all(query, params, (err, rows) => {
-    if (err) {
-      console.error(err);
-      return res.status(500).send(err.message);
-    }
+  queryTimeByTask(req.query.group_id, req.query.period_id, (err, rows) => {
+    if (err) return sendError(res, err);
     res.json(rows);
   });
 });
@@ -0,0 +1,139 @@
+"""
+Running timers
+TimerEngine holds every running timer, so several sessions can run at once.
+Timers started here are journaled and can be stopped before the server has
+seen them. For everything else the server's list of open entries is
+authoritative, so timers started by another client, the command line, or
+before a crash are picked up again on the next refresh.
+"""
+import time
+
+from journal import ref
+from models import parse_time
+
+
+def format_elapsed(seconds):
+    """HH:MM:SS, with hours going past 24"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+class Timer:
+    """One open time entry, as shown in the GUI and returned by core.TimeTracker"""
+
+    __slots__ = ("task_id", "task_name", "group_id", "start", "entry_id", "journal_key", "revision")
+
+    def __init__(self, task_id, task_name, group_id, start, entry_id=None, journal_key=None, revision=0):
+        self.task_id = task_id
+        self.task_name = task_name
+        self.group_id = group_id
+        self.start = start              # epoch seconds
+        self.entry_id = entry_id        # server id, None until the start has been synced
+        self.journal_key = journal_key  # journaled start, for timers started here
+        self.revision = revision        # engine revision when last changed locally
+
+    @classmethod
+    def from_json(cls, row):
+        """From a /timer/running row"""
+        return cls(row["task_id"], row.get("task_name"), row.get("group_id"),
+                   parse_time(row["start_time"]), entry_id=row["id"])
+
+    @property
+    def key(self):
+        return (self.task_id, self.start)
+
+    @property
+    def entry(self):
+        """The time entry id to send with /timer/stop"""
+        return self.entry_id if self.entry_id is not None else ref(self.journal_key)
+
+    def elapsed(self, now=None):
+        return max(0.0, (time.time() if now is None else now) - self.start)
+
+
+class TimerEngine:
+    """Running timers, oldest first, merged from local starts and the server's list"""
+
+    def __init__(self):
+        self.timers = {}        # (task id, start) -> Timer
+        self.revision = 0       # bumped on every local start and stop
+        self._stopped = set()   # keys stopped here; hidden until the server stops listing them
+        self._stops = {}        # journal key of a pending stop -> timer key
+
+    def __len__(self):
+        return len(self.timers)
+
+    def __iter__(self):
+        return iter(sorted(self.timers.values(), key=lambda timer: timer.start))
+
+    def for_task(self, task_id):
+        """The oldest running timer of a task, or None"""
+        return next((timer for timer in self if timer.task_id == task_id), None)
+
+    def start(self, task, start_time, journal_key):
+        self.revision += 1
+        timer = Timer(task.id, task.name, task.group_id, parse_time(start_time),
+                      journal_key=journal_key, revision=self.revision)
+        self.timers[timer.key] = timer
+        return timer
+
+    def stop(self, timer, journal_key):
+        self.revision += 1
+        self.timers.pop(timer.key, None)
+        self._stopped.add(timer.key)
+        self._stops[journal_key] = timer.key
+
+    def applied(self, journal_key, result):
+        """A journaled start or stop has reached the server"""
+        self._stops.pop(journal_key, None)
+        for timer in self.timers.values():
+            if timer.journal_key == journal_key and timer.entry_id is None:
+                self.revision += 1
+                timer.entry_id = result["id"]
+                timer.revision = self.revision
+
+    def failed(self, journal_key):
+        """A journaled start or stop was rejected by the server"""
+        stopped = self._stops.pop(journal_key, None)
+        if stopped is not None:
+            # Still running on the server; the next sync shows it again
+            self._stopped.discard(stopped)
+        for key, timer in list(self.timers.items()):
+            if timer.journal_key == journal_key and timer.entry_id is None:
+                self.revision += 1
+                del self.timers[key]
+
+    def sync(self, rows, revision):
+        """Merge /timer/running rows fetched when the engine was at revision
+
+        Returns whether the set of timers changed. Timers changed locally
+        after the request was sent are kept, since the rows may predate them.
+        """
+        running = {}
+        listed = set()
+        for row in rows:
+            timer = Timer.from_json(row)
+            listed.add(timer.key)
+            if timer.key not in self._stopped:
+                running[timer.key] = timer
+        # Stops the server has applied and no longer lists need no hiding
+        pending = set(self._stops.values())
+        self._stopped = {key for key in self._stopped if key in listed or key in pending}
+
+        changed = False
+        for key, timer in list(self.timers.items()):
+            known = running.pop(key, None)
+            if known is not None:
+                if timer.entry_id is None:
+                    timer.entry_id = known.entry_id
+                timer.task_name = timer.task_name or known.task_name
+                timer.group_id = timer.group_id if timer.group_id is not None else known.group_id
+            elif timer.entry_id is not None and timer.revision <= revision:
+                # Stopped or deleted elsewhere
+                del self.timers[key]
+                changed = True
+        for key, timer in running.items():
+            timer.revision = revision
+            self.timers[key] = timer
+            changed = True
+        return changed
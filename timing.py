@@ -0,0 +1,52 @@
+"""
+Startup timing
+PhaseTimer records how long each stage of GUI start-up took (imports, widget
+construction, first paint, first data, chart ready) so slow starts can be
+spotted and compared between versions.
+"""
+import time
+
+# Try to load configuration from config.py, fallback to defaults
+try:
+    import config
+except ImportError:
+    config = None
+
+LOG_STARTUP_TIMING = getattr(config, "LOG_STARTUP_TIMING", True)
+
+
+class PhaseTimer:
+    """Marks named points in time relative to when the timer was created"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = []  # (phase, seconds since start)
+        self.reported = False
+
+    def mark(self, phase):
+        """Record that a phase has just finished (only the first mark of a name counts)"""
+        if not self.has(phase):
+            self.marks.append((phase, time.perf_counter() - self.started))
+
+    def has(self, phase):
+        return any(name == phase for name, _ in self.marks)
+
+    def phases(self):
+        """[(phase, ms since start, ms since the previous mark), ...]"""
+        result = []
+        previous = 0.0
+        for name, at in self.marks:
+            result.append((name, at * 1000, (at - previous) * 1000))
+            previous = at
+        return result
+
+    def summary(self):
+        return ", ".join(f"{name} {at:.0f} ms" for name, at, _ in self.phases())
+
+    def report_when(self, *phases):
+        """Print the summary once, after every one of phases has been marked"""
+        if self.reported or not all(self.has(phase) for phase in phases):
+            return
+        self.reported = True
+        if LOG_STARTUP_TIMING:
+            print(f"Startup: {self.summary()}")
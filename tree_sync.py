@@ -0,0 +1,111 @@
+"""
+Incremental Treeview updates
+TreeSync brings a ttk.Treeview in line with a new list of rows using the
+fewest insert/update/delete/move calls, so refreshes don't flicker and the
+selection and scroll position survive.
+"""
+import time
+from bisect import bisect_left
+
+from metrics import metrics
+
+
+def _stable_items(order, position):
+    """Return the items of order that form a longest run already in target order
+
+    position maps each item to its index in the target list. Items in the
+    returned set can stay where they are; everything else has to move.
+    """
+    tails = []       # smallest tail position for each run length
+    tail_items = []  # index into order of that tail
+    parents = [-1] * len(order)
+    for i, item in enumerate(order):
+        pos = position[item]
+        length = bisect_left(tails, pos)
+        if length == len(tails):
+            tails.append(pos)
+            tail_items.append(i)
+        else:
+            tails[length] = pos
+            tail_items[length] = i
+        parents[i] = tail_items[length - 1] if length > 0 else -1
+
+    stable = set()
+    i = tail_items[-1] if tail_items else -1
+    while i != -1:
+        stable.add(order[i])
+        i = parents[i]
+    return stable
+
+
+class TreeSync:
+    """Keeps the top-level rows of a Treeview in sync with a list of rows
+
+    Rows are (iid, text, values) or (iid, text, values, tags) tuples; iid is
+    the entity id as a string so selection follows the entity across refreshes.
+    """
+
+    def __init__(self, tree, name="tree"):
+        self.tree = tree
+        self.name = name  # series name for the render metrics
+        self._rows = {}  # iid -> (text, values, tags) as last written to the tree
+
+    def sync(self, rows):
+        start = time.perf_counter()
+        tree = self.tree
+        calls = 0
+        rows = [(str(row[0]), row[1], tuple(row[2]), tuple(row[3]) if len(row) > 3 else ())
+                for row in rows]
+        target = [row[0] for row in rows]
+        position = {iid: i for i, iid in enumerate(target)}
+
+        # Delete rows that are gone in a single call
+        children = tree.get_children("")
+        stale = [iid for iid in children if iid not in position]
+        if stale:
+            tree.delete(*stale)
+            calls += 1
+            for iid in stale:
+                self._rows.pop(iid, None)
+
+        order = [iid for iid in children if iid in position]
+        existing = set(order)
+        stable = _stable_items(order, position)
+
+        for i, (iid, text, values, tags) in enumerate(rows):
+            if iid in existing:
+                if self._rows.get(iid) != (text, values, tags):
+                    tree.item(iid, text=text, values=values, tags=tags)
+                    self._rows[iid] = (text, values, tags)
+                    calls += 1
+                if iid in stable:
+                    continue
+                order.remove(iid)
+
+            # Place the row directly after its predecessor in the target order
+            if i == 0:
+                index = 0
+            elif i <= len(order) and order[i - 1] == target[i - 1]:
+                index = i  # common case: everything before this row is already in place
+            else:
+                index = order.index(target[i - 1]) + 1
+            if iid in existing:
+                tree.move(iid, "", index)
+            else:
+                tree.insert("", index, iid=iid, text=text, values=values, tags=tags)
+                self._rows[iid] = (text, values, tags)
+            calls += 1
+            order.insert(index, iid)
+
+        metrics.record("render", self.name, (time.perf_counter() - start) * 1000, len(rows))
+        metrics.count(f"{self.name} tree calls", calls)
+
+    def remove(self, iid):
+        """Delete a single row right away, e.g. before the server confirms"""
+        iid = str(iid)
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+        self._rows.pop(iid, None)
+
+    def clear(self):
+        self.sync([])